@@ -1,39 +1,150 @@
 import os
+import json
 import uuid
-import httpx
+import atexit
+import asyncio
+import dataclasses
+from contextlib import asynccontextmanager
 from typing import Dict
 from strands import Agent
 from strands.models.openai import OpenAIModel
-from strands.tools.mcp import MCPClient
-from mcp.client.streamable_http import streamable_http_client
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
-from memory.utils import setup_memory, create_memory_resource
+from memory.utils import setup_memory, get_memory_id
 from memory.MemoryHook import MemoryHook
-from tools import NSWFuelClient, geocode_location
+from memory.writer import memory_writer
+from memory.context_cache import session_context
+from bedrock_agentcore.memory.constants import ConversationalMessage, MessageRole
+from tools import NSWFuelClient, geocode_location, geocode_cache
+from transport import close_http_client
+from mapbox_mcp import create_mapbox_mcp_client
+from router import FastPathRouter
 from prompts import SYSTEM_PROMPT
+from metrics import Metrics, all_metrics
 from dotenv import load_dotenv
 load_dotenv()
 
 # set model
 MODEL_ID = "gpt-5.4-mini"
+# every session shares the same system prompt and tool specs, so route them to one prompt cache
+PROMPT_CACHE_KEY = "nsw_fuel_agent"
+# process-wide metrics (caches, rate limiters, fast path, token usage, ...) are printed this often (seconds)
+METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "60"))
+
+
+def print_metrics():
+    """
+    Print every component's metrics as one JSON line, so they can be queried
+    from the runtime logs. Components that recorded nothing are left out.
+    """
+    snapshot = {name: metrics for name, metrics in all_metrics().items() if metrics}
+    print(f"Metrics: {json.dumps(snapshot, sort_keys=True)}")
+
+
+async def report_metrics(interval: float = METRICS_LOG_INTERVAL):
+    while True:
+        await asyncio.sleep(interval)
+        print_metrics()
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # load the statewide price snapshot and start its delta poller before the first request;
+    # tools use the live API until it is ready
+    fuel_tools.start_background_tasks()
+    reporter = asyncio.create_task(report_metrics())
+    try:
+        yield
+    finally:
+        reporter.cancel()
+        await fuel_tools.stop_background_tasks()
+        await close_http_client()
+        print_metrics()
+
 
 # initialize runtime app
-app = BedrockAgentCoreApp()
+app = BedrockAgentCoreApp(lifespan=lifespan)
 
 # random generateor for session_id
 SESSION_ID = str(uuid.uuid4())
 
+
+def prompt_cache_config() -> Dict:
+    """
+    Model arguments pinning the OpenAI prompt-cache key. Only strands-agents
+    releases whose CacheConfig has a `cache_key` field support this (1.34.1,
+    the locked version, does not); older ones get no cache settings and
+    OpenAI falls back to its own prefix matching.
+    """
+    try:
+        from strands.models.model import CacheConfig
+    except ImportError:
+        CacheConfig = None
+    if CacheConfig is None or "cache_key" not in {field.name for field in dataclasses.fields(CacheConfig)}:
+        print("Prompt cache key not supported by this strands-agents version, using provider defaults")
+        return {}
+    return {"cache_config": CacheConfig(cache_key=PROMPT_CACHE_KEY)}
+
+
 # create model for OpenAI GPT model
 model = OpenAIModel(
     client_args={
         "api_key": os.getenv("OPENAI_API_KEY")
     },
-    model_id=MODEL_ID
+    model_id=MODEL_ID,
+    **prompt_cache_config(),
 )
 
+# token usage per turn, including input tokens served from the provider's prompt cache
+usage_metrics = Metrics("model_usage")
+
 # set up tools for our specialized agents
 fuel_tools = NSWFuelClient()
 
+# load previously geocoded addresses from disk so the first lookups are cache hits
+geocode_cache.warm_up()
+
+# connect to the Mapbox MCP server once at startup; invocations share the session
+mapbox_mcp = create_mapbox_mcp_client(tool_filters={"allowed": [
+    "directions_tool",
+    # "reverse_geocode_tool",
+]})
+mapbox_mcp.get_tools()
+atexit.register(mapbox_mcp.close)
+
+# formulaic prompts (greetings, "price at station N", "cheapest E10 near 2150") are answered without the model
+fast_path = FastPathRouter(fuel_tools, geocode=geocode_location)
+
+
+def record_usage(result):
+    """
+    Add a turn's token usage to the model_usage metrics. cacheReadInputTokens is
+    the part of the prompt the provider served from its prompt cache. Older
+    strands-agents releases (e.g. 1.34.1) never read OpenAI's cached_tokens;
+    those turns are counted as cache_unreported_turns rather than as misses.
+    """
+    usage = result.metrics.accumulated_usage
+    cached = usage.get("cacheReadInputTokens", 0)
+    usage_metrics.incr("turns")
+    if "cacheReadInputTokens" not in usage:
+        usage_metrics.incr("cache_unreported_turns")
+    usage_metrics.incr("input_tokens", usage.get("inputTokens", 0))
+    usage_metrics.incr("output_tokens", usage.get("outputTokens", 0))
+    usage_metrics.incr("cache_read_input_tokens", cached)
+    usage_metrics.incr("cache_write_input_tokens", usage.get("cacheWriteInputTokens", 0))
+    if cached:
+        usage_metrics.incr("cache_hit_turns")
+    print(f"Token usage: input={usage.get('inputTokens', 0)}, cached={cached}, output={usage.get('outputTokens', 0)}")
+
+
+def remember_turn(memory, actor_id: str, session_id: str, user_input: str, answer: str):
+    """
+    Store a turn answered by the fast path the same way MemoryHook stores agent
+    turns, so a follow-up that does reach the agent sees it in its history.
+    """
+    for text, role in ((user_input, MessageRole.USER), (answer, MessageRole.ASSISTANT)):
+        memory_writer.add(memory, ConversationalMessage(text, role))
+        session_context.append((actor_id, session_id), role, text)
+    memory_writer.flush(memory)
 
 
 @app.entrypoint
@@ -42,71 +153,82 @@ async def invoke_agent(payload: Dict):
     actor_id = "nsw_fuel_agent"
     session_id = payload.get("session_id", SESSION_ID) # get session_id from front-end. fallback to generated SESSION_ID for local testing
 
-    # get or create memory resource by name
-    memory_resource = create_memory_resource(memory_name=memory_name)
+    # memory resource id is resolved once per process (or taken from AGENTCORE_MEMORY_ID)
+    memory_id = get_memory_id(memory_name=memory_name)
 
-    # set up memory session for agent
+    # set up memory session for agent, reused across turns of the same session
     memory = setup_memory(
-        memory_id=memory_resource.id,
+        memory_id=memory_id,
         actor_id=actor_id,
         session_id=session_id,
     )
 
+    # backpressure: if memory writes have fallen behind, give the writer a moment before adding more
+    await memory_writer.wait_for_capacity()
+
     # get user input prompt
     user_input = payload.get("prompt")
     print(f"User query: '{user_input}'")
 
-    mcp_header = {"Authorization": f"Bearer {os.getenv('MAPBOX_API_KEY')}"}
-
-    with MCPClient(
-        lambda: streamable_http_client(
-            url="https://mcp.mapbox.com/mcp",
-            http_client=httpx.AsyncClient(headers=mcp_header),
-        ),
-        tool_filters={"allowed": [
-            "directions_tool",
-            # "reverse_geocode_tool",
-        ]}
-    ) as mcp_client:
-        directions_tool = mcp_client.list_tools_sync()
-
-        # create single agent with memory
-        agent = Agent(
-            name="nsw_fuel_agent",
-            description="Agent to help answer user questions about fuel prices and location information across gas stations in NSW",
-            model=model,
-            system_prompt=SYSTEM_PROMPT,
-            tools=[
-                geocode_location, 
-                fuel_tools.get_prices_for_location, 
-                fuel_tools.get_nearby_prices, 
-                fuel_tools.get_price_at_station,
-                directions_tool,
-            ],
-            hooks=[MemoryHook(session_id, memory)],
-            state={"actor_id": actor_id, "session_id": session_id}
-        )
-
-        try:
-            tool_name = None
-            async for event in agent.stream_async(user_input):
-                # Monitor tool use
-                if "current_tool_use" in event and tool_name != event["current_tool_use"]["name"]:
-                    tool_name = event["current_tool_use"]["name"]
-                    yield f"🛠️ - Using tool: {tool_name}"
-
-                # Stream text output
-                if "data" in event:
-                    yield event["data"]
-
-                # Get final result
-                if "result" in event:
-                    result = event["result"]
-                    print(f"\nAgent work complete status: {result.stop_reason}")
-
-        except Exception as err:
-            raise err
-    
+    # answer simple prompts directly; anything ambiguous falls through to the agent
+    route = await fast_path.route(
+        user_input,
+        # a "near me" question may refer to a location given in an earlier turn; only the local
+        # session cache is consulted, and a session not cached here counts as having history
+        # so the question goes to the agent instead of waiting on AgentCore memory
+        has_history=lambda: session_context.peek((actor_id, session_id)) != [],
+    )
+    if route is not None:
+        print(f"Fast path answered '{route.intent}' without the model")
+        for line in route.answer.splitlines(keepends=True):
+            yield line
+        remember_turn(memory, actor_id, session_id, user_input, route.answer)
+        return
+
+    # long-lived Mapbox MCP connection; tools are cached and reused across turns, and a
+    # reconnect or health check runs in a worker thread instead of blocking the event loop
+    directions_tool = await mapbox_mcp.get_tools_async()
+
+    # create single agent with memory
+    agent = Agent(
+        name="nsw_fuel_agent",
+        description="Agent to help answer user questions about fuel prices and location information across gas stations in NSW",
+        model=model,
+        system_prompt=SYSTEM_PROMPT,
+        tools=[
+            geocode_location, 
+            fuel_tools.get_prices_for_location, 
+            fuel_tools.get_nearby_prices, 
+            fuel_tools.get_price_at_station,
+            fuel_tools.get_prices_at_stations,
+            fuel_tools.get_price_history,
+            directions_tool,
+        ],
+        hooks=[MemoryHook(session_id, memory)],
+        state={"actor_id": actor_id, "session_id": session_id}
+    )
+
+    try:
+        tool_name = None
+        async for event in agent.stream_async(user_input):
+            # Monitor tool use
+            if "current_tool_use" in event and tool_name != event["current_tool_use"]["name"]:
+                tool_name = event["current_tool_use"]["name"]
+                yield f"🛠️ - Using tool: {tool_name}"
+
+            # Stream text output
+            if "data" in event:
+                yield event["data"]
+
+            # Get final result
+            if "result" in event:
+                result = event["result"]
+                print(f"\nAgent work complete status: {result.stop_reason}")
+                record_usage(result)
+
+    except Exception as err:
+        raise err
+
 
 if __name__ == "__main__":
     print("Agent is running...")
@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+import logging
+import weakref
+from typing import Awaitable, Callable, Dict, Optional
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# refresh this many seconds before the token expires
+TOKEN_REFRESH_MARGIN = float(os.getenv("NSW_TOKEN_REFRESH_MARGIN", "300"))
+# used when the token response carries no (or an unparseable) expires_in
+DEFAULT_TOKEN_TTL = float(os.getenv("NSW_TOKEN_DEFAULT_TTL", "3600"))
+
+
+class TokenError(Exception):
+    """Raised when an access token could not be obtained."""
+
+
+class TokenManager:
+    """
+    Caches an OAuth access token together with its expiry.
+
+    - Tokens inside the refresh margin are still served while a background refresh runs
+    - Expired (or invalidated) tokens block callers until a new one is fetched
+    - Concurrent callers share a single in-flight refresh (single-flight)
+    """
+    def __init__(self, fetch_token: Callable[[], Awaitable[Dict]], refresh_margin: float = TOKEN_REFRESH_MARGIN):
+        """
+        :param fetch_token: Coroutine function returning the raw token response,
+                            i.e. a dict with `access_token` and `expires_in` keys
+        :param refresh_margin: Seconds before expiry at which the token is refreshed
+        """
+        self._fetch_token = fetch_token
+        self.refresh_margin = refresh_margin
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        # asyncio tasks belong to a single event loop, so in-flight refreshes are tracked per loop
+        self._inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+        self.metrics = Metrics("nsw_token")
+
+    @property
+    def expires_in(self) -> float:
+        """Seconds until the cached token expires (negative once expired)."""
+        return self._expires_at - time.monotonic()
+
+    async def get_token(self) -> str:
+        """
+        Return a valid access token, refreshing it if needed.
+        """
+        if self._token is not None:
+            remaining = self.expires_in
+            if remaining > self.refresh_margin:
+                self.metrics.incr("cache_hits")
+                return self._token
+            if remaining > 0:
+                # still usable: serve it and refresh in the background
+                self.metrics.incr("cache_hits")
+                self._refresh_task(background=True)
+                return self._token
+        return await self.refresh()
+
+    async def refresh(self) -> str:
+        """
+        Fetch a new token, joining any refresh already in flight on this loop.
+        """
+        return await asyncio.shield(self._refresh_task())
+
+    def invalidate(self, token: Optional[str] = None):
+        """
+        Mark the cached token as expired, e.g. after the API answered 401.
+
+        :param token: The token that was rejected. If the cache already holds a
+                      newer token (another caller refreshed it), nothing happens.
+        """
+        if (token is None or token == self._token) and self._expires_at:
+            self._expires_at = 0.0
+            self.metrics.incr("invalidations")
+
+    def _refresh_task(self, background: bool = False) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._inflight.get(loop)
+        if task is not None and not task.done():
+            self.metrics.incr("refresh_joins")
+            return task
+        task = loop.create_task(self._do_refresh())
+        # retrieve exceptions of background refreshes so they are not reported as unhandled
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[loop] = task
+        if background:
+            self.metrics.incr("background_refreshes")
+        return task
+
+    async def _do_refresh(self) -> str:
+        start = time.perf_counter()
+        try:
+            response = await self._fetch_token()
+            token = response["access_token"] if response else None
+            if not token:
+                raise TokenError("Token endpoint returned no access_token")
+        except Exception as err:
+            self.metrics.incr("refresh_failures")
+            logger.error(f"Failed to refresh NSW Fuel API token: {err}")
+            raise
+        finally:
+            self.metrics.observe("refresh_latency", (time.perf_counter() - start) * 1000)
+
+        try:
+            ttl = float(response.get("expires_in", DEFAULT_TOKEN_TTL))
+        except (TypeError, ValueError):
+            ttl = DEFAULT_TOKEN_TTL
+        self._token = token
+        self._expires_at = time.monotonic() + ttl
+        self.metrics.incr("refreshes")
+        logger.info(f"Refreshed NSW Fuel API token, expires in {ttl:.0f}s")
+        return token
@@ -5,7 +5,7 @@ source .env
 # agentcore configure -e agents/agent.py
 
 # launch
-agentcore launch --env NSW_API_KEY=$NSW_API_KEY --env NSW_AUTH_HEADER=$NSW_AUTH_HEADER --env OPENAI_API_KEY=$OPENAI_API_KEY --env MAPBOX_API_KEY=$MAPBOX_API_KEY --env AWS_REGION=us-east-1
+agentcore launch --env NSW_API_KEY=$NSW_API_KEY --env NSW_AUTH_HEADER=$NSW_AUTH_HEADER --env OPENAI_API_KEY=$OPENAI_API_KEY --env MAPBOX_API_KEY=$MAPBOX_API_KEY --env AWS_REGION=us-east-1 --env AGENTCORE_MEMORY_ID=$AGENTCORE_MEMORY_ID
 
 # check deployment status
 agentcore status
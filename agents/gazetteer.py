@@ -0,0 +1,235 @@
+import os
+import re
+import csv
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from cache import LRUCache
+from metrics import Metrics
+from models import Coordinates
+
+logger = logging.getLogger(__name__)
+
+GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "nsw_localities.csv")
+)
+GAZETTEER_ENABLED = os.getenv("GAZETTEER_ENABLED", "true").lower() == "true"
+# names shorter than this must match exactly; longer ones may be misspelled by one edit, or two from twice this length
+GAZETTEER_FUZZY_MIN_LENGTH = int(os.getenv("GAZETTEER_FUZZY_MIN_LENGTH", "5"))
+# fuzzy results (including misses) are remembered per name, so a repeated typo skips the trie walk
+GAZETTEER_FUZZY_CACHE_SIZE = int(os.getenv("GAZETTEER_FUZZY_CACHE_SIZE", "1024"))
+
+# words that qualify a locality without changing it, e.g. "Hamilton NSW 2303, Australia"
+_QUALIFIERS = {"nsw", "australia", "postcode"}
+_STATE = re.compile(r"\bnew south wales\b")
+_POSTCODE = re.compile(r"^2\d{3}$")
+_SEPARATORS = re.compile(r"[.;:]")
+
+
+@dataclass(frozen=True)
+class Locality:
+    name: str
+    postcode: str
+    coordinates: Coordinates
+
+
+class _Node:
+    __slots__ = ("children", "name", "localities")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.name: Optional[str] = None
+        self.localities: List[Locality] = []
+
+
+class LocalityTrie:
+    """
+    Character trie over normalized locality names. Besides exact lookups it
+    finds every name within a few edits of a query in one walk, computing a
+    Levenshtein row per node and pruning branches that can no longer match.
+    """
+    def __init__(self):
+        self.root = _Node()
+        self.size = 0
+
+    def insert(self, name: str, locality: Locality):
+        node = self.root
+        for char in name:
+            node = node.children.setdefault(char, _Node())
+        if node.name is None:
+            node.name = name
+            self.size += 1
+        node.localities.append(locality)
+
+    def get(self, name: str) -> List[Locality]:
+        node = self.root
+        for char in name:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.localities
+
+    def search(self, name: str, max_edits: int) -> List[Tuple[int, str, List[Locality]]]:
+        """
+        (edit distance, name, localities) for every name within `max_edits` of `name`
+        that starts with the same letter; misspellings rarely change the first one
+        and this skips most of the trie.
+        """
+        results: List[Tuple[int, str, List[Locality]]] = []
+        child = self.root.children.get(name[:1])
+        if child is not None:
+            first_row = list(range(len(name) + 1))
+            self._search(child, name[0], name, first_row, max_edits, results)
+        return sorted(results, key=lambda result: result[0])
+
+    def _search(self, node: _Node, char: str, name: str, previous: List[int], max_edits: int, results: List):
+        row = [previous[0] + 1]
+        for column in range(1, len(name) + 1):
+            row.append(min(
+                row[column - 1] + 1,
+                previous[column] + 1,
+                previous[column - 1] + (name[column - 1] != char),
+            ))
+        if row[-1] <= max_edits and node.name is not None:
+            results.append((row[-1], node.name, node.localities))
+        if min(row) <= max_edits:
+            for next_char, child in node.children.items():
+                self._search(child, next_char, name, row, max_edits, results)
+
+
+def _normalize(text: str) -> str:
+    text = _SEPARATORS.sub(" ", text.lower())
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class Gazetteer:
+    """
+    Offline geocoder for NSW suburbs, localities and postcodes.
+
+    Resolves inputs such as "Parramatta", "2150", "Newtown, Sydney" or
+    "Hamilton NSW 2303" to the locality's centroid from a bundled CSV
+    (locality, postcode, latitude, longitude), with one or two typos
+    tolerated in longer names. Postcodes resolve to the mean of their
+    localities. Anything with a street number, or a name that is unknown or
+    ambiguous, returns None so the caller can ask Mapbox instead.
+    """
+    def __init__(
+            self,
+            path: Optional[str] = GAZETTEER_PATH,
+            fuzzy_min_length: int = GAZETTEER_FUZZY_MIN_LENGTH,
+            fuzzy_cache_size: int = GAZETTEER_FUZZY_CACHE_SIZE,
+        ):
+        """
+        :param path: CSV file with locality, postcode, latitude and longitude columns. None loads nothing
+        :param fuzzy_min_length: Names shorter than this are only matched exactly
+        :param fuzzy_cache_size: Number of fuzzy lookups remembered
+        """
+        self.fuzzy_min_length = fuzzy_min_length
+        self._fuzzy = LRUCache("gazetteer_fuzzy", maxsize=fuzzy_cache_size)
+        self.trie = LocalityTrie()
+        self.postcodes: Dict[str, Coordinates] = {}
+        self.metrics = Metrics("gazetteer")
+        if path:
+            self._load(path)
+
+    def _load(self, path: str):
+        try:
+            with open(path, newline="", encoding="utf-8") as file:
+                rows = list(csv.DictReader(file))
+        except OSError as err:
+            logger.warning(f"Gazetteer at {path} unavailable, every address goes to Mapbox: {err}")
+            return
+        by_postcode: Dict[str, List[Coordinates]] = {}
+        for row in rows:
+            coordinates = Coordinates(latitude=float(row["latitude"]), longitude=float(row["longitude"]))
+            locality = Locality(row["locality"], row["postcode"], coordinates)
+            self.trie.insert(_normalize(locality.name), locality)
+            by_postcode.setdefault(locality.postcode, []).append(coordinates)
+        for postcode, points in by_postcode.items():
+            self.postcodes[postcode] = Coordinates(
+                latitude=round(sum(point.latitude for point in points) / len(points), 4),
+                longitude=round(sum(point.longitude for point in points) / len(points), 4),
+            )
+        logger.info(f"Loaded gazetteer with {self.trie.size} localities and {len(self.postcodes)} postcodes")
+
+    @property
+    def local_hit_ratio(self) -> float:
+        """Share of lookups answered without Mapbox."""
+        lookups = self.metrics.get("lookups")
+        return self.metrics.get("local_hits") / lookups if lookups else 0.0
+
+    def lookup(self, address: str) -> Optional[Coordinates]:
+        """
+        Centroid of the locality or postcode `address` names, or None if it needs a real geocoder.
+        """
+        self.metrics.incr("lookups")
+        coordinates, kind = self._resolve(address)
+        if coordinates is None:
+            self.metrics.incr(kind)
+            return None
+        self.metrics.incr("local_hits")
+        self.metrics.incr(f"{kind}_hits")
+        return coordinates
+
+    def _resolve(self, address: str) -> Tuple[Optional[Coordinates], str]:
+        postcode = None
+        names = []
+        for part in _normalize(_STATE.sub(" ", address.lower())).split(","):
+            words = []
+            for word in part.split():
+                if _POSTCODE.match(word):
+                    postcode = word
+                elif any(char.isdigit() for char in word):
+                    # street number, unit or a postcode outside NSW
+                    return None, "street_addresses"
+                elif word not in _QUALIFIERS:
+                    words.append(word)
+            if words:
+                names.append(" ".join(words))
+
+        if not names:
+            if postcode in self.postcodes:
+                return self.postcodes[postcode], "postcode"
+            return None, "misses"
+
+        # "Newtown, Sydney" -> "newtown sydney", "newtown"; "Newtown Sydney" -> "newtown"
+        candidates = [" ".join(names), names[0]]
+        candidates += [name[:-len(" sydney")] for name in candidates if name.endswith(" sydney")]
+        for name in dict.fromkeys(candidates):
+            localities, kind = self._match(name)
+            if localities:
+                in_postcode = [locality for locality in localities if locality.postcode == postcode]
+                if postcode and not in_postcode:
+                    # the name exists but not in the given postcode; trust the postcode
+                    if postcode in self.postcodes:
+                        return self.postcodes[postcode], "postcode"
+                    return None, "misses"
+                return (in_postcode or localities)[0].coordinates, kind
+            if kind == "ambiguous":
+                return None, kind
+        return None, "misses"
+
+    def _match(self, name: str) -> Tuple[List[Locality], str]:
+        localities = self.trie.get(name)
+        if localities:
+            return localities, "exact"
+        if len(name) < self.fuzzy_min_length:
+            return [], "misses"
+        cached = self._fuzzy.get(name)
+        if cached is None:
+            cached = self._fuzzy_match(name)
+            self._fuzzy.set(name, cached)
+        return cached
+
+    def _fuzzy_match(self, name: str) -> Tuple[List[Locality], str]:
+        max_edits = 2 if len(name) >= 2 * self.fuzzy_min_length else 1
+        matches = self.trie.search(name, max_edits)
+        if not matches:
+            return [], "misses"
+        best = [match for match in matches if match[0] == matches[0][0]]
+        if len(best) > 1:
+            # equally close to several names; let Mapbox decide
+            return [], "ambiguous"
+        return best[0][2], "fuzzy"
@@ -0,0 +1,126 @@
+import os
+import re
+import time
+import sqlite3
+import logging
+import threading
+from typing import Optional
+
+from cache import LRUCache
+from models import Coordinates
+
+logger = logging.getLogger(__name__)
+
+GEOCODE_CACHE_PATH = os.getenv(
+    "GEOCODE_CACHE_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "nsw-fuel-agent", "geocode.sqlite3")
+)
+GEOCODE_CACHE_SIZE = int(os.getenv("GEOCODE_CACHE_SIZE", "2048"))
+# addresses rarely move, so entries live for 30 days by default
+GEOCODE_CACHE_TTL = float(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+
+
+def normalize_address(address: str) -> str:
+    """
+    Canonical cache key for an address: lowercase, punctuation and a trailing
+    country name removed, whitespace collapsed.
+    e.g. "159-175 Church St,  Parramatta NSW 2150, Australia" -> "159-175 church st parramatta nsw 2150"
+    """
+    key = address.lower()
+    key = re.sub(r"[,.;:]", " ", key)
+    key = re.sub(r"\s+", " ", key).strip()
+    key = re.sub(r"\s*\baustralia$", "", key)
+    return key
+
+
+class GeocodeCache:
+    """
+    Two-tier geocode cache: a bounded in-memory LRU in front of a SQLite store
+    that survives restarts. Both tiers share the same TTL.
+    """
+    def __init__(self, path: Optional[str] = GEOCODE_CACHE_PATH, maxsize: int = GEOCODE_CACHE_SIZE, ttl: float = GEOCODE_CACHE_TTL):
+        """
+        :param path: SQLite file for the persistent tier. None keeps the cache in memory only
+        :param maxsize: Maximum number of addresses held in memory
+        :param ttl: Seconds a geocoded address stays valid
+        """
+        self.ttl = ttl
+        self.memory = LRUCache("geocode_cache", maxsize=maxsize, ttl=ttl)
+        self.metrics = self.memory.metrics
+        self._lock = threading.Lock()
+        self._db = self._open(path) if path else None
+
+    def _open(self, path: str) -> Optional[sqlite3.Connection]:
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode ("
+                "address TEXT PRIMARY KEY, latitude REAL NOT NULL, longitude REAL NOT NULL, created_at REAL NOT NULL)"
+            )
+            return db
+        except sqlite3.Error as err:
+            logger.warning(f"Geocode cache at {path} unavailable, using memory only: {err}")
+            return None
+
+    def get(self, address: str) -> Optional[Coordinates]:
+        """
+        Look up an address in memory, then on disk. Disk hits are promoted to memory.
+        """
+        key = normalize_address(address)
+        coordinates = self.memory.get(key, count=False)
+        if coordinates is not None:
+            self.metrics.incr("hits")
+            self.metrics.incr("memory_hits")
+            return coordinates
+
+        if self._db is not None:
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT latitude, longitude, created_at FROM geocode WHERE address = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                age = time.time() - row[2]
+                if age < self.ttl:
+                    coordinates = Coordinates(latitude=row[0], longitude=row[1])
+                    self.memory.set(key, coordinates, ttl=self.ttl - age)
+                    self.metrics.incr("hits")
+                    self.metrics.incr("disk_hits")
+                    return coordinates
+                self.metrics.incr("expirations")
+
+        self.metrics.incr("misses")
+        return None
+
+    def set(self, address: str, coordinates: Coordinates):
+        key = normalize_address(address)
+        self.memory.set(key, coordinates)
+        if self._db is not None:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO geocode (address, latitude, longitude, created_at) VALUES (?, ?, ?, ?)",
+                    (key, coordinates.latitude, coordinates.longitude, time.time())
+                )
+
+    def warm_up(self, limit: Optional[int] = None) -> int:
+        """
+        Load the most recently stored, unexpired addresses from disk into memory.
+
+        :param limit: Maximum number of addresses to load (defaults to the memory tier size)
+        :return: Number of addresses loaded
+        """
+        if self._db is None:
+            return 0
+        limit = limit or self.memory.maxsize
+        now = time.time()
+        with self._lock:
+            self._db.execute("DELETE FROM geocode WHERE created_at < ?", (now - self.ttl,))
+            rows = self._db.execute(
+                "SELECT address, latitude, longitude, created_at FROM geocode ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        # insert oldest first so the newest end up most recently used
+        for address, latitude, longitude, created_at in reversed(rows):
+            self.memory.set(address, Coordinates(latitude=latitude, longitude=longitude), ttl=self.ttl - (now - created_at))
+        logger.info(f"Warmed geocode cache with {len(rows)} addresses")
+        return len(rows)
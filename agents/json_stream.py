@@ -0,0 +1,126 @@
+import re
+import json
+import codecs
+from typing import AsyncIterator, Iterable, List, Set, Tuple
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# characters a JSON number can continue with
+_NUMBER_CHARS = re.compile(r"[0-9.eE+-]*")
+
+# parser states
+_START, _KEY, _COLON, _VALUE, _ARRAY, _DONE = range(6)
+
+
+class JSONArrayStream:
+    """
+    Incremental decoder for a top-level JSON object whose interesting values are
+    arrays, e.g. {"stations": [...], "prices": [...]}.
+
+    Text is fed in arbitrary chunks; each element of an array under one of
+    `keys` is returned as soon as it is complete, together with its key. Only
+    the current unfinished element and the chunk it started in are buffered,
+    so memory stays roughly constant however long the arrays are. Values under other keys are decoded
+    and discarded.
+    """
+    def __init__(self, keys: Iterable[str]):
+        self.keys: Set[str] = set(keys)
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._state = _START
+        self._key = None
+
+    def _skip_whitespace(self) -> bool:
+        """Advance past whitespace; False if the buffer is exhausted."""
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+        return self._pos < len(self._buffer)
+
+    def _decode(self, final: bool):
+        """
+        Decode one value at the current position, or return None if it is not
+        complete yet. A number running to the end of the buffer waits for the
+        next chunk, so one split across chunks ("12" + "3.4", "12." + "5e3")
+        is not cut short.
+        """
+        if not final and _NUMBER_CHARS.match(self._buffer, self._pos).end() >= len(self._buffer):
+            return None
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+        self._pos = end
+        return (value,)
+
+    def feed(self, text: str, final: bool = False) -> List[Tuple[str, object]]:
+        """
+        Add text and return the (key, element) pairs completed by it.
+        Pass final=True with the last chunk to flush and validate the end of the document.
+        """
+        # drop consumed text only once it is most of the buffer, so leftovers are not re-copied on every feed
+        if self._pos > len(self._buffer) // 2:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        self._buffer += text
+        items = []
+        while self._state != _DONE and self._skip_whitespace():
+            char = self._buffer[self._pos]
+            if self._state == _START:
+                if char != "{":
+                    raise ValueError(f"Expected a JSON object, got {char!r}")
+                self._pos += 1
+                self._state = _KEY
+            elif self._state == _KEY:
+                if char == ",":
+                    self._pos += 1
+                elif char == "}":
+                    self._pos += 1
+                    self._state = _DONE
+                else:
+                    decoded = self._decode(final)
+                    if decoded is None:
+                        break
+                    self._key = decoded[0]
+                    self._state = _COLON
+            elif self._state == _COLON:
+                if char != ":":
+                    raise ValueError(f"Expected ':' after key {self._key!r}, got {char!r}")
+                self._pos += 1
+                self._state = _VALUE
+            elif self._state == _VALUE:
+                if char == "[" and self._key in self.keys:
+                    self._pos += 1
+                    self._state = _ARRAY
+                else:
+                    if self._decode(final) is None:
+                        break
+                    self._state = _KEY
+            elif self._state == _ARRAY:
+                if char == ",":
+                    self._pos += 1
+                elif char == "]":
+                    self._pos += 1
+                    self._state = _KEY
+                else:
+                    decoded = self._decode(final)
+                    if decoded is None:
+                        break
+                    items.append((self._key, decoded[0]))
+        if final and self._state != _DONE:
+            raise ValueError("Truncated JSON document")
+        return items
+
+
+async def iter_json_arrays(chunks: AsyncIterator[bytes], keys: Iterable[str]) -> AsyncIterator[Tuple[str, object]]:
+    """
+    Yield (key, element) for every element of the arrays under `keys` in a
+    JSON object delivered as a stream of byte chunks (e.g. `response.aiter_bytes()`).
+    """
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    stream = JSONArrayStream(keys)
+    async for chunk in chunks:
+        for item in stream.feed(utf8.decode(chunk)):
+            yield item
+    for item in stream.feed(utf8.decode(b"", final=True), final=True):
+        yield item
@@ -0,0 +1,158 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import httpx
+from strands.tools.mcp import MCPClient
+from strands.tools.mcp.mcp_agent_tool import MCPAgentTool
+from mcp.client.streamable_http import streamable_http_client
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+MAPBOX_MCP_URL = os.getenv("MAPBOX_MCP_URL", "https://mcp.mapbox.com/mcp")
+# seconds between tool-list round trips that double as a liveness check
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "300"))
+# after a failed connect, wait this long before trying again (turns run without MCP tools meanwhile)
+MCP_RECONNECT_BACKOFF = float(os.getenv("MCP_RECONNECT_BACKOFF", "5"))
+
+
+class PersistentMCPClient:
+    """
+    One long-lived MCP connection shared by every invocation.
+
+    The session is opened once and its tool list cached. `get_tools` reuses
+    both while the connection's background thread is alive; the tool list is
+    re-fetched every `health_check_interval` seconds, which also verifies the
+    server still answers. A dead or failing connection is restarted on the
+    same `MCPClient` instance, so tools handed out earlier stay bound to it.
+    If the server cannot be reached, `get_tools` returns an empty list and
+    the agent runs without MCP tools until a later retry succeeds.
+
+    `get_tools` blocks while it connects or health-checks; async callers use
+    `get_tools_async`, which returns the cached list directly and moves any
+    blocking work off the event loop.
+    """
+    def __init__(
+            self,
+            transport: Callable,
+            tool_filters: Optional[dict] = None,
+            name: str = "mcp",
+            health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+            reconnect_backoff: float = MCP_RECONNECT_BACKOFF,
+        ):
+        """
+        :param transport: Factory returning a fresh MCP transport; called on every (re)connect
+        :param tool_filters: Passed to `MCPClient`
+        :param name: Name the connection's metrics are registered under
+        :param health_check_interval: Seconds between tool-list refreshes of a live connection
+        :param reconnect_backoff: Seconds to wait after a failed connect before retrying
+        """
+        self.client = MCPClient(transport, tool_filters=tool_filters)
+        self.health_check_interval = health_check_interval
+        self.reconnect_backoff = reconnect_backoff
+        self._tools: Optional[List[MCPAgentTool]] = None
+        self._connected = False
+        self._checked_at = 0.0
+        self._failed_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.metrics = Metrics(name)
+
+    def _alive(self) -> bool:
+        # MCPClient exposes no public liveness check; this only inspects its background thread
+        return self._connected and self.client._is_session_active()
+
+    def _connect(self):
+        if self._connected:
+            self.metrics.incr("reconnects")
+            self._disconnect()
+        start = time.perf_counter()
+        self.client.start()
+        self._connected = True
+        self._tools = list(self.client.list_tools_sync())
+        self._checked_at = time.monotonic()
+        self._failed_at = None
+        self.metrics.incr("connects")
+        self.metrics.observe("connect_latency", (time.perf_counter() - start) * 1000)
+        logger.info(f"MCP connection ready with {len(self._tools)} tools")
+
+    def _disconnect(self):
+        self._connected = False
+        try:
+            self.client.stop(None, None, None)
+        except Exception as err:
+            logger.warning(f"Error closing MCP connection: {err}")
+
+    def _health_check(self) -> bool:
+        try:
+            self._tools = list(self.client.list_tools_sync())
+            self._checked_at = time.monotonic()
+            self.metrics.incr("health_checks")
+            return True
+        except Exception as err:
+            self.metrics.incr("health_check_failures")
+            logger.warning(f"MCP health check failed, reconnecting: {err}")
+            return False
+
+    def get_tools(self) -> List[MCPAgentTool]:
+        """
+        Cached MCP tools on a live connection, connecting or reconnecting if needed.
+        """
+        with self._lock:
+            if self._alive() and (
+                time.monotonic() - self._checked_at < self.health_check_interval or self._health_check()
+            ):
+                self.metrics.incr("reuses")
+                return self._tools
+            if self._failed_at is not None and time.monotonic() - self._failed_at < self.reconnect_backoff:
+                self.metrics.incr("unavailable")
+                return []
+            try:
+                self._connect()
+                return self._tools
+            except Exception as err:
+                self._failed_at = time.monotonic()
+                self._tools = None
+                self._disconnect()
+                self.metrics.incr("connect_failures")
+                logger.warning(f"MCP connection failed, continuing without MCP tools: {err}")
+                return []
+
+    async def get_tools_async(self) -> List[MCPAgentTool]:
+        """
+        `get_tools` for the event loop: a live connection with a recent health
+        check answers from the cache, anything else runs in a worker thread.
+        """
+        if self._alive() and time.monotonic() - self._checked_at < self.health_check_interval:
+            self.metrics.incr("reuses")
+            return self._tools
+        if not self._connected and self._failed_at is not None and time.monotonic() - self._failed_at < self.reconnect_backoff:
+            self.metrics.incr("unavailable")
+            return []
+        return await asyncio.to_thread(self.get_tools)
+
+    def close(self):
+        with self._lock:
+            if self._connected:
+                self._disconnect()
+            self._tools = None
+
+
+def create_mapbox_mcp_client(tool_filters: Optional[dict] = None) -> PersistentMCPClient:
+    """
+    Persistent client for the Mapbox MCP server. A new httpx client is built on
+    every (re)connect because it belongs to the connection's own event loop.
+    """
+    headers = {"Authorization": f"Bearer {os.getenv('MAPBOX_API_KEY')}"}
+    return PersistentMCPClient(
+        lambda: streamable_http_client(
+            url=MAPBOX_MCP_URL,
+            http_client=httpx.AsyncClient(headers=headers),
+        ),
+        tool_filters=tool_filters,
+        name="mapbox_mcp",
+    )
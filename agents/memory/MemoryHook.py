@@ -1,4 +1,5 @@
 from strands.hooks import (
+    AfterInvocationEvent,
     AgentInitializedEvent, 
     HookProvider, 
     HookRegistry,
@@ -6,49 +7,58 @@ from strands.hooks import (
 )
 from bedrock_agentcore.memory.constants import ConversationalMessage, MessageRole
 from bedrock_agentcore.memory.session import MemorySession
+from memory.writer import MemoryWriter, memory_writer
+from memory.context_cache import SessionContextCache, session_context
+from memory.context_builder import ContextBuilder, as_agent_messages, context_builder
 
 
 class MemoryHook(HookProvider):
     """
     Class to automate memory operations using the MemorySession. The MemoryHook class
-    1. Loads most recent conversation (via AgentInitializedEvent)
-    2. Stores the last message (via the session manager)
+    1. Loads most recent conversation (via AgentInitializedEvent) into the agent's messages,
+       from the in-process session cache when this process served the previous turn
+    2. Queues each new message for a batched background write, flushed when the turn ends
     """
-    def __init__(self, session_id: str, memory_session: MemorySession):
+    def __init__(
+            self,
+            session_id: str,
+            memory_session: MemorySession,
+            writer: MemoryWriter = memory_writer,
+            context_cache: SessionContextCache = session_context,
+            builder: ContextBuilder = context_builder,
+        ):
         self.session_id = session_id
         self.memory_session = memory_session
+        self.writer = writer
+        self.context_cache = context_cache
+        self.builder = builder
+
+    def _cache_key(self, event) -> tuple:
+        return (event.agent.state.get("actor_id"), self.session_id)
     
     def on_agent_initialized(self, event: AgentInitializedEvent):
         """
-        Loads the most recent conversation history when agent starts using MemorySession
+        Loads the most recent conversation history as leading messages when agent starts using MemorySession
         """
         try:
-            most_recent_convo = self.memory_session.get_last_k_turns(k=5)
-            # format conversation history
+            most_recent_convo = self.context_cache.get_last_k_turns(self._cache_key(event), self.memory_session, k=5)
+            # format conversation history within the token budget
             if most_recent_convo:
-                context_msgs = []
-                for turn in most_recent_convo:
-                    print("Turn:", turn)
-                    for message in turn:
-                        print("- Message:", message)
-                        if hasattr(message, 'role') and hasattr(message, 'content'):
-                            role = message['role']
-                            content = message['content']
-                        else:
-                            role = message.get('role', 'unknown')
-                            content = message.get('content', {}).get('text', '')
-                        context_msgs.append(f"{role}: {content}")
-                # format context messages to single string
-                context = "\n".join(context_msgs)
-                # Add context to agent's system prompt
-                event.agent.system_prompt += f"\n\nRecent conversation:\n{context}"
-                print(f"✅ Loaded {len(most_recent_convo)} conversation turns using MemorySession")
+                messages, stats = self.builder.build_messages(most_recent_convo)
+                # Prepend history to the conversation rather than the system prompt, so the
+                # system prompt stays byte-identical across turns and provider prompt caching can hit
+                event.agent.messages[:0] = as_agent_messages(messages)
+                print(
+                    f"✅ Loaded {stats['turns_kept']}/{stats['turns']} conversation turns using MemorySession "
+                    f"(~{stats['context_tokens']} tokens, {stats['tokens_saved']} saved)"
+                )
         except Exception as e:
             print(f"Memory load error: {e}")
 
     def on_message_added(self, event: MessageAddedEvent):
         """
-        Stores new conversational messages via MemorySession
+        Queues new conversational messages for the background memory writer,
+        so the remote write is never on the response path
         """
         messages = event.agent.messages
 
@@ -56,19 +66,22 @@ class MemoryHook(HookProvider):
             if messages and len(messages) > 0 and messages[-1]["content"][0].get("text"):
                 message_text = messages[-1]["content"][0]["text"]
                 message_role = MessageRole.USER if messages[-1]["role"] == "user" else MessageRole.ASSISTANT
-                # Use memory session instance to add message
-                result = self.memory_session.add_turns(
-                    messages=[ConversationalMessage(message_text, message_role)]
-                )
-                print(f"✅ Stored message with Event ID: {result['eventId']}, Role: {message_role.value}")
+                self.writer.add(self.memory_session, ConversationalMessage(message_text, message_role))
+                self.context_cache.append(self._cache_key(event), message_role, message_text)
         except Exception as e:
             print(f"Memory save error: {e}")
-            raise
+
+    def on_after_invocation(self, event: AfterInvocationEvent):
+        """
+        Writes the turn's messages as one batch once the agent has answered
+        """
+        self.writer.flush(self.memory_session)
     
     def register_hooks(self, registry: HookRegistry):
         """
         Register memory hooks
         """
         registry.add_callback(MessageAddedEvent, self.on_message_added)
+        registry.add_callback(AfterInvocationEvent, self.on_after_invocation)
         registry.add_callback(AgentInitializedEvent, self.on_agent_initialized)
         print("✅ Memory hooks registered!")
\ No newline at end of file
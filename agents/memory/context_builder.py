@@ -0,0 +1,173 @@
+import os
+import re
+from typing import Dict, List, Set, Tuple
+
+from metrics import Metrics
+from tokens import estimate_tokens
+
+# approximate token budget for the recalled conversation
+MEMORY_CONTEXT_TOKEN_BUDGET = int(os.getenv("MEMORY_CONTEXT_TOKEN_BUDGET", "1200"))
+# the most recent turns are kept verbatim; older ones are compacted
+MEMORY_CONTEXT_FULL_TURNS = int(os.getenv("MEMORY_CONTEXT_FULL_TURNS", "1"))
+# an older message still longer than this (tokens) after compaction is truncated
+MEMORY_CONTEXT_MAX_MESSAGE_TOKENS = int(os.getenv("MEMORY_CONTEXT_MAX_MESSAGE_TOKENS", "150"))
+
+# e.g. "- **E10:** 221.5 c/L"
+_PRICE = re.compile(r"\d{2,3}(?:\.\d+)?\s*(?:c/L|c/l|¢|cents)")
+_FUEL_PRICE = re.compile(r"([A-Za-z0-9][A-Za-z0-9 ()]*?):?\*{0,2}:?\s*(\d{2,3}(?:\.\d+)?)\s*(?:c/L|c/l|¢|cents)")
+_ADDRESS = re.compile(r"address\W*\s*(.+)$", re.IGNORECASE)
+_HEADING = re.compile(r"^\s*(?:#{1,6}\s|\d+\)\s)")
+_WHITESPACE = re.compile(r"\s+")
+_TRUNCATED = " …[truncated]"
+
+
+def _message_text(message) -> Tuple[str, str]:
+    role = message.get('role', 'unknown')
+    content = message.get('content', {})
+    text = content.get('text', '') if isinstance(content, dict) else str(content)
+    return role, text
+
+
+def _blocks(text: str) -> List[List[str]]:
+    """Split a message into paragraphs; a heading or blank line starts a new one."""
+    blocks: List[List[str]] = []
+    for line in text.split("\n"):
+        if not blocks or not line.strip() or _HEADING.match(line):
+            blocks.append([line])
+        else:
+            blocks[-1].append(line)
+    return blocks
+
+
+def _summarize_listing(block: List[str]) -> List[str]:
+    """Collapse a station listing to one line: its heading, address and fuel prices."""
+    lines = [line.replace("*", "") for line in block if line.strip()]
+    heading = lines[0].strip()
+    for line in lines[1:]:
+        address = _ADDRESS.search(line)
+        if address:
+            heading = f"{heading} ({address.group(1).strip()})"
+            break
+    prices = [f"{fuel.strip()} {price}" for line in lines[1:] for fuel, price in _FUEL_PRICE.findall(line)]
+    return [f"{heading}: {', '.join(prices)} c/L" if prices else heading]
+
+
+class ContextBuilder:
+    """
+    Formats recalled conversation turns as text within a token budget.
+
+    Turns are taken newest first until the budget is spent. In assistant
+    messages, a station listing (a paragraph with prices in c/L) that already
+    appears in a newer message is dropped. Turns older than `full_turns`
+    have each listing collapsed to a single line, and any of their messages
+    still over `max_message_tokens` is truncated. The returned stats compare
+    the result with the raw transcript of every turn.
+    """
+    def __init__(
+            self,
+            token_budget: int = MEMORY_CONTEXT_TOKEN_BUDGET,
+            full_turns: int = MEMORY_CONTEXT_FULL_TURNS,
+            max_message_tokens: int = MEMORY_CONTEXT_MAX_MESSAGE_TOKENS,
+        ):
+        self.token_budget = token_budget
+        self.full_turns = full_turns
+        self.max_message_tokens = max_message_tokens
+        self.metrics = Metrics("memory_context")
+
+    def _compact(self, text: str, seen: Set[str], old: bool, stats: Dict) -> str:
+        lines: List[str] = []
+        for block in _blocks(text):
+            if not any(_PRICE.search(line) for line in block):
+                lines.extend(block)
+                continue
+            key = _WHITESPACE.sub(" ", "\n".join(block)).strip().lower()
+            if key in seen:
+                stats["duplicate_listings"] += 1
+                continue
+            seen.add(key)
+            if old:
+                stats["summarized_listings"] += 1
+                if not block[0].strip():
+                    lines.append("")
+                lines.extend(_summarize_listing(block))
+            else:
+                lines.extend(block)
+        text = "\n".join(lines).strip()
+        if old and estimate_tokens(text) > self.max_message_tokens:
+            stats["truncated_messages"] += 1
+            text = text[:self.max_message_tokens * 4].rstrip() + _TRUNCATED
+        return text
+
+    def build_messages(self, turns: List[List[Dict]]) -> Tuple[List[Tuple[str, str]], Dict]:
+        """
+        Compacted (role, text) messages for `turns` (oldest first), oldest
+        message first, and stats on what was kept.
+        """
+        stats = {"turns": len(turns), "turns_kept": 0, "duplicate_listings": 0, "summarized_listings": 0, "truncated_messages": 0}
+        raw = "\n".join(f"{role}: {text}" for turn in turns for role, text in map(_message_text, turn))
+        seen: Set[str] = set()
+        kept: List[List[Tuple[str, str]]] = []
+        used = 0
+        for age, turn in enumerate(reversed(turns)):
+            messages = []
+            for message in turn:
+                role, text = _message_text(message)
+                if role.upper() != "USER":
+                    text = self._compact(text, seen, old=age >= self.full_turns, stats=stats)
+                messages.append((role, text))
+            tokens = sum(estimate_tokens(f"{role}: {text}") for role, text in messages)
+            if used + tokens > self.token_budget:
+                if not kept:
+                    # always keep the latest turn, cut to the budget
+                    kept.append(self._truncate_turn(messages))
+                    stats["truncated_messages"] += 1
+                break
+            kept.append(messages)
+            used += tokens
+        kept.reverse()
+        messages = [message for turn in kept for message in turn]
+        stats["turns_kept"] = len(kept)
+        stats["raw_tokens"] = estimate_tokens(raw)
+        stats["context_tokens"] = sum(estimate_tokens(f"{role}: {text}") for role, text in messages)
+        stats["tokens_saved"] = max(0, stats["raw_tokens"] - stats["context_tokens"])
+        self.metrics.incr("builds")
+        self.metrics.incr("raw_tokens", stats["raw_tokens"])
+        self.metrics.incr("context_tokens", stats["context_tokens"])
+        self.metrics.incr("tokens_saved", stats["tokens_saved"])
+        return messages, stats
+
+    def _truncate_turn(self, messages: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+        remaining = self.token_budget * 4
+        truncated = []
+        for role, text in messages:
+            if remaining <= 0:
+                break
+            if len(text) > remaining:
+                text = text[:remaining].rstrip() + _TRUNCATED
+            truncated.append((role, text))
+            remaining -= len(text)
+        return truncated
+
+
+def as_agent_messages(messages: List[Tuple[str, str]]) -> List[Dict]:
+    """
+    Recalled (role, text) messages as strands conversation messages that can
+    precede a new user prompt: consecutive messages of the same role are
+    merged, and the history starts with a user and ends with an assistant message.
+    """
+    agent_messages: List[Dict] = []
+    for role, text in messages:
+        role = "user" if role.upper() == "USER" else "assistant"
+        if not text:
+            continue
+        if agent_messages and agent_messages[-1]["role"] == role:
+            agent_messages[-1]["content"][0]["text"] += f"\n{text}"
+        elif agent_messages or role == "user":
+            agent_messages.append({"role": role, "content": [{"text": text}]})
+    while agent_messages and agent_messages[-1]["role"] != "assistant":
+        agent_messages.pop()
+    return agent_messages
+
+
+# shared by every MemoryHook
+context_builder = ContextBuilder()
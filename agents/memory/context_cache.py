@@ -0,0 +1,78 @@
+import os
+import threading
+from collections import deque
+from typing import Dict, Hashable, List, Optional
+
+from bedrock_agentcore.memory.constants import MessageRole
+from bedrock_agentcore.memory.session import MemorySession
+from cache import LRUCache
+
+# turns kept per session; also the number fetched on a cold load
+SESSION_CONTEXT_TURNS = int(os.getenv("SESSION_CONTEXT_TURNS", "5"))
+SESSION_CONTEXT_CACHE_SIZE = int(os.getenv("SESSION_CONTEXT_CACHE_SIZE", "1024"))
+# an idle session's buffer is dropped after this many seconds, so a conversation
+# that continued on another replica is re-read from AgentCore memory
+SESSION_CONTEXT_TTL = float(os.getenv("SESSION_CONTEXT_TTL", "900"))
+
+
+class SessionContextCache:
+    """
+    Ring buffer of each session's most recent turns.
+
+    A session is loaded from AgentCore memory (`get_last_k_turns`) the first
+    time it is seen, or again once its buffer was evicted or expired. From then
+    on the hook's write path appends every stored message, so the next turn's
+    context is a local lookup instead of a network round trip. Turns have the
+    same shape as the remote ones: lists of {"role", "content": {"text"}} dicts,
+    a new turn starting at each user message.
+    """
+    def __init__(self, turns: int = SESSION_CONTEXT_TURNS, maxsize: int = SESSION_CONTEXT_CACHE_SIZE, ttl: float = SESSION_CONTEXT_TTL):
+        self.turns = turns
+        self._cache = LRUCache("session_context", maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self.metrics = self._cache.metrics
+
+    def get_last_k_turns(self, key: Hashable, memory_session: MemorySession, k: int = SESSION_CONTEXT_TURNS) -> List[List[Dict]]:
+        """
+        Up to `k` recent turns of a session, reading AgentCore memory only on a miss.
+        """
+        buffer = self._cache.get(key)
+        if buffer is None:
+            self.metrics.incr("remote_loads")
+            turns = memory_session.get_last_k_turns(k=max(k, self.turns))
+            buffer = deque(([dict(message) for message in turn] for turn in turns), maxlen=max(k, self.turns))
+            self._cache.set(key, buffer)
+        with self._lock:
+            return [list(turn) for turn in buffer][-k:]
+
+    def peek(self, key: Hashable) -> Optional[List[List[Dict]]]:
+        """
+        The session's buffered turns, or None if it is not buffered here.
+        Never reads AgentCore memory, so it is safe on the event loop.
+        """
+        buffer = self._cache.get(key, count=False)
+        if buffer is None:
+            return None
+        with self._lock:
+            return [list(turn) for turn in buffer]
+
+    def append(self, key: Hashable, role: MessageRole, text: str):
+        """
+        Record a message written for a session. Sessions that were never loaded
+        here are skipped: their next read has to go to AgentCore memory anyway.
+        """
+        buffer = self._cache.get(key, count=False)
+        if buffer is None:
+            return
+        message = {"role": role.value, "content": {"text": text}}
+        with self._lock:
+            if role == MessageRole.USER or not buffer:
+                buffer.append([message])
+            else:
+                buffer[-1].append(message)
+        # refresh the entry's TTL; the session is active
+        self._cache.set(key, buffer)
+
+
+# one cache per process, shared by every MemoryHook
+session_context = SessionContextCache()
@@ -1,10 +1,28 @@
 import os
+import threading
+from typing import Dict, Optional, Tuple
 from dotenv import load_dotenv
 from bedrock_agentcore_starter_toolkit.operations.memory.manager import MemoryManager
 from bedrock_agentcore.memory.session import MemorySession, MemorySessionManager
+from cache import LRUCache
 
 load_dotenv()
 
+# id of an existing memory resource (e.g. the terraform output). When set, the
+# get_or_create control-plane call is skipped entirely
+AGENTCORE_MEMORY_ID = os.getenv("AGENTCORE_MEMORY_ID") or None
+# number of (actor_id, session_id) memory sessions kept alive per process
+MEMORY_SESSION_CACHE_SIZE = int(os.getenv("MEMORY_SESSION_CACHE_SIZE", "256"))
+
+# memory name -> resolved memory id, for the lifetime of the process
+_memory_ids: Dict[str, str] = {}
+_memory_id_lock = threading.Lock()
+# (memory_id, region) -> session manager; one boto3 client serves every session
+_session_managers: Dict[Tuple[str, Optional[str]], MemorySessionManager] = {}
+_session_manager_lock = threading.Lock()
+# (actor_id, session_id) -> MemorySession
+memory_sessions = LRUCache("memory_sessions", maxsize=MEMORY_SESSION_CACHE_SIZE)
+
 
 def create_memory_resource(memory_name: str, region: str = os.getenv("AWS_REGION")):
     # create short-term memory resource that will be shared between our subagents
@@ -56,13 +74,49 @@ def create_memory_session(
     return memory_session
 
 
-def setup_memory(memory_id: str, actor_id: str, session_id: str) -> MemorySession:
-    session_manager = MemorySessionManager(memory_id=memory_id, region_name=os.getenv("AWS_REGION"))
+def get_memory_id(memory_name: str, region: str = os.getenv("AWS_REGION")) -> str:
+    """
+    Resolve the memory resource id once per process. AGENTCORE_MEMORY_ID wins;
+    otherwise the resource is looked up (or created) by name on first use.
+    """
+    if AGENTCORE_MEMORY_ID:
+        return AGENTCORE_MEMORY_ID
+    memory_id = _memory_ids.get(memory_name)
+    if memory_id is None:
+        with _memory_id_lock:
+            memory_id = _memory_ids.get(memory_name)
+            if memory_id is None:
+                memory_id = _memory_ids[memory_name] = create_memory_resource(memory_name=memory_name, region=region).id
+    return memory_id
 
-    # use same session id for different agents to share memory
-    assistant_memory_session = create_memory_session(
-        actor_id=actor_id,
-        session_id=session_id,
-        memory_session_manager=session_manager
-    )
+
+def get_session_manager(memory_id: str, region: str = os.getenv("AWS_REGION")) -> MemorySessionManager:
+    """
+    Shared session manager for a memory resource.
+    """
+    key = (memory_id, region)
+    session_manager = _session_managers.get(key)
+    if session_manager is None:
+        with _session_manager_lock:
+            session_manager = _session_managers.get(key)
+            if session_manager is None:
+                session_manager = _session_managers[key] = MemorySessionManager(memory_id=memory_id, region_name=region)
+    return session_manager
+
+
+def setup_memory(memory_id: str, actor_id: str, session_id: str) -> MemorySession:
+    """
+    Memory session for an actor/session pair. Sessions are reused across
+    invocations from a bounded LRU; only a cache miss creates a new one.
+    """
+    key = (actor_id, session_id)
+    assistant_memory_session = memory_sessions.get(key)
+    if assistant_memory_session is None:
+        # use same session id for different agents to share memory
+        assistant_memory_session = create_memory_session(
+            actor_id=actor_id,
+            session_id=session_id,
+            memory_session_manager=get_session_manager(memory_id)
+        )
+        memory_sessions.set(key, assistant_memory_session)
     return assistant_memory_session
\ No newline at end of file
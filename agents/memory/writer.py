@@ -0,0 +1,203 @@
+import os
+import time
+import asyncio
+import atexit
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from bedrock_agentcore.memory.constants import ConversationalMessage
+from bedrock_agentcore.memory.session import MemorySession
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# buffered messages beyond which new turns wait for the writer to catch up; nothing is dropped
+MEMORY_WRITE_QUEUE_SIZE = int(os.getenv("MEMORY_WRITE_QUEUE_SIZE", "1000"))
+# longest a new turn waits for buffer space (seconds) before it goes ahead anyway
+MEMORY_BACKPRESSURE_TIMEOUT = float(os.getenv("MEMORY_BACKPRESSURE_TIMEOUT", "5"))
+# fallback for turns that never flush (e.g. the agent raised): buffered messages of a session
+# are written at the latest this many seconds after the first one. Well beyond a tool-using
+# turn, so a turn's user and assistant messages normally go out in one batch at its end
+MEMORY_FLUSH_INTERVAL = float(os.getenv("MEMORY_FLUSH_INTERVAL", "30"))
+MEMORY_WRITE_RETRIES = int(os.getenv("MEMORY_WRITE_RETRIES", "3"))
+MEMORY_WRITE_BACKOFF = float(os.getenv("MEMORY_WRITE_BACKOFF", "0.5"))
+# seconds allowed for writing out what is still buffered at shutdown
+MEMORY_DRAIN_TIMEOUT = float(os.getenv("MEMORY_DRAIN_TIMEOUT", "10"))
+
+
+class MemoryWriter:
+    """
+    Write-behind buffer for conversation messages.
+
+    Hooks hand messages over with `add` and return immediately; messages are
+    coalesced into one buffer per memory session, and a background thread
+    writes each buffer with a single `add_turns` call when the turn ends
+    (`flush`), or as a fallback once its oldest message has waited
+    `flush_interval` seconds. Failed writes are retried with exponential
+    backoff.
+
+    `add` runs on the event loop inside strands hooks, so it never blocks
+    and never drops a message. Backpressure is applied per turn instead:
+    `wait_for_capacity`, awaited before a turn starts, holds the turn while
+    more than `maxsize` messages wait to be written, for at most
+    `backpressure_timeout` seconds. `close` drains everything still buffered.
+    """
+    def __init__(
+            self,
+            maxsize: int = MEMORY_WRITE_QUEUE_SIZE,
+            flush_interval: float = MEMORY_FLUSH_INTERVAL,
+            retries: int = MEMORY_WRITE_RETRIES,
+            backoff: float = MEMORY_WRITE_BACKOFF,
+            backpressure_timeout: float = MEMORY_BACKPRESSURE_TIMEOUT,
+        ):
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.backpressure_timeout = backpressure_timeout
+        # id(session) -> (session, messages, time the first message was buffered)
+        self._pending: Dict[int, Tuple[MemorySession, List[ConversationalMessage], float]] = {}
+        self._flush_requested: Set[int] = set()
+        self._buffered = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.metrics = Metrics("memory_writer")
+
+    def _ensure_started(self):
+        # called with self._cond held
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="memory-writer", daemon=True)
+            self._thread.start()
+
+    def add(self, memory_session: MemorySession, message: ConversationalMessage) -> bool:
+        """
+        Buffer a message for `memory_session`. Returns False only after `close`.
+        """
+        with self._cond:
+            if self._closed:
+                self.metrics.incr("rejected_after_close")
+                return False
+            self._ensure_started()
+            entry = self._pending.get(id(memory_session))
+            if entry is None:
+                self._pending[id(memory_session)] = (memory_session, [message], time.monotonic())
+            else:
+                entry[1].append(message)
+            self._buffered += 1
+            self.metrics.incr("messages_queued")
+            self._cond.notify_all()
+        return True
+
+    def flush(self, memory_session: MemorySession):
+        """
+        Ask for the session's buffered messages to be written now (end of turn).
+        """
+        with self._cond:
+            if id(memory_session) in self._pending:
+                self._flush_requested.add(id(memory_session))
+                self._cond.notify_all()
+
+    def _has_capacity(self) -> bool:
+        return self._buffered < self.maxsize
+
+    def _wait_for_capacity(self, timeout: float) -> bool:
+        with self._cond:
+            return self._cond.wait_for(self._has_capacity, timeout)
+
+    async def wait_for_capacity(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until fewer than `maxsize` messages are buffered, for at most
+        `timeout` (default `backpressure_timeout`) seconds. Returns False if
+        the writer is still behind; the caller goes ahead either way.
+        """
+        if self._has_capacity():
+            return True
+        timeout = self.backpressure_timeout if timeout is None else timeout
+        self.metrics.incr("backpressure_waits")
+        start = time.perf_counter()
+        ready = await asyncio.to_thread(self._wait_for_capacity, timeout)
+        self.metrics.observe("backpressure_wait", (time.perf_counter() - start) * 1000)
+        if not ready:
+            self.metrics.incr("backpressure_timeouts")
+            logger.warning(f"Memory writer still has {self._buffered} messages buffered after {timeout}s")
+        return ready
+
+    def close(self, timeout: float = MEMORY_DRAIN_TIMEOUT):
+        """
+        Stop accepting messages and write out everything still buffered.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is None:
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning(f"Memory writer did not drain within {timeout}s; unwritten messages are lost")
+
+    # ── Background thread ─────────────────────────────────────────────────
+
+    def _due(self) -> List[Tuple[MemorySession, List[ConversationalMessage]]]:
+        """Take the buffers that should be written now. Called with self._cond held."""
+        now = time.monotonic()
+        keys = [
+            key for key, (_, _, started) in self._pending.items()
+            if self._closed or key in self._flush_requested or now - started >= self.flush_interval
+        ]
+        batches = []
+        for key in keys:
+            session, messages, _ = self._pending.pop(key)
+            if key in self._flush_requested:
+                self._flush_requested.discard(key)
+            elif not self._closed:
+                self.metrics.incr("timer_flushes")
+            batches.append((session, messages))
+        return batches
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batches = self._due()
+                while not batches and not self._closed:
+                    timeout = None
+                    if self._pending:
+                        oldest = min(started for _, _, started in self._pending.values())
+                        timeout = max(0.0, oldest + self.flush_interval - time.monotonic())
+                    self._cond.wait(timeout)
+                    batches = self._due()
+                closed = self._closed
+            for session, messages in batches:
+                self._write(session, messages)
+                with self._cond:
+                    self._buffered -= len(messages)
+                    self._cond.notify_all()
+            if closed and not batches:
+                return
+
+    def _write(self, memory_session: MemorySession, messages: List[ConversationalMessage]):
+        for attempt in range(self.retries + 1):
+            start = time.perf_counter()
+            try:
+                memory_session.add_turns(messages=messages)
+                self.metrics.observe("write_latency", (time.perf_counter() - start) * 1000)
+                self.metrics.incr("batches_written")
+                self.metrics.incr("messages_written", len(messages))
+                return
+            except Exception as err:
+                if attempt == self.retries:
+                    self.metrics.incr("batches_failed")
+                    logger.error(f"Memory save failed after {attempt + 1} attempts, dropping {len(messages)} messages: {err}")
+                    return
+                self.metrics.incr("write_retries")
+                delay = self.backoff * (2 ** attempt)
+                logger.warning(f"Memory save error, retrying in {delay:.1f}s: {err}")
+                time.sleep(delay)
+
+
+# one writer per process, shared by every MemoryHook
+memory_writer = MemoryWriter()
+atexit.register(memory_writer.close)
@@ -0,0 +1,84 @@
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+
+class LatencyStats:
+    """
+    Running latency summary in milliseconds. Keeps a bounded window of recent
+    samples so percentiles reflect current behaviour rather than process lifetime.
+    """
+    def __init__(self, window: int = 512):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.samples = deque(maxlen=window)
+
+    def observe(self, value_ms: float):
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+        self.samples.append(value_ms)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms if self.count else None,
+        }
+
+
+class Metrics:
+    """
+    Named counters and latency summaries for a single component, e.g. the
+    token manager or a cache. Every instance is registered so the agent can
+    log a process-wide snapshot.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {}
+        self._latencies: Dict[str, LatencyStats] = {}
+        _registry[name] = self
+
+    def incr(self, counter: str, value: int = 1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def observe(self, latency: str, value_ms: float):
+        with self._lock:
+            if latency not in self._latencies:
+                self._latencies[latency] = LatencyStats()
+            self._latencies[latency].observe(value_ms)
+
+    def get(self, counter: str) -> int:
+        return self._counters.get(counter, 0)
+
+    def latency(self, latency: str) -> Optional[LatencyStats]:
+        return self._latencies.get(latency)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            snapshot = dict(self._counters)
+            for name, stats in self._latencies.items():
+                snapshot[name] = stats.snapshot()
+        return snapshot
+
+
+_registry: Dict[str, Metrics] = {}
+
+
+def all_metrics() -> Dict[str, Dict]:
+    """
+    Snapshot of every registered component's metrics, keyed by component name.
+    """
+    return {name: metrics.snapshot() for name, metrics in list(_registry.items())}
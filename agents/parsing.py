@@ -0,0 +1,144 @@
+import sys
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from models import Coordinates, Price, Station
+
+# Responses from the NSW Fuel API are trusted, so by default models are built
+# without pydantic validation. Pass validate=True to get the fully validated
+# (slower) behaviour, e.g. for hand-written fixtures.
+_intern = sys.intern
+_new = object.__new__
+_setattr = object.__setattr__
+
+# Every field is always supplied, so all instances of a model can share one
+# fields-set. Assigning to a field later only re-adds a name already present.
+_FIELDS_SET = {model: set(model.model_fields) for model in (Price, Coordinates, Station)}
+
+
+def construct(model, fields: Dict):
+    """
+    Build a model instance from a complete field dict without validation.
+
+    Equivalent to `model.model_construct(**fields)` when every field is
+    given, but skips its per-call default handling, which in pydantic v2 is
+    slower than validating.
+    """
+    instance = _new(model)
+    _setattr(instance, "__dict__", fields)
+    _setattr(instance, "__pydantic_fields_set__", _FIELDS_SET[model])
+    _setattr(instance, "__pydantic_extra__", None)
+    _setattr(instance, "__pydantic_private__", None)
+    return instance
+
+
+def _build(model, validate: bool, fields: Dict):
+    return model(**fields) if validate else construct(model, fields)
+
+
+def parse_prices(prices: Iterable[Dict], station_code: Optional[str] = None, validate: bool = False) -> List[Price]:
+    """
+    Convert raw API price records into `Price` models.
+
+    :param prices: Records with `fueltype`, `price`, `lastupdated` and (unless
+                   `station_code` is given) `stationcode`
+    :param station_code: Station the records belong to, for the single-station endpoint
+    :param validate: Run pydantic validation on every record
+    """
+    fixed_code = None if station_code is None else str(station_code)
+    return [
+        _build(Price, validate, {
+            "station_code": fixed_code if fixed_code is not None else str(price["stationcode"]),
+            "fueltype": _intern(price["fueltype"]),
+            "price": price["price"],
+            "last_updated": price["lastupdated"],
+        })
+        for price in prices
+    ]
+
+
+def group_prices(prices: Iterable[Dict], validate: bool = False) -> Dict[str, List[Price]]:
+    """
+    Convert raw API price records into `Price` models grouped by station code.
+    """
+    grouped: Dict[str, List[Price]] = {}
+    # this loop runs once per price row, so the construct() call is inlined
+    fields_set = _FIELDS_SET[Price]
+    for price in prices:
+        station_code = price.get("stationcode")
+        if station_code is None:
+            continue
+        station_code = str(station_code)
+        fields = {
+            "station_code": station_code,
+            "fueltype": _intern(price["fueltype"]),
+            "price": price["price"],
+            "last_updated": price["lastupdated"],
+        }
+        if validate:
+            entry = Price(**fields)
+        else:
+            entry = _new(Price)
+            _setattr(entry, "__dict__", fields)
+            _setattr(entry, "__pydantic_fields_set__", fields_set)
+            _setattr(entry, "__pydantic_extra__", None)
+            _setattr(entry, "__pydantic_private__", None)
+        bucket = grouped.get(station_code)
+        if bucket is None:
+            grouped[station_code] = [entry]
+        else:
+            bucket.append(entry)
+    return grouped
+
+
+def parse_station(station: Dict, prices: List[Price], validate: bool = False) -> Station:
+    """
+    Convert one raw API station record into a `Station` model.
+    """
+    location = station["location"]
+    coordinates = _build(Coordinates, validate, {
+        "latitude": location["latitude"],
+        "longitude": location["longitude"],
+    })
+    return _build(Station, validate, {
+        "name": station["name"],
+        "brand": _intern(station["brand"]),
+        "brandid": None,
+        "address": station["address"],
+        "coordinates": coordinates,
+        "distance": location.get("distance"),
+        "station_code": str(station["code"]),
+        "stationid": None,
+        "prices": prices,
+    })
+
+
+def parse_stations_response(response: Dict, validate: bool = False) -> List[Station]:
+    """
+    Parse a location/nearby search response ({"stations": [...], "prices": [...]})
+    into `Station` models carrying their prices, preserving the API's station order.
+    """
+    grouped = group_prices(response.get("prices") or [], validate=validate)
+    return [
+        parse_station(station, grouped.get(str(station["code"]), []), validate=validate)
+        for station in response.get("stations") or []
+    ]
+
+
+async def parse_stations_stream(records: AsyncIterator[Tuple[str, Dict]], validate: bool = False) -> List[Station]:
+    """
+    Like `parse_stations_response`, but consumes (key, record) pairs from a
+    streamed response (see `json_stream.iter_json_arrays`). Price records are
+    converted as they arrive, so the raw price list is never held in memory.
+    """
+    raw_stations: List[Dict] = []
+    grouped: Dict[str, List[Price]] = {}
+    async for key, record in records:
+        if key == "stations":
+            raw_stations.append(record)
+        elif key == "prices":
+            for station_code, entries in group_prices((record,), validate=validate).items():
+                grouped.setdefault(station_code, []).extend(entries)
+    return [
+        parse_station(station, grouped.get(str(station["code"]), []), validate=validate)
+        for station in raw_stations
+    ]
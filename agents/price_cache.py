@@ -0,0 +1,108 @@
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Hashable, List, Optional, Tuple
+
+from cache import LRUCache
+from geo import geohash_encode
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# results are fresh for PRICE_CACHE_TTL seconds, then served stale for up to
+# PRICE_CACHE_STALE_TTL more seconds while a single background refresh runs
+PRICE_CACHE_TTL = float(os.getenv("PRICE_CACHE_TTL", "60"))
+PRICE_CACHE_STALE_TTL = float(os.getenv("PRICE_CACHE_STALE_TTL", "240"))
+PRICE_CACHE_SIZE = int(os.getenv("PRICE_CACHE_SIZE", "512"))
+# precision 6 groups points within roughly a 1.2 x 0.6 km cell
+PRICE_CACHE_GEOHASH_PRECISION = int(os.getenv("PRICE_CACHE_GEOHASH_PRECISION", "6"))
+
+
+class PriceCache:
+    """
+    Short-lived cache for price search results keyed on a geohash-quantized location.
+
+    Queries from points in the same geohash cell share one result, so reported
+    station distances are relative to whichever point populated the entry.
+    """
+    def __init__(
+            self,
+            ttl: float = PRICE_CACHE_TTL,
+            stale_ttl: float = PRICE_CACHE_STALE_TTL,
+            maxsize: int = PRICE_CACHE_SIZE,
+            precision: int = PRICE_CACHE_GEOHASH_PRECISION,
+        ):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.precision = precision
+        self._cache = LRUCache("price_cache", maxsize=maxsize, ttl=ttl + stale_ttl)
+        self.metrics = self._cache.metrics
+        self._refreshing = {}
+        # concurrent misses on one key wait for a single fetch
+        self._inflight = SingleFlight("price_singleflight")
+
+    def key(
+            self,
+            endpoint: str,
+            latitude: float,
+            longitude: float,
+            fueltype: str,
+            brands: Optional[List[str]] = None,
+            radius: Optional[float] = None,
+            postcode: Optional[str] = None,
+        ) -> Tuple:
+        """
+        Build the cache key for a price query. Brand order does not matter.
+        """
+        return (
+            endpoint,
+            geohash_encode(float(latitude), float(longitude), self.precision),
+            None if radius is None else float(radius),
+            fueltype.upper(),
+            tuple(sorted(brand.lower() for brand in brands or [])),
+            postcode,
+        )
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Return the cached result for `key`, calling `fetch` on a miss.
+
+        Concurrent misses for the same key share one `fetch` call.
+        Stale entries are returned immediately and refreshed in the background.
+        Results of None (failed upstream calls) are never cached.
+        """
+        entry = self._cache.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            if time.monotonic() - fetched_at < self.ttl:
+                return value
+            self.metrics.incr("stale_hits")
+            self._schedule_refresh(key, fetch)
+            return value
+
+        value = await self._inflight.do(key, fetch)
+        self._store(key, value)
+        return value
+
+    def _store(self, key: Hashable, value: Any):
+        if value is not None:
+            self._cache.set(key, (value, time.monotonic()))
+
+    def _schedule_refresh(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        loop = asyncio.get_running_loop()
+        refresh_key = (id(loop), key)
+        task = self._refreshing.get(refresh_key)
+        if task is not None and not task.done():
+            return
+        self._refreshing[refresh_key] = loop.create_task(self._refresh(refresh_key, key, fetch))
+
+    async def _refresh(self, refresh_key: Tuple, key: Hashable, fetch: Callable[[], Awaitable[Any]]):
+        try:
+            self._store(key, await fetch())
+            self.metrics.incr("background_refreshes")
+        except Exception as err:
+            self.metrics.incr("refresh_failures")
+            logger.warning(f"Background price refresh failed for {key}: {err}")
+        finally:
+            self._refreshing.pop(refresh_key, None)
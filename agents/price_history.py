@@ -0,0 +1,291 @@
+import os
+import json
+import mmap
+import struct
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from metrics import Metrics
+from models import Price
+
+logger = logging.getLogger(__name__)
+
+PRICE_HISTORY_PATH = os.getenv(
+    "PRICE_HISTORY_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "nsw-fuel-agent", "price_history.bin")
+)
+
+_MAGIC = b"NSWPH\x00v1"
+# magic, record count, capacity
+_HEADER = struct.Struct("<8sQQ")
+_HEADER_SIZE = 64
+# fixed-width record; `prev` links to the previous record of the same station (-1 for none)
+RECORD = np.dtype([
+    ("station", "<u4"),
+    ("fuel", "<u2"),
+    ("_pad", "<u2"),
+    ("price", "<f4"),
+    ("ts", "<i8"),
+    ("prev", "<i4"),
+])
+_INDEX = np.dtype([("station", "<u4"), ("head", "<i4")])
+_GROW_RECORDS = 1 << 16
+_TIMESTAMP_FORMAT = "%d/%m/%Y %H:%M:%S"
+_WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def _to_epoch(last_updated: str) -> Optional[int]:
+    """
+    NSW API timestamps are local Sydney time without an offset; they are stored
+    as naive seconds so round trips and weekday maths stay in local time.
+    """
+    try:
+        # hand-rolled split is several times faster than strptime for full price dumps
+        date, time = last_updated.split(" ", 1)
+        day, month, year = date.split("/")
+        hour, minute, second = time.split(":")
+        moment = datetime(int(year), int(month), int(day), int(hour), int(minute), int(second))
+        return int((moment - datetime(1970, 1, 1)).total_seconds())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _from_epoch(ts: int) -> datetime:
+    return datetime(1970, 1, 1) + timedelta(seconds=int(ts))
+
+
+class PriceHistory:
+    """
+    Append-only price history in a memory-mapped file of 24-byte records.
+
+    Every record links to the previous record of the same station, and the
+    newest record per station is kept in a small index (persisted next to the
+    data file as `<path>.idx`). A station's history is read by walking its
+    chain backwards, so queries touch only that station's records and memory
+    use does not grow with the size of the file. Opening replays only the
+    records written after the index was last saved.
+    """
+    def __init__(self, path: str = PRICE_HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.metrics = Metrics("price_history")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._fuels: List[str] = self._load_fuels()
+        self._fuel_codes: Dict[str, int] = {fuel: code for code, fuel in enumerate(self._fuels)}
+        self._file = open(path, "r+b" if os.path.exists(path) else "w+b")
+        if os.path.getsize(path) < _HEADER_SIZE:
+            self._file.write(_HEADER.pack(_MAGIC, 0, 0).ljust(_HEADER_SIZE, b"\x00"))
+            self._file.flush()
+        self._mmap = None
+        self._records = None
+        self._map()
+        self._heads: Dict[int, int] = self._load_index()
+
+    # ── File management ───────────────────────────────────────────────────
+
+    def _map(self):
+        self._records = None
+        if self._mmap is not None:
+            self._mmap.close()
+        self._mmap = mmap.mmap(self._file.fileno(), 0)
+        magic, self._count, self._capacity = _HEADER.unpack_from(self._mmap, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"{self.path} is not a price history file")
+        self._records = np.ndarray((self._capacity,), dtype=RECORD, buffer=self._mmap, offset=_HEADER_SIZE)
+
+    def _grow(self):
+        capacity = max(_GROW_RECORDS, self._capacity * 2)
+        self._file.truncate(_HEADER_SIZE + capacity * RECORD.itemsize)
+        _HEADER.pack_into(self._mmap, 0, _MAGIC, self._count, capacity)
+        self._map()
+
+    def _load_fuels(self) -> List[str]:
+        try:
+            with open(f"{self.path}.fuels.json") as fp:
+                return json.load(fp)
+        except (OSError, ValueError):
+            return []
+
+    def _load_index(self) -> Dict[int, int]:
+        heads: Dict[int, int] = {}
+        indexed = 0
+        try:
+            with open(f"{self.path}.idx", "rb") as fp:
+                indexed = struct.unpack("<Q", fp.read(8))[0]
+                entries = np.frombuffer(fp.read(), dtype=_INDEX)
+            if indexed > self._count:
+                raise ValueError("index is newer than data file")
+            heads = dict(zip(entries["station"].tolist(), entries["head"].tolist()))
+        except (OSError, ValueError, struct.error):
+            indexed = 0
+            heads = {}
+        # replay records appended after the index was written
+        if indexed < self._count:
+            tail = self._records["station"][indexed:self._count]
+            stations, last = np.unique(tail[::-1], return_index=True)
+            for station, offset in zip(stations.tolist(), last.tolist()):
+                heads[station] = self._count - 1 - offset
+        return heads
+
+    def save_index(self):
+        """
+        Persist the per-station index and fuel dictionary so the next open is fast.
+        """
+        with self._lock:
+            entries = np.array(list(self._heads.items()), dtype=np.int64).reshape(-1, 2)
+            index = np.empty(len(entries), dtype=_INDEX)
+            index["station"] = entries[:, 0]
+            index["head"] = entries[:, 1]
+            with open(f"{self.path}.idx", "wb") as fp:
+                fp.write(struct.pack("<Q", self._count))
+                fp.write(index.tobytes())
+            with open(f"{self.path}.fuels.json", "w") as fp:
+                json.dump(self._fuels, fp)
+
+    def close(self):
+        self.save_index()
+        with self._lock:
+            self._mmap.flush()
+            self._records = None
+            self._mmap.close()
+            self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    # ── Writes ────────────────────────────────────────────────────────────
+
+    def _fuel_code(self, fueltype: str) -> int:
+        code = self._fuel_codes.get(fueltype)
+        if code is None:
+            code = self._fuel_codes[fueltype] = len(self._fuels)
+            self._fuels.append(fueltype)
+            with open(f"{self.path}.fuels.json", "w") as fp:
+                json.dump(self._fuels, fp)
+        return code
+
+    def _latest_ts(self, station: int, fuel: int) -> Optional[int]:
+        index = self._heads.get(station, -1)
+        while index >= 0:
+            record = self._records[index]
+            if record["fuel"] == fuel:
+                return int(record["ts"])
+            index = int(record["prev"])
+        return None
+
+    def append(self, station_code: str, fueltype: str, price: float, last_updated: str) -> bool:
+        """
+        Record one observed price. Observations already stored (same station,
+        fuel and timestamp) are skipped. Returns True if a record was written.
+        """
+        ts = _to_epoch(last_updated)
+        if ts is None or not str(station_code).isdigit():
+            self.metrics.incr("skipped")
+            return False
+        station = int(station_code)
+        with self._lock:
+            fuel = self._fuel_code(fueltype)
+            if self._latest_ts(station, fuel) == ts:
+                self.metrics.incr("duplicates")
+                return False
+            if self._count == self._capacity:
+                self._grow()
+            index = self._count
+            self._records[index] = (station, fuel, 0, price, ts, self._heads.get(station, -1))
+            self._heads[station] = index
+            self._count += 1
+            _HEADER.pack_into(self._mmap, 0, _MAGIC, self._count, self._capacity)
+        self.metrics.incr("appended")
+        return True
+
+    def record(self, prices: Iterable[Price]) -> int:
+        """
+        Record `Price` models returned by a tool. Returns the number written.
+        """
+        return sum(self.append(p.station_code, p.fueltype, p.price, p.last_updated) for p in prices if p is not None)
+
+    def record_raw(self, prices: Iterable[Dict]) -> int:
+        """
+        Record raw NSW API price records ({"stationcode", "fueltype", "price", "lastupdated"}).
+        """
+        return sum(self.append(str(p["stationcode"]), p["fueltype"], p["price"], p["lastupdated"]) for p in prices)
+
+    # ── Queries ───────────────────────────────────────────────────────────
+
+    def series(self, station_code: str, fueltype: Optional[str] = None, since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Observed prices at a station, oldest first.
+
+        :param fueltype: Only return this fuel type
+        :param since: Only return observations at or after this (local) time
+        """
+        if not str(station_code).isdigit():
+            return []
+        fuel = self._fuel_codes.get(fueltype) if fueltype else None
+        if fueltype and fuel is None:
+            return []
+        since_ts = None if since is None else int((since - datetime(1970, 1, 1)).total_seconds())
+        series = []
+        with self._lock:
+            index = self._heads.get(int(station_code), -1)
+            while index >= 0:
+                record = self._records[index]
+                index = int(record["prev"])
+                ts = int(record["ts"])
+                # a chain mixes fuel types in the order they were observed, not by
+                # `last_updated`, so an old record does not mean the rest is older
+                if since_ts is not None and ts < since_ts:
+                    continue
+                if fuel is None or record["fuel"] == fuel:
+                    series.append((ts, self._fuels[record["fuel"]], round(float(record["price"]), 1)))
+        # walked newest appended first; ties keep the order they were appended in
+        series.reverse()
+        series.sort(key=lambda point: point[0])
+        return [
+            {"fueltype": name, "price": price, "last_updated": _from_epoch(ts).strftime(_TIMESTAMP_FORMAT)}
+            for ts, name, price in series
+        ]
+
+    def summary(self, station_code: str, fueltype: str, days: int = 7) -> Dict:
+        """
+        Trend of one fuel at a station over the last `days` days: first/last/min/max
+        price and the average price per weekday, including the cheapest weekday.
+        """
+        since = datetime.now() - timedelta(days=days)
+        series = self.series(station_code, fueltype, since=since)
+        if not series:
+            return {"station_code": str(station_code), "fueltype": fueltype, "days": days, "observations": 0}
+        prices = [point["price"] for point in series]
+        by_weekday: Dict[str, List[float]] = {}
+        for point in series:
+            weekday = _WEEKDAYS[datetime.strptime(point["last_updated"], _TIMESTAMP_FORMAT).weekday()]
+            by_weekday.setdefault(weekday, []).append(point["price"])
+        weekday_average = {day: round(sum(values) / len(values), 1) for day, values in by_weekday.items()}
+        return {
+            "station_code": str(station_code),
+            "fueltype": fueltype,
+            "days": days,
+            "observations": len(series),
+            "first": series[0],
+            "last": series[-1],
+            "change": round(prices[-1] - prices[0], 1),
+            "min": min(prices),
+            "max": max(prices),
+            "weekday_average": weekday_average,
+            "cheapest_weekday": min(weekday_average, key=weekday_average.get),
+        }
+
+
+def open_price_history(path: str = PRICE_HISTORY_PATH) -> Optional[PriceHistory]:
+    """
+    Open the history store, or return None (history disabled) if the file cannot be used.
+    """
+    try:
+        return PriceHistory(path)
+    except (OSError, ValueError) as err:
+        logger.warning(f"Price history at {path} unavailable: {err}")
+        return None
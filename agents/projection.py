@@ -0,0 +1,98 @@
+import logging
+from typing import List, Optional, Union
+
+from metrics import Metrics
+from models import Station
+from tokens import tokens_for_length
+
+logger = logging.getLogger(__name__)
+
+# one row per (station, fuel type) in compact mode
+COMPACT_COLUMNS = ("station_code", "name", "brand", "address", "distance_km", "fueltype", "price", "last_updated")
+
+# stations serialized to estimate the size of a whole list
+SIZE_SAMPLE = 5
+
+metrics = Metrics("tool_results")
+
+
+def select_stations(stations: List[Station], limit: Optional[int] = None, sort_by: Optional[str] = None) -> List[Station]:
+    """
+    Optionally re-order stations ("price" or "distance", ascending) and keep the first `limit`.
+    """
+    if sort_by == "distance":
+        stations = sorted(stations, key=lambda station: float("inf") if station.distance is None else station.distance)
+    elif sort_by == "price":
+        stations = sorted(stations, key=lambda station: min((price.price for price in station.prices), default=float("inf")))
+    if limit is not None and limit > 0:
+        stations = stations[:limit]
+    return stations
+
+
+def _cell(value) -> str:
+    return "" if value is None else str(value).replace("|", "/")
+
+
+def to_table(stations: List[Station]) -> str:
+    """
+    Dense pipe-separated table with a header row, one row per station and fuel type.
+    Drops fields the model never needs (coordinates, brand and station ids).
+    """
+    rows = ["|".join(COMPACT_COLUMNS)]
+    for station in stations:
+        for price in station.prices or [None]:
+            rows.append("|".join(_cell(value) for value in (
+                station.station_code,
+                station.name,
+                station.brand,
+                station.address,
+                station.distance,
+                price.fueltype if price else None,
+                price.price if price else None,
+                price.last_updated if price else None,
+            )))
+    return "\n".join(rows)
+
+
+def _estimate_length(result: Union[List[Station], str]) -> int:
+    """
+    Characters `result` takes when serialized for the model. A station list is
+    extrapolated from its first few stations, since serializing thousands of
+    stations costs more than the projection saves.
+    """
+    if isinstance(result, str):
+        return len(result)
+    if not result:
+        return len(str(result))
+    sample = result[:SIZE_SAMPLE]
+    return round(len(str(sample)) * len(result) / len(sample))
+
+
+def project_stations(
+        stations: Optional[List[Station]],
+        limit: Optional[int] = None,
+        compact: bool = False,
+        sort_by: Optional[str] = None,
+        tool: str = "tool",
+    ) -> Union[List[Station], str, None]:
+    """
+    Shape a station list for the model: top-N and optional compact table.
+    Logs and counts the (estimated) serialized size before and after, as the model sees it.
+    """
+    if stations is None:
+        return None
+    selected = select_stations(stations, limit=limit, sort_by=sort_by)
+    result = to_table(selected) if compact else selected
+    if result is not stations:
+        chars_before, chars_after = _estimate_length(stations), _estimate_length(result)
+        tokens_before, tokens_after = tokens_for_length(chars_before), tokens_for_length(chars_after)
+        metrics.incr("projected_calls")
+        metrics.incr("chars_before", chars_before)
+        metrics.incr("chars_after", chars_after)
+        metrics.incr("tokens_before", tokens_before)
+        metrics.incr("tokens_after", tokens_after)
+        logger.info(
+            f"{tool}: {len(stations)} -> {len(selected)} stations, ~{chars_before} -> ~{chars_after} chars, "
+            f"~{tokens_before} -> ~{tokens_after} tokens"
+        )
+    return result
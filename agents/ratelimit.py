@@ -0,0 +1,292 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+
+from metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+# a caller that would have to queue longer than this (seconds) is rejected instead
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "10"))
+# adaptive concurrency bounds per upstream API; the limit starts at the initial value
+RATE_LIMIT_MIN_CONCURRENCY = int(os.getenv("RATE_LIMIT_MIN_CONCURRENCY", "1"))
+RATE_LIMIT_MAX_CONCURRENCY = int(os.getenv("RATE_LIMIT_MAX_CONCURRENCY", "32"))
+RATE_LIMIT_INITIAL_CONCURRENCY = int(os.getenv("RATE_LIMIT_INITIAL_CONCURRENCY", "8"))
+# responses slower than this (ms) count as a sign of upstream congestion
+RATE_LIMIT_LATENCY_TARGET_MS = float(os.getenv("RATE_LIMIT_LATENCY_TARGET_MS", "2000"))
+# how many times a 429 is waited out and retried before it is returned to the caller
+RATE_LIMIT_RETRIES = int(os.getenv("RATE_LIMIT_RETRIES", "2"))
+# pause applied after a 429 without a Retry-After header (seconds)
+RATE_LIMIT_DEFAULT_BACKOFF = float(os.getenv("RATE_LIMIT_DEFAULT_BACKOFF", "1"))
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a call would have to queue longer than the limiter's `max_wait`."""
+
+
+class TokenBucket:
+    """
+    Token bucket of `burst` tokens refilled at `rate` per second, implemented
+    as a virtual schedule (GCRA): each caller reserves the next free send time,
+    so callers are served strictly in arrival order.
+    """
+    def __init__(self, rate: float, burst: int = 1):
+        self.interval = 1.0 / rate
+        self.tolerance = (max(1, burst) - 1) * self.interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Reserve a token. Returns the seconds to wait before using it, or None
+        (nothing reserved) if that would exceed `max_wait`.
+        """
+        with self._lock:
+            now = time.monotonic()
+            scheduled = max(self._next, now)
+            wait = max(0.0, scheduled - self.tolerance - now)
+            if wait > max_wait:
+                return None
+            self._next = scheduled + self.interval
+            return wait
+
+    def refund(self):
+        """Give back a reserved token that will not be used."""
+        with self._lock:
+            self._next -= self.interval
+
+    def pause(self, seconds: float):
+        """Hold back every token for at least `seconds`, e.g. after a 429."""
+        with self._lock:
+            self._next = max(self._next, time.monotonic() + seconds + self.tolerance)
+
+
+class _Waiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, future: asyncio.Future):
+        self.loop = loop
+        self.future = future
+        self.granted = False
+
+
+def _grant(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class AdaptiveConcurrencyLimit:
+    """
+    Concurrency limit adjusted AIMD-style: every fast response raises the
+    limit by 1/limit (about one per round of requests), a response slower
+    than `latency_target_ms` lowers it by 10% and a 429 or timeout halves it.
+    Decreases are spaced by the latency target so one burst of errors only
+    counts once. Waiters are admitted in arrival order. Slots are not bound
+    to an event loop, so one limit can be shared by every loop in the process.
+    """
+    def __init__(
+            self,
+            initial: int = RATE_LIMIT_INITIAL_CONCURRENCY,
+            minimum: int = RATE_LIMIT_MIN_CONCURRENCY,
+            maximum: int = RATE_LIMIT_MAX_CONCURRENCY,
+            latency_target_ms: float = RATE_LIMIT_LATENCY_TARGET_MS,
+        ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.latency_target_ms = latency_target_ms
+        self.in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._decreased_at = 0.0
+        self._lock = threading.Lock()
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Take a slot, waiting in line for up to `timeout` seconds. Returns False on timeout.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if not self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+            return True
+        except (asyncio.TimeoutError, asyncio.CancelledError) as err:
+            with self._lock:
+                if waiter.granted:
+                    # the slot arrived together with the timeout; hand it on
+                    self.in_flight -= 1
+                    self._admit()
+                else:
+                    self._waiters.remove(waiter)
+            if isinstance(err, asyncio.CancelledError):
+                raise
+            return False
+
+    def release(self, latency_ms: float, overloaded: bool = False):
+        """
+        Return a slot and adapt the limit to how the call went.
+
+        :param latency_ms: Time the upstream call took
+        :param overloaded: The upstream answered 429 or timed out
+        """
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded or latency_ms > self.latency_target_ms:
+                if now - self._decreased_at >= self.latency_target_ms / 1000:
+                    self._decreased_at = now
+                    self.limit = max(self.minimum, self.limit * (0.5 if overloaded else 0.9))
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._admit()
+
+    def _admit(self):
+        while self._waiters and self.in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            if waiter.future.done():
+                continue
+            waiter.granted = True
+            self.in_flight += 1
+            waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+
+
+class Permit:
+    """Handed to the caller inside `RateLimiter.limit`; set `status_code` once the response arrives."""
+    __slots__ = ("status_code",)
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+
+
+def retry_after(response: httpx.Response, default: float = RATE_LIMIT_DEFAULT_BACKOFF) -> float:
+    """Seconds to back off after a 429, from its Retry-After header when it is given in seconds."""
+    try:
+        return max(0.0, float(response.headers.get("retry-after", default)))
+    except ValueError:
+        return default
+
+
+class RateLimiter:
+    """
+    Client-side throttle for one upstream API.
+
+    A call first takes a token from its endpoint's bucket (if that endpoint
+    has its own budget) and from the API-wide bucket, sleeping until both
+    tokens are due, then waits for a slot under the adaptive concurrency
+    limit. Callers queue in arrival order; one whose wait would exceed
+    `max_wait` gets `RateLimitExceeded` instead. Tokens taken by a call that
+    never goes out (rejected, timed out waiting for a slot or cancelled) are
+    refunded. `throttled` pauses the API-wide bucket after a 429 so queued
+    callers wait out the quota rather than hit it again.
+
+    Metrics: calls, rejections, throttled (429s seen), queue_time and
+    upstream_latency (ms).
+    """
+    def __init__(
+            self,
+            name: str,
+            rate: float,
+            burst: int,
+            endpoints: Optional[Dict[str, Tuple[float, int]]] = None,
+            concurrency: Optional[AdaptiveConcurrencyLimit] = None,
+            max_wait: float = RATE_LIMIT_MAX_WAIT,
+        ):
+        """
+        :param name: Name the limiter's metrics are registered under
+        :param rate: Requests per second allowed across the whole API
+        :param burst: Requests that may be sent back to back before `rate` applies
+        :param endpoints: Tighter (rate, burst) budgets for individual endpoints
+        :param concurrency: Concurrency limit; a default adaptive one if omitted
+        :param max_wait: Longest queued wait (seconds) before a call is rejected
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.endpoints = {endpoint: TokenBucket(*budget) for endpoint, budget in (endpoints or {}).items()}
+        self.concurrency = concurrency or AdaptiveConcurrencyLimit()
+        self.max_wait = max_wait
+        self.metrics = Metrics(name)
+
+    @staticmethod
+    def _refund(reserved: List[TokenBucket]):
+        for bucket in reserved:
+            bucket.refund()
+
+    def _reject(self, endpoint: str, reason: str):
+        self.metrics.incr("rejections")
+        logger.warning(f"Rate limiter rejected {endpoint}: {reason}")
+        raise RateLimitExceeded(f"{endpoint}: {reason}")
+
+    @asynccontextmanager
+    async def limit(self, endpoint: str) -> AsyncIterator[Permit]:
+        """
+        Wait for permission to call `endpoint`; the body of the `with` block makes the call.
+        """
+        start = time.monotonic()
+        waits, reserved = [], []
+        for bucket in (self.endpoints.get(endpoint), self.bucket):
+            if bucket is None:
+                continue
+            wait = bucket.reserve(self.max_wait)
+            if wait is None:
+                self._refund(reserved)
+                self._reject(endpoint, f"request budget exhausted for more than {self.max_wait}s")
+            waits.append(wait)
+            reserved.append(bucket)
+        try:
+            if waits and max(waits) > 0:
+                await asyncio.sleep(max(waits))
+            remaining = self.max_wait - (time.monotonic() - start)
+            acquired = await self.concurrency.acquire(timeout=max(0.0, remaining))
+        except asyncio.CancelledError:
+            self._refund(reserved)
+            raise
+        if not acquired:
+            self._refund(reserved)
+            self._reject(endpoint, f"no concurrency slot within {self.max_wait}s")
+
+        queued_ms = (time.monotonic() - start) * 1000
+        self.metrics.incr("calls")
+        self.metrics.observe("queue_time", queued_ms)
+        permit = Permit()
+        sent = time.monotonic()
+        overloaded = False
+        try:
+            yield permit
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            overloaded = True
+            raise
+        finally:
+            latency_ms = (time.monotonic() - sent) * 1000
+            overloaded = overloaded or permit.status_code == 429
+            self.metrics.observe("upstream_latency", latency_ms)
+            self.concurrency.release(latency_ms, overloaded=overloaded)
+
+    async def send(self, endpoint: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Make the request `send` performs once admitted. A 429 pauses the limiter
+        for the Retry-After period and the request queues again, up to `RATE_LIMIT_RETRIES` times.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            async with self.limit(endpoint) as permit:
+                response = await send()
+                permit.status_code = response.status_code
+            if response.status_code != 429 or attempt == RATE_LIMIT_RETRIES:
+                return response
+            await response.aclose()
+            self.throttled(retry_after(response))
+
+    def throttled(self, seconds: float):
+        """Record a 429 and hold back every queued call for `seconds`."""
+        self.metrics.incr("throttled")
+        self.bucket.pause(seconds)
+        logger.warning(f"Upstream rate limit hit, pausing for {seconds:.1f}s (concurrency limit {self.concurrency.limit:.1f})")
@@ -0,0 +1,264 @@
+import os
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from metrics import Metrics
+from ratelimit import RateLimiter
+
+logger = logging.getLogger(__name__)
+
+# deadline for one upstream attempt, up to the response headers (seconds)
+UPSTREAM_TIMEOUT = float(os.getenv("UPSTREAM_TIMEOUT", "8"))
+# extra attempts for idempotent calls after a timeout, connection error or 5xx
+UPSTREAM_RETRIES = int(os.getenv("UPSTREAM_RETRIES", "2"))
+# retry delays are drawn uniformly from [0, min(max, base * 2^attempt)] ("full jitter")
+UPSTREAM_BACKOFF_BASE = float(os.getenv("UPSTREAM_BACKOFF_BASE", "0.2"))
+UPSTREAM_BACKOFF_MAX = float(os.getenv("UPSTREAM_BACKOFF_MAX", "2"))
+# consecutive failures that open an endpoint's circuit, and how long it stays open (seconds)
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+# send a second, hedged attempt when the first is slower than the endpoint's p95
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+# latency samples an endpoint needs before its p95 is trusted for hedging
+HEDGE_MIN_SAMPLES = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+# at most this share of calls may be hedged, so a slow upstream is not sent twice the load
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Closed while the endpoint works. `failure_threshold` consecutive failures
+    open it: calls fail fast for `reset_timeout` seconds, then a single trial
+    call is let through (half-open). Its success closes the circuit again,
+    its failure re-opens it.
+    """
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def release(self):
+        """
+        Give back the trial call of a half-open circuit that ended without an
+        answer from the endpoint (rejected by the rate limiter, cancelled), so
+        the next call becomes the trial instead.
+        """
+        with self._lock:
+            self._trial = False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def failure(self) -> bool:
+        """Record a failure. Returns True if this opened the circuit."""
+        with self._lock:
+            self.failures += 1
+            reopened = self._trial
+            self._trial = False
+            if reopened or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class UpstreamPolicy:
+    """
+    Timeouts, retries, circuit breaking and optional hedging for one upstream API.
+
+    `call` runs `send` (one HTTP attempt returning a response) under a
+    per-attempt timeout, after queueing for `limiter` if there is one; the
+    queued wait does not count against the timeout. Idempotent calls that
+    time out, fail to connect or get a 5xx are retried with jittered
+    exponential backoff; the last 5xx response is returned to the caller.
+    Every endpoint has its own circuit breaker, so one failing endpoint does
+    not block the others. With hedging on, an idempotent call still running
+    after the endpoint's p95 latency gets a second attempt and the first
+    response to arrive wins.
+
+    Metrics: attempts, retries, timeouts, failures, circuit_opens,
+    circuit_rejections, hedged, hedge_wins and per-endpoint latency (ms).
+    """
+    def __init__(
+            self,
+            name: str,
+            timeout: float = UPSTREAM_TIMEOUT,
+            retries: int = UPSTREAM_RETRIES,
+            backoff_base: float = UPSTREAM_BACKOFF_BASE,
+            backoff_max: float = UPSTREAM_BACKOFF_MAX,
+            hedge: bool = HEDGE_ENABLED,
+            breaker: Callable[[], CircuitBreaker] = CircuitBreaker,
+            limiter: Optional[RateLimiter] = None,
+        ):
+        """
+        :param name: Name the policy's metrics are registered under
+        :param timeout: Seconds allowed for one attempt
+        :param retries: Extra attempts for idempotent calls
+        :param backoff_base: First retry delay cap (seconds), doubled per attempt
+        :param backoff_max: Largest retry delay cap (seconds)
+        :param hedge: Send hedged attempts for slow idempotent calls
+        :param breaker: Factory for each endpoint's circuit breaker
+        :param limiter: Rate limiter every attempt (including hedges) is admitted by
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge = hedge
+        self._breaker_factory = breaker
+        self.limiter = limiter
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.metrics = Metrics(name)
+
+    def breaker(self, endpoint: str) -> CircuitBreaker:
+        breaker = self.breakers.get(endpoint)
+        if breaker is None:
+            breaker = self.breakers.setdefault(endpoint, self._breaker_factory())
+        return breaker
+
+    def _delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def call(
+            self,
+            endpoint: str,
+            send: Callable[[], Awaitable[httpx.Response]],
+            idempotent: bool = True,
+        ) -> httpx.Response:
+        """
+        Response of `send`, retried and hedged as configured.
+
+        :param endpoint: Endpoint name for the circuit breaker and latency metrics
+        :param send: Makes one attempt; called again for every retry or hedge
+        :param idempotent: Whether repeating the request is safe
+        """
+        breaker = self.breaker(endpoint)
+        attempts = self.retries + 1 if idempotent else 1
+        for attempt in range(attempts):
+            if not breaker.allow():
+                self.metrics.incr("circuit_rejections")
+                raise CircuitOpenError(f"{endpoint} is failing, not retrying for up to {breaker.reset_timeout:g}s")
+            last = attempt == attempts - 1
+            try:
+                response = await self._attempt(endpoint, send, hedge=idempotent and self.hedge)
+            except (asyncio.TimeoutError, httpx.TransportError) as err:
+                self._failed(endpoint, breaker)
+                if last:
+                    raise
+                error = f"{type(err).__name__}: {err}" if str(err) else type(err).__name__
+            except BaseException:
+                # not a verdict on the endpoint, e.g. RateLimitExceeded or cancellation
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    breaker.success()
+                    return response
+                self._failed(endpoint, breaker)
+                if last:
+                    return response
+                await response.aclose()
+                error = f"status code {response.status_code}"
+            delay = self._delay(attempt)
+            self.metrics.incr("retries")
+            logger.warning(f"{endpoint} failed ({error}), retry {attempt + 1}/{attempts - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+
+    def _failed(self, endpoint: str, breaker: CircuitBreaker):
+        self.metrics.incr("failures")
+        if breaker.failure():
+            self.metrics.incr("circuit_opens")
+            logger.warning(f"Circuit for {endpoint} opened after {breaker.failures} consecutive failures")
+
+    async def _timed(self, endpoint: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        if self.limiter is None:
+            return await self._with_timeout(endpoint, send)
+        return await self.limiter.send(endpoint, lambda: self._with_timeout(endpoint, send))
+
+    async def _with_timeout(self, endpoint: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        self.metrics.incr("attempts")
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(send(), self.timeout)
+        except asyncio.TimeoutError:
+            self.metrics.incr("timeouts")
+            raise
+        self.metrics.observe(f"{endpoint}_latency", (time.perf_counter() - start) * 1000)
+        return response
+
+    def _hedge_after(self, endpoint: str) -> Optional[float]:
+        """Seconds to wait before hedging, or None if this call should not be hedged."""
+        stats = self.metrics.latency(f"{endpoint}_latency")
+        if stats is None or len(stats.samples) < HEDGE_MIN_SAMPLES:
+            return None
+        if self.metrics.get("hedged") >= HEDGE_MAX_RATIO * self.metrics.get("attempts"):
+            return None
+        return stats.percentile(95) / 1000
+
+    async def _attempt(self, endpoint: str, send: Callable[[], Awaitable[httpx.Response]], hedge: bool) -> httpx.Response:
+        delay = self._hedge_after(endpoint) if hedge else None
+        if delay is None:
+            return await self._timed(endpoint, send)
+
+        primary = asyncio.ensure_future(self._timed(endpoint, send))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return primary.result()
+        self.metrics.incr("hedged")
+        backup = asyncio.ensure_future(self._timed(endpoint, send))
+        pending = {primary, backup}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.metrics.incr("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+                # a response that arrives after all still holds a connection
+                task.add_done_callback(_close_response)
+
+
+def _close_response(task: asyncio.Task):
+    if task.cancelled() or task.exception() is not None:
+        return
+    asyncio.ensure_future(task.result().aclose())
@@ -0,0 +1,219 @@
+import os
+import re
+import time
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional
+
+from metrics import Metrics
+from models import Coordinates, Price, Station
+from projection import select_stations
+
+logger = logging.getLogger(__name__)
+
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+# stations listed in a templated "cheapest" answer
+FAST_PATH_TOP_N = int(os.getenv("FAST_PATH_TOP_N", "3"))
+# longer prompts usually carry detail a template would ignore
+FAST_PATH_MAX_WORDS = int(os.getenv("FAST_PATH_MAX_WORDS", "12"))
+
+# spoken fuel names -> NSW API fuel codes; longer names first so "premium diesel" wins over "diesel"
+FUEL_NAMES = {
+    "premium diesel": "PDL",
+    "premium unleaded 95": "P95",
+    "premium unleaded 98": "P98",
+    "premium 95": "P95",
+    "premium 98": "P98",
+    "unleaded 91": "U91",
+    "ethanol 94": "E10",
+    "ethanol 105": "E85",
+    "biodiesel 20": "B20",
+    "biodiesel": "B20",
+    "unleaded": "U91",
+    "diesel": "DL",
+    "e10": "E10",
+    "u91": "U91",
+    "e85": "E85",
+    "p95": "P95",
+    "p98": "P98",
+    "dl": "DL",
+    "pdl": "PDL",
+    "b20": "B20",
+    "lpg": "LPG",
+    "cng": "CNG",
+    "ev": "EV",
+}
+_FUEL = "|".join(re.escape(name) for name in sorted(FUEL_NAMES, key=len, reverse=True))
+
+_GREETING = re.compile(r"^(?:hi|hello|hey|hiya|howdy|g'?day|good (?:morning|afternoon|evening))(?: there| mate| all)?$")
+# e.g. "price at station 20594", "what are the prices for station code 20594"
+_STATION_PRICE = re.compile(
+    r"^(?:(?:what|whats|what's) (?:is|are)? ?(?:the )?|(?:get|show|give) (?:me )?(?:the )?)?"
+    r"(?:current |latest )?(?:fuel )?prices? (?:at|for|of) (?:fuel )?station(?: code| number)? #?(\d{1,6})$"
+)
+# e.g. "cheapest e10 near 2150", "what's the cheapest diesel in parramatta 2150"
+_CHEAPEST = re.compile(
+    r"^(?:(?:what|whats|what's) (?:is )?(?:the )?|(?:find|show|get|give) (?:me )?(?:the )?)?"
+    rf"cheapest ({_FUEL})(?: fuel| petrol)? (?:near|in|around|at|for) (?:[a-z' -]+ )?(?:postcode )?(2\d{{3}})$"
+)
+# phrasing that refers to the user's own position
+_HERE = re.compile(r"\b(?:near me|nearby|around me|close to me|closest|nearest|cheapest|around here|near here)\b")
+_FUEL_QUERY = re.compile(rf"\b(?:fuel|petrol|gas|prices?|stations?|servos?|{_FUEL})\b")
+# anything that might name a place: numbers, prepositions before a place, "near <somewhere>"
+_LOCATION_HINT = re.compile(r"\d|\b(?:in|at|to|from|around (?!me\b|here\b)|near (?!me\b|here\b)|postcode|suburb|street|road|st|rd)\b")
+_WORD = re.compile(r"[A-Za-z][\w'-]*")
+
+GREETING_ANSWER = (
+    "Hi! I can help you find fuel prices at service stations across NSW. "
+    "Where are you currently located?"
+)
+CLARIFICATION_ANSWER = (
+    "Where are you currently located? "
+    "Please share a suburb, postcode or street address in NSW so I can find fuel prices near you."
+)
+
+
+def _normalize(prompt: str) -> str:
+    text = re.sub(r"\s+", " ", prompt.strip().lower())
+    return text.rstrip(" ?!.")
+
+
+def _format_price(price: Price) -> str:
+    return f"    - **{price.fueltype}:** {price.price} c/L"
+
+
+@dataclass
+class Route:
+    """A prompt answered without the model."""
+    intent: str
+    answer: str
+
+
+class FastPathRouter:
+    """
+    Answers formulaic prompts before they reach the model.
+
+    Recognized intents:
+    - greeting: a bare "hi"/"hello"
+    - station_price: "price at station 20594"
+    - cheapest: "cheapest E10 near 2150" (postcode geocoded, cheapest `top_n` stations listed)
+    - clarification: a short fuel question about "near me" with no location in it,
+      on a session without earlier turns that could hold the location
+
+    `route` returns None whenever the prompt is not a clear match or a lookup
+    comes back empty, and the caller falls through to the agent.
+    """
+    def __init__(
+            self,
+            fuel_client,
+            geocode: Callable[[str], Awaitable[Optional[Coordinates]]],
+            enabled: bool = FAST_PATH_ENABLED,
+            top_n: int = FAST_PATH_TOP_N,
+            max_words: int = FAST_PATH_MAX_WORDS,
+        ):
+        """
+        :param fuel_client: `NSWFuelClient` used for price lookups
+        :param geocode: Resolves an address to coordinates (e.g. `geocode_location`)
+        :param enabled: When False every prompt falls through
+        :param top_n: Stations listed in a "cheapest" answer
+        :param max_words: Prompts longer than this always fall through
+        """
+        self.fuel_client = fuel_client
+        self.geocode = geocode
+        self.enabled = enabled
+        self.top_n = top_n
+        self.max_words = max_words
+        self.metrics = Metrics("fast_path")
+
+    async def route(self, prompt: Optional[str], has_history: Callable[[], bool] = lambda: False) -> Optional[Route]:
+        """
+        Templated answer for `prompt`, or None to hand it to the agent.
+
+        :param prompt: The user's message
+        :param has_history: Whether the session has earlier turns; only asked for clarification candidates
+        """
+        if not self.enabled or not prompt:
+            return None
+        start = time.perf_counter()
+        try:
+            route = await self._route(prompt, has_history)
+        except Exception as err:
+            self.metrics.incr("errors")
+            logger.warning(f"Fast path lookup failed, falling through to agent: {err}")
+            route = None
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if route is None:
+            self.metrics.incr("fallthrough")
+            self.metrics.observe("fallthrough_latency", elapsed_ms)
+            logger.info(f"Fast path: no match, routing to agent ({elapsed_ms:.1f} ms)")
+        else:
+            self.metrics.incr("routed")
+            self.metrics.incr(f"routed_{route.intent}")
+            self.metrics.observe("latency", elapsed_ms)
+            logger.info(f"Fast path: answered '{route.intent}' without the model ({elapsed_ms:.1f} ms)")
+        return route
+
+    async def _route(self, prompt: str, has_history: Callable[[], bool]) -> Optional[Route]:
+        text = _normalize(prompt)
+        if len(text.split()) > self.max_words:
+            return None
+
+        if _GREETING.match(text):
+            return Route("greeting", GREETING_ANSWER)
+
+        match = _STATION_PRICE.match(text)
+        if match:
+            return await self._station_price(match.group(1))
+
+        match = _CHEAPEST.match(text)
+        if match:
+            return await self._cheapest(FUEL_NAMES[match.group(1)], match.group(2))
+
+        if self._needs_location(prompt, text) and not has_history():
+            return Route("clarification", CLARIFICATION_ANSWER)
+        return None
+
+    def _needs_location(self, prompt: str, text: str) -> bool:
+        if not (_HERE.search(text) and _FUEL_QUERY.search(text)):
+            return False
+        # fuel names carry digits and capitals ("Unleaded 91", "LPG") that are not place names
+        remainder = _HERE.sub(" ", re.sub(rf"\b(?:{_FUEL})\b", " ", text))
+        if _LOCATION_HINT.search(remainder):
+            return False
+        # a capitalized word past the first is most likely a place ("Newtown")
+        fuel_words = {word for name in FUEL_NAMES for word in name.split()}
+        words = _WORD.findall(prompt)
+        return not any(word[0].isupper() and word != "I" and word.lower() not in fuel_words for word in words[1:])
+
+    async def _station_price(self, station_code: str) -> Optional[Route]:
+        prices: Optional[List[Price]] = await self.fuel_client.get_price_at_station(station_code)
+        if not prices:
+            return None
+        lines = [f"Current fuel prices at station **{station_code}**:"]
+        lines.extend(_format_price(price) for price in prices)
+        return Route("station_price", "\n".join(lines))
+
+    async def _cheapest(self, fueltype: str, postcode: str) -> Optional[Route]:
+        coordinates = await self.geocode(f"{postcode} NSW")
+        if coordinates is None:
+            return None
+        stations: Optional[List[Station]] = await self.fuel_client.find_prices_for_location(
+            postcode, coordinates.latitude, coordinates.longitude, fueltype, []
+        )
+        # keep only the requested fuel; a station without it has nothing to show
+        stations = [
+            station.model_copy(update={"prices": [price for price in station.prices if price.fueltype == fueltype]})
+            for station in stations or []
+        ]
+        stations = [station for station in stations if station.prices]
+        if not stations:
+            return None
+        lines = [f"Here are the cheapest {fueltype} prices near {postcode}:", ""]
+        for rank, station in enumerate(select_stations(stations, limit=self.top_n, sort_by="price"), start=1):
+            lines.append(f"{rank}) **{station.name}**")
+            lines.append(f"    - **Address:** {station.address}")
+            if station.distance is not None:
+                lines.append(f"    - **Distance:** {station.distance} km")
+            lines.extend(_format_price(price) for price in station.prices)
+            lines.append("")
+        return Route("cheapest", "\n".join(lines).rstrip())
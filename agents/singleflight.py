@@ -0,0 +1,49 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from metrics import Metrics
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into one.
+
+    The first caller for a key starts `fetch` as a task; callers arriving
+    while it is in flight await the same task and get the same result (or
+    exception) instead of issuing their own upstream request. The entry is
+    dropped as soon as the call finishes, so nothing is cached: later calls
+    fetch again. A caller that is cancelled does not cancel the shared call.
+    """
+    def __init__(self, name: str):
+        """
+        :param name: Name the counters are registered under (upstream_calls, calls_saved)
+        """
+        self._calls: Dict[Tuple[int, Hashable], asyncio.Task] = {}
+        self.metrics = Metrics(name)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Result of `fetch()`, shared with every concurrent call for `key`.
+        """
+        loop = asyncio.get_running_loop()
+        # tasks belong to one event loop, so each loop has its own flights
+        flight_key = (id(loop), key)
+        task = self._calls.get(flight_key)
+        if task is None:
+            task = loop.create_task(self._run(flight_key, fetch))
+            # the exception is still retrieved when every waiter was cancelled
+            task.add_done_callback(lambda done: done.cancelled() or done.exception())
+            self._calls[flight_key] = task
+            self.metrics.incr("upstream_calls")
+        else:
+            self.metrics.incr("calls_saved")
+        return await asyncio.shield(task)
+
+    async def _run(self, flight_key: Tuple[int, Hashable], fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fetch()
+        finally:
+            self._calls.pop(flight_key, None)
@@ -0,0 +1,262 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from metrics import Metrics
+from models import Coordinates, Price, Station
+from parsing import construct
+from spatial import SpatialIndex
+from station_table import StationTable
+
+logger = logging.getLogger(__name__)
+
+FUEL_SNAPSHOT_ENABLED = os.getenv("FUEL_SNAPSHOT_ENABLED", "true").lower() in ("1", "true", "yes")
+# how often the "new prices" delta feed is polled
+FUEL_SNAPSHOT_DELTA_INTERVAL = float(os.getenv("FUEL_SNAPSHOT_DELTA_INTERVAL", "60"))
+# a snapshot older than this is not trusted and callers fall back to the live API
+FUEL_SNAPSHOT_MAX_STALENESS = float(os.getenv("FUEL_SNAPSHOT_MAX_STALENESS", "600"))
+# wait after a failed full load before the next attempt (seconds), doubled per failure up to the max
+FUEL_SNAPSHOT_RETRY_BACKOFF = float(os.getenv("FUEL_SNAPSHOT_RETRY_BACKOFF", "30"))
+FUEL_SNAPSHOT_RETRY_MAX = float(os.getenv("FUEL_SNAPSHOT_RETRY_MAX", "600"))
+
+
+class PriceSnapshot:
+    """
+    In-process copy of every current NSW fuel price.
+
+    A background task loads the full "all prices" dump, then applies the "new
+    prices" delta feed on a schedule, reloading the dump whenever the snapshot
+    has gone stale. Only the long-running runtime starts it (`start` from the
+    app lifespan), since the dump has a tight request budget; short-lived
+    loops such as eval cases never load it. Callers never wait for it: until
+    the snapshot is `ready` they use the live API. Queries answer with the same `Station` / `Price`
+    shapes as the live location, nearby and station endpoints. The records come
+    straight from the NSW API, so models are built without validation.
+    """
+    def __init__(
+            self,
+            stream_all: Callable[[], AsyncIterator[Tuple[str, Dict]]],
+            fetch_new: Callable[[], Awaitable[Optional[Dict]]],
+            delta_interval: float = FUEL_SNAPSHOT_DELTA_INTERVAL,
+            max_staleness: float = FUEL_SNAPSHOT_MAX_STALENESS,
+            retry_backoff: float = FUEL_SNAPSHOT_RETRY_BACKOFF,
+            retry_max: float = FUEL_SNAPSHOT_RETRY_MAX,
+        ):
+        """
+        :param stream_all: Async generator function yielding ("stations" | "prices", record) for the full dump
+        :param fetch_new: Coroutine function returning prices changed since its previous call
+        :param delta_interval: Seconds between delta polls
+        :param max_staleness: Seconds after the last successful update before the snapshot is considered unusable
+        :param retry_backoff: Seconds to wait after a failed full load, doubled per consecutive failure
+        :param retry_max: Longest wait between full load attempts
+        """
+        self._stream_all = stream_all
+        self._fetch_new = fetch_new
+        self.delta_interval = delta_interval
+        self.max_staleness = max_staleness
+        self.retry_backoff = retry_backoff
+        self.retry_max = retry_max
+        # station code -> station fields
+        self.stations: Dict[str, Dict] = {}
+        # station code -> fueltype -> (price, last_updated)
+        self.prices: Dict[str, Dict[str, Tuple[float, str]]] = {}
+        # station coordinates for radius and nearest-station queries
+        self.index = SpatialIndex()
+        # columnar copy for bulk filtering/aggregation, built on demand
+        self._table: Optional[StationTable] = None
+        self.loaded = False
+        self.updated_at = 0.0
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = Metrics("price_snapshot")
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded and time.monotonic() - self.updated_at < self.max_staleness
+
+    def start(self):
+        """
+        Start the background load and delta polling on the running event loop,
+        unless they already run. Never waits for the load.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._maintain())
+
+    async def stop(self):
+        """Cancel the background task; the snapshot keeps its data until it goes stale."""
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _maintain(self):
+        backoff = self.retry_backoff
+        while True:
+            if not self.ready:
+                try:
+                    await self.load()
+                    backoff = self.retry_backoff
+                except Exception as err:
+                    logger.warning(f"Price snapshot load failed, live API serves prices; retrying in {backoff:.0f}s: {err}")
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, self.retry_max)
+                    continue
+            await asyncio.sleep(self.delta_interval)
+            try:
+                await self.apply_delta()
+            except Exception as err:
+                self.metrics.incr("delta_failures")
+                logger.warning(f"Failed to apply price delta: {err}")
+
+    async def load(self):
+        """
+        Replace the snapshot with the full price dump.
+
+        Records are applied as they are streamed in, into fresh structures that
+        are swapped in only once the dump is complete, so queries keep using the
+        previous snapshot meanwhile and a failed load leaves it untouched.
+        """
+        start = time.perf_counter()
+        stations: Dict[str, Dict] = {}
+        prices: Dict[str, Dict[str, Tuple[float, str]]] = {}
+        index = SpatialIndex()
+        try:
+            async for key, record in self._stream_all():
+                if key == "stations":
+                    _add_station(stations, index, record)
+                elif key == "prices":
+                    _add_price(prices, record)
+        except Exception:
+            self.metrics.incr("load_failures")
+            raise
+        self.stations, self.prices, self.index = stations, prices, index
+        self._table = None
+        self.loaded = True
+        self.updated_at = time.monotonic()
+        self.metrics.incr("full_loads")
+        self.metrics.observe("full_load_latency", (time.perf_counter() - start) * 1000)
+        logger.info(f"Loaded price snapshot: {len(self.stations)} stations, {sum(len(p) for p in self.prices.values())} prices")
+
+    async def apply_delta(self):
+        """
+        Fetch and apply prices that changed since the previous delta call.
+        """
+        response = await self._fetch_new()
+        if response is None:
+            self.metrics.incr("delta_failures")
+            return
+        self._apply(response)
+        self.updated_at = time.monotonic()
+        self.metrics.incr("deltas_applied")
+        self.metrics.incr("delta_prices", len(response.get("prices") or []))
+
+    def _apply(self, response: Dict):
+        self._table = None
+        for station in response.get("stations") or []:
+            _add_station(self.stations, self.index, station)
+        for price in response.get("prices") or []:
+            _add_price(self.prices, price)
+
+    def _station(self, station_code: str, fueltype: str, distance: Optional[float]) -> Station:
+        station = self.stations[station_code]
+        price, last_updated = self.prices[station_code][fueltype]
+        return construct(Station, {
+            "name": station["name"],
+            "brand": station["brand"],
+            "brandid": station["brandid"],
+            "address": station["address"],
+            "coordinates": construct(Coordinates, {"latitude": station["latitude"], "longitude": station["longitude"]}),
+            "distance": distance,
+            "station_code": station_code,
+            "stationid": station["stationid"],
+            "prices": [self._price(station_code, fueltype, price, last_updated)],
+        })
+
+    @staticmethod
+    def _price(station_code: str, fueltype: str, price: float, last_updated: str) -> Price:
+        return construct(Price, {"station_code": station_code, "fueltype": fueltype, "price": price, "last_updated": last_updated})
+
+    def _matches(self, station_code: str, fueltype: str, brands: Optional[List[str]]) -> bool:
+        station = self.stations.get(station_code)
+        if station is None or station["latitude"] is None or fueltype not in self.prices.get(station_code, {}):
+            return False
+        return not brands or station["brand"].lower() in brands
+
+    def _sorted(self, matches: List[Tuple[str, float]], fueltype: str) -> List[Station]:
+        # same ordering as the API's sortby=Price, sortascending=true; distance breaks ties
+        matches.sort(key=lambda match: (self.prices[match[0]][fueltype][0], match[1]))
+        return [self._station(code, fueltype, round(distance, 2)) for code, distance in matches]
+
+    def nearby(self, latitude: float, longitude: float, radius: float, fueltype: str, brands: Optional[List[str]] = None) -> List[Station]:
+        """
+        Stations selling `fueltype` within `radius` km of a point, cheapest first.
+        """
+        fueltype = fueltype.upper()
+        brands = [brand.lower() for brand in brands or []]
+        matches = [
+            (station_code, distance)
+            for station_code, distance in self.index.within_radius(latitude, longitude, float(radius))
+            if self._matches(station_code, fueltype, brands)
+        ]
+        return self._sorted(matches, fueltype)
+
+    def for_location(self, postcode: str, latitude: float, longitude: float, fueltype: str, brands: Optional[List[str]] = None) -> List[Station]:
+        """
+        Stations selling `fueltype` whose address is in `postcode`, cheapest first.
+        Distances are measured from the reference point.
+        """
+        postcode = str(postcode).strip()
+        if not postcode.isdigit():
+            return []
+        table = (
+            self.table()
+            .filter(fueltype=fueltype, brands=brands, postcode=postcode)
+            .with_distance(latitude, longitude)
+            .sort_by("price", "distance")
+        )
+        return table.to_stations()
+
+    def table(self) -> StationTable:
+        """
+        Columnar view of the whole snapshot, rebuilt lazily after each update.
+        """
+        if self._table is None:
+            self._table = StationTable.from_records(self.stations, self.prices)
+        return self._table
+
+    def station_prices(self, station_code: str) -> Optional[List[Price]]:
+        """
+        All current prices at a station, or None if the station is unknown.
+        """
+        prices = self.prices.get(str(station_code))
+        if prices is None:
+            return None
+        return [
+            self._price(str(station_code), fueltype, price, last_updated)
+            for fueltype, (price, last_updated) in prices.items()
+        ]
+
+
+def _add_station(stations: Dict[str, Dict], index: SpatialIndex, station: Dict):
+    location = station.get("location") or {}
+    stations[str(station["code"])] = {
+        "name": station["name"],
+        "brand": sys.intern(station["brand"]),
+        "brandid": station.get("brandid"),
+        "stationid": station.get("stationid"),
+        "address": station["address"],
+        "latitude": location.get("latitude"),
+        "longitude": location.get("longitude"),
+    }
+    if location.get("latitude") is not None and location.get("longitude") is not None:
+        index.add(str(station["code"]), location["latitude"], location["longitude"])
+
+
+def _add_price(prices: Dict[str, Dict[str, Tuple[float, str]]], price: Dict):
+    station_code = str(price["stationcode"])
+    prices.setdefault(station_code, {})[sys.intern(price["fueltype"])] = (price["price"], price["lastupdated"])
@@ -0,0 +1,194 @@
+import math
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from geo import EARTH_RADIUS_KM, haversine_km_vectorized
+
+KM_PER_DEGREE = 111.32
+
+
+class SpatialIndex:
+    """
+    Uniform lat/lon grid over station coordinates.
+
+    Each station occupies a slot in flat NumPy coordinate arrays; grid cells
+    hold slot numbers. Radius and box queries collect candidate slots from
+    the cells that overlap the search area and refine them with a vectorized
+    haversine; `nearest` widens rings of cells around the query point.
+    Stations can be added, moved or removed without rebuilding the index.
+    """
+    def __init__(self, cell_size_deg: float = 0.05, capacity: int = 4096):
+        """
+        :param cell_size_deg: Grid cell edge in degrees (0.05 is ~5.5 x 4.6 km in Sydney)
+        :param capacity: Initial number of slots; the arrays double when full
+        """
+        self.cell_size_deg = cell_size_deg
+        self._latitudes = np.zeros(capacity, dtype=np.float64)
+        self._longitudes = np.zeros(capacity, dtype=np.float64)
+        self._codes: List[Optional[str]] = [None] * capacity
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._next_slot = 0
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self._slots
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return (math.floor(latitude / self.cell_size_deg), math.floor(longitude / self.cell_size_deg))
+
+    def _grow(self):
+        capacity = len(self._codes) * 2
+        self._latitudes = np.resize(self._latitudes, capacity)
+        self._longitudes = np.resize(self._longitudes, capacity)
+        self._codes.extend([None] * (capacity - len(self._codes)))
+
+    def add(self, code: str, latitude: float, longitude: float):
+        """
+        Insert a station, or move it if it is already indexed.
+        """
+        if code in self._slots:
+            self.remove(code)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            if self._next_slot == len(self._codes):
+                self._grow()
+            slot = self._next_slot
+            self._next_slot += 1
+        self._latitudes[slot] = latitude
+        self._longitudes[slot] = longitude
+        self._codes[slot] = code
+        self._slots[code] = slot
+        self._cells.setdefault(self._cell(latitude, longitude), set()).add(slot)
+
+    def remove(self, code: str) -> bool:
+        """
+        Remove a station. Returns False if it was not indexed.
+        """
+        slot = self._slots.pop(code, None)
+        if slot is None:
+            return False
+        cell = self._cell(self._latitudes[slot], self._longitudes[slot])
+        members = self._cells.get(cell)
+        if members is not None:
+            members.discard(slot)
+            if not members:
+                del self._cells[cell]
+        self._codes[slot] = None
+        self._free.append(slot)
+        return True
+
+    def _candidates(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> np.ndarray:
+        min_row, min_col = self._cell(min_lat, min_lon)
+        max_row, max_col = self._cell(max_lat, max_lon)
+        # for very large areas walking the occupied cells is cheaper than walking the grid
+        if (max_row - min_row + 1) * (max_col - min_col + 1) > len(self._cells):
+            slots = [
+                slot
+                for (row, col), members in self._cells.items()
+                if min_row <= row <= max_row and min_col <= col <= max_col
+                for slot in members
+            ]
+        else:
+            slots = []
+            for row in range(min_row, max_row + 1):
+                for col in range(min_col, max_col + 1):
+                    members = self._cells.get((row, col))
+                    if members:
+                        slots.extend(members)
+        return np.fromiter(slots, dtype=np.intp, count=len(slots))
+
+    def _search_box(self, latitude: float, longitude: float, radius_km: float) -> Tuple[float, float, float, float]:
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 1e-6))
+        return latitude - dlat, longitude - dlon, latitude + dlat, longitude + dlon
+
+    def _distances(self, latitude: float, longitude: float, slots: np.ndarray) -> np.ndarray:
+        return haversine_km_vectorized(latitude, longitude, self._latitudes[slots], self._longitudes[slots])
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[str, float]]:
+        """
+        Stations within `radius_km` of a point as (code, distance_km), nearest first.
+        """
+        slots = self._candidates(*self._search_box(latitude, longitude, radius_km))
+        if not len(slots):
+            return []
+        distances = self._distances(latitude, longitude, slots)
+        inside = distances <= radius_km
+        slots, distances = slots[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return [(self._codes[slots[i]], float(distances[i])) for i in order]
+
+    def _ring(self, row: int, col: int, n: int) -> List[int]:
+        """Slots in the cells exactly `n` cells (Chebyshev distance) from (row, col)."""
+        if n == 0:
+            cells = [(row, col)]
+        else:
+            cells = [(r, c) for r in (row - n, row + n) for c in range(col - n, col + n + 1)]
+            cells += [(r, c) for c in (col - n, col + n) for r in range(row - n + 1, row + n)]
+        slots = []
+        for cell in cells:
+            members = self._cells.get(cell)
+            if members:
+                slots.extend(members)
+        return slots
+
+    def _clearance(self, latitude: float, longitude: float, row: int, col: int, n: int) -> float:
+        """
+        Lower bound (km) on the distance from the point to any station outside
+        the cells within `n` rings of (row, col).
+        """
+        size = self.cell_size_deg
+        lat_gap = min(latitude - (row - n) * size, (row + n + 1) * size - latitude)
+        lon_gap = min(longitude - (col - n) * size, (col + n + 1) * size - longitude)
+        # distance to the nearest box meridian is asin(sin(dlon) * cos(lat)) on the sphere
+        lon_km = math.asin(min(1.0, math.sin(math.radians(min(lon_gap, 90.0))) * math.cos(math.radians(latitude))))
+        return EARTH_RADIUS_KM * min(math.radians(lat_gap), lon_km)
+
+    def nearest(self, latitude: float, longitude: float, k: int, max_radius_km: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        The `k` stations closest to a point as (code, distance_km), nearest first.
+
+        Rings of cells around the point's cell are added one at a time until
+        `k` candidates are closer than anything outside the rings can be, or
+        every candidate left is beyond `max_radius_km`.
+        """
+        if k <= 0 or not self._slots:
+            return []
+        limit = max_radius_km if max_radius_km is not None else math.inf
+        row, col = self._cell(latitude, longitude)
+        slots, distances = np.empty(0, dtype=np.intp), np.empty(0)
+        n = 0
+        while len(slots) < len(self._slots):
+            if 8 * n > len(self._cells):
+                # the ring is longer than the list of occupied cells; take everything not yet seen
+                seen = set(slots.tolist())
+                ring = [slot for members in self._cells.values() for slot in members if slot not in seen]
+            else:
+                ring = self._ring(row, col, n)
+            if ring:
+                ring = np.array(ring, dtype=np.intp)
+                slots = np.concatenate([slots, ring])
+                distances = np.concatenate([distances, self._distances(latitude, longitude, ring)])
+            clearance = self._clearance(latitude, longitude, row, col, n)
+            if clearance >= limit or (len(slots) >= k and np.partition(distances, k - 1)[k - 1] <= clearance):
+                break
+            n += 1
+        order = np.argsort(distances, kind="stable")[:k]
+        return [(self._codes[slots[i]], float(distances[i])) for i in order if distances[i] <= limit]
+
+    def in_bounding_box(self, min_lat: float, min_lon: float, max_lat: float, max_lon: float) -> List[str]:
+        """
+        Codes of stations inside a latitude/longitude box (edges inclusive).
+        """
+        slots = self._candidates(min_lat, min_lon, max_lat, max_lon)
+        if not len(slots):
+            return []
+        latitudes, longitudes = self._latitudes[slots], self._longitudes[slots]
+        inside = (latitudes >= min_lat) & (latitudes <= max_lat) & (longitudes >= min_lon) & (longitudes <= max_lon)
+        return [self._codes[slot] for slot in slots[inside]]
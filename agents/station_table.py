@@ -0,0 +1,295 @@
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from geo import haversine_km_vectorized
+from models import Coordinates, Price, Station
+from parsing import construct
+
+_POSTCODE = re.compile(r"(\d{4})\s*$")
+
+
+class _Dictionary:
+    """
+    Dictionary encoding for a repeated string column: values <-> int codes.
+    """
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def lookup(self, values: Iterable[str], case_insensitive: bool = False) -> np.ndarray:
+        if case_insensitive:
+            wanted = {value.lower() for value in values}
+            return np.array([code for value, code in self.codes.items() if value.lower() in wanted], dtype=np.int32)
+        return np.array([self.codes[value] for value in values if value in self.codes], dtype=np.int32)
+
+
+class StationTable:
+    """
+    Columnar table of current prices, one row per (station, fuel type).
+
+    Numeric columns (latitude, longitude, price, last_updated, postcode) are
+    NumPy arrays; station code, brand and fuel type are dictionary-encoded.
+    `last_updated` is parsed for sorting and filtering (NaT if unparseable);
+    the API's original string is kept in `last_updated_text` and is what
+    `to_stations` reports.
+    Filters, sorts and `head` return views that share the parent's columns and
+    only carry an array of row numbers, so nothing is copied until a column
+    is read. `to_stations` builds the pydantic models for the selected rows.
+    """
+    def __init__(self, columns: Dict[str, np.ndarray], stations: _Dictionary, brands: _Dictionary,
+                 fueltypes: _Dictionary, station_info: List[Tuple[str, str, Optional[str], Optional[str]]],
+                 rows: Optional[np.ndarray] = None, distance: Optional[np.ndarray] = None):
+        self._columns = columns
+        self._stations = stations
+        self._brands = brands
+        self._fueltypes = fueltypes
+        # per station code: (name, address, brandid, stationid)
+        self._station_info = station_info
+        self._rows = rows
+        # distance from a reference point, aligned with this view's rows
+        self._distance = distance
+
+    # ── Construction ──────────────────────────────────────────────────────
+
+    @classmethod
+    def from_records(cls, stations: Dict[str, Dict], prices: Dict[str, Dict[str, Tuple[float, str]]]) -> "StationTable":
+        """
+        Build a table from the price snapshot's station and price dicts.
+        """
+        station_dict, brand_dict, fuel_dict = _Dictionary(), _Dictionary(), _Dictionary()
+        station_info = []
+        station_idx, brand_idx, fuel_idx = [], [], []
+        latitudes, longitudes, values, updated, postcodes = [], [], [], [], []
+        for station_code, station_prices in prices.items():
+            station = stations.get(station_code)
+            if station is None or station["latitude"] is None:
+                continue
+            code = station_dict.encode(station_code)
+            if code == len(station_info):
+                station_info.append((station["name"], station["address"], station.get("brandid"), station.get("stationid")))
+            brand = brand_dict.encode(station["brand"])
+            postcode = _POSTCODE.search(station["address"])
+            for fueltype, (price, last_updated) in station_prices.items():
+                station_idx.append(code)
+                brand_idx.append(brand)
+                fuel_idx.append(fuel_dict.encode(fueltype))
+                latitudes.append(station["latitude"])
+                longitudes.append(station["longitude"])
+                values.append(price)
+                updated.append(last_updated)
+                postcodes.append(int(postcode.group(1)) if postcode else -1)
+        columns = {
+            "station": np.array(station_idx, dtype=np.int32),
+            "brand": np.array(brand_idx, dtype=np.int16),
+            "fueltype": np.array(fuel_idx, dtype=np.int16),
+            "latitude": np.array(latitudes, dtype=np.float64),
+            "longitude": np.array(longitudes, dtype=np.float64),
+            "price": np.array(values, dtype=np.float64),
+            "last_updated": _parse_timestamps(updated),
+            "last_updated_text": np.array(updated, dtype=object),
+            "postcode": np.array(postcodes, dtype=np.int16),
+        }
+        return cls(columns, station_dict, brand_dict, fuel_dict, station_info)
+
+    # ── Views ─────────────────────────────────────────────────────────────
+
+    def _view(self, positions, distance: Optional[np.ndarray] = None) -> "StationTable":
+        """View of this view's rows at `positions` (indices, a mask or a slice)."""
+        if distance is None and self._distance is not None:
+            distance = self._distance[positions]
+        return StationTable(self._columns, self._stations, self._brands, self._fueltypes, self._station_info,
+                            rows=self.rows[positions], distance=distance)
+
+    def __len__(self) -> int:
+        return len(self._columns["price"]) if self._rows is None else len(self._rows)
+
+    @property
+    def rows(self) -> np.ndarray:
+        """Row numbers (into the base columns) selected by this view."""
+        return np.arange(len(self._columns["price"])) if self._rows is None else self._rows
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Values of a column for the selected rows. Returns the base array itself
+        (no copy) for an unfiltered table. `distance` is available after `with_distance`.
+        """
+        if name == "distance":
+            if self._distance is None:
+                raise KeyError("distance is only available after with_distance()")
+            return self._distance
+        base = self._columns[name]
+        return base if self._rows is None else base[self._rows]
+
+    def where(self, mask: np.ndarray) -> "StationTable":
+        """View of the rows where `mask` (aligned with this view) is True."""
+        return self._view(mask)
+
+    def filter(
+            self,
+            fueltype: Optional[str] = None,
+            brands: Optional[Sequence[str]] = None,
+            postcode: Optional[str] = None,
+            station_codes: Optional[Sequence[str]] = None,
+        ) -> "StationTable":
+        """
+        View restricted to a fuel type, any of `brands` (case-insensitive),
+        a postcode and/or a set of station codes.
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if fueltype is not None:
+            mask &= np.isin(self.column("fueltype"), self._fueltypes.lookup([fueltype.upper()]))
+        if brands:
+            mask &= np.isin(self.column("brand"), self._brands.lookup(brands, case_insensitive=True))
+        if postcode is not None:
+            mask &= self.column("postcode") == int(postcode)
+        if station_codes is not None:
+            mask &= np.isin(self.column("station"), self._stations.lookup(str(code) for code in station_codes))
+        return self.where(mask)
+
+    def with_distance(self, latitude: float, longitude: float) -> "StationTable":
+        """
+        View with a `distance` column (km) from the given point, computed
+        for the selected rows only.
+        """
+        distance = haversine_km_vectorized(latitude, longitude, self.column("latitude"), self.column("longitude"))
+        return self._view(slice(None), distance=distance)
+
+    def sort_by(self, *names: str, descending: bool = False) -> "StationTable":
+        """
+        View ordered by one or more columns; the first name is the primary key.
+        """
+        keys = [self.column(name) for name in reversed(names)]
+        order = np.lexsort(keys)
+        if descending:
+            order = order[::-1]
+        return self._view(order)
+
+    def head(self, n: int) -> "StationTable":
+        return self._view(slice(None, n))
+
+    # ── Aggregates ────────────────────────────────────────────────────────
+
+    def price_summary_by(self, name: str = "postcode") -> Dict:
+        """
+        Min / median / max price and row count per value of `name` (e.g.
+        postcode, brand or fueltype). Rows are sorted by group and price once;
+        every statistic is then read at the group boundaries.
+        """
+        keys, prices = self.column(name), self.column("price")
+        order = np.lexsort((prices, keys))
+        keys, prices = keys[order], prices[order]
+        groups, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        ends = starts + counts - 1
+        medians = (prices[starts + (counts - 1) // 2] + prices[starts + counts // 2]) / 2
+        return {
+            self._decode(name, group): {
+                "min": float(prices[start]),
+                "median": float(median),
+                "max": float(prices[end]),
+                "count": int(count),
+            }
+            for group, start, end, median, count in zip(groups.tolist(), starts, ends, medians, counts)
+        }
+
+    def _decode(self, name: str, value: int):
+        if name == "brand":
+            return self._brands.values[value]
+        if name == "fueltype":
+            return self._fueltypes.values[value]
+        if name == "station":
+            return self._stations.values[value]
+        return value
+
+    # ── Conversion ────────────────────────────────────────────────────────
+
+    def to_frame(self):
+        """
+        pandas DataFrame of the selected rows with decoded string columns and
+        the API's original `last_updated` strings. pandas is only needed for
+        this method.
+        """
+        import pandas as pd
+
+        frame = {
+            "station_code": pd.Categorical.from_codes(self.column("station"), self._stations.values),
+            "brand": pd.Categorical.from_codes(self.column("brand"), self._brands.values),
+            "fueltype": pd.Categorical.from_codes(self.column("fueltype"), self._fueltypes.values),
+        }
+        for name in ("latitude", "longitude", "price", "postcode"):
+            frame[name] = self.column(name)
+        frame["last_updated"] = self.column("last_updated_text")
+        if self._distance is not None:
+            frame["distance"] = self.column("distance")
+        return pd.DataFrame(frame)
+
+    def to_stations(self) -> List[Station]:
+        """
+        `Station` models for the selected rows, in view order. Rows of the same
+        station are merged into one `Station` with several prices.
+        """
+        stations: Dict[int, Station] = {}
+        station_col, brand_col, fuel_col = self.column("station"), self.column("brand"), self.column("fueltype")
+        lat_col, lon_col, price_col = self.column("latitude"), self.column("longitude"), self.column("price")
+        updated_col = self.column("last_updated_text")
+        distance_col = self.column("distance") if self._distance is not None else None
+        for i in range(len(self)):
+            code = int(station_col[i])
+            station_code = self._stations.values[code]
+            price = construct(Price, {
+                "station_code": station_code,
+                "fueltype": self._fueltypes.values[fuel_col[i]],
+                "price": float(price_col[i]),
+                "last_updated": updated_col[i],
+            })
+            station = stations.get(code)
+            if station is not None:
+                station.prices.append(price)
+                continue
+            name, address, brandid, stationid = self._station_info[code]
+            stations[code] = construct(Station, {
+                "name": name,
+                "brand": self._brands.values[brand_col[i]],
+                "brandid": brandid,
+                "address": address,
+                "coordinates": construct(Coordinates, {"latitude": float(lat_col[i]), "longitude": float(lon_col[i])}),
+                "distance": None if distance_col is None else round(float(distance_col[i]), 2),
+                "station_code": station_code,
+                "stationid": stationid,
+                "prices": [price],
+            })
+        return list(stations.values())
+
+
+def _parse_timestamps(values: List[str]) -> np.ndarray:
+    """
+    NSW API timestamps ("dd/mm/yyyy HH:MM:SS", also without zero padding) as
+    datetime64[s]; NaT if unparseable.
+    """
+    iso = []
+    for value in values:
+        try:
+            date, time = value.split(" ", 1)
+            day, month, year = date.split("/")
+            iso.append(f"{year}-{month.zfill(2)}-{day.zfill(2)}T{time.zfill(8)}")
+        except (AttributeError, ValueError):
+            iso.append("NaT")
+    try:
+        return np.array(iso, dtype="datetime64[s]")
+    except ValueError:
+        parsed = []
+        for value in iso:
+            try:
+                parsed.append(np.datetime64(value, "s"))
+            except ValueError:
+                parsed.append(np.datetime64("NaT"))
+        return np.array(parsed, dtype="datetime64[s]")
+
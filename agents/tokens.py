@@ -0,0 +1,11 @@
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token for English text). Close enough
+    for budgeting and reporting without shipping a tokenizer for every model provider.
+    """
+    return tokens_for_length(len(text))
+
+
+def tokens_for_length(chars: int) -> int:
+    """`estimate_tokens` for text of `chars` characters, when only its length is known."""
+    return (chars + 3) // 4
@@ -1,70 +1,236 @@
 import os
-import requests
+import re
 import json
+import atexit
+import asyncio
 import logging
-from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Tuple, List, Dict
+from typing import AsyncIterator, Iterable, Tuple, List, Dict, Optional
+import httpx
 from strands import tool
 from models import Station, Coordinates, Price
+from transport import get_http_client
+from auth import TokenManager, TokenError
+from geocode_cache import GeocodeCache, normalize_address
+from gazetteer import Gazetteer, GAZETTEER_ENABLED
+from price_cache import PriceCache
+from parsing import parse_prices, parse_stations_response, parse_stations_stream
+from json_stream import iter_json_arrays
+from projection import project_stations
+from singleflight import SingleFlight
+from ratelimit import RateLimiter
+from resilience import UpstreamPolicy
+from price_history import open_price_history
+from snapshot import PriceSnapshot, FUEL_SNAPSHOT_ENABLED
 from dotenv import load_dotenv 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
 NSW_API_BASE_URL="https://api.onegov.nsw.gov.au"
+# nearby searches at least this wide (km) are decoded as a stream
+STREAM_JSON_MIN_RADIUS = float(os.getenv("STREAM_JSON_MIN_RADIUS", "20"))
+# maximum concurrent station lookups made by get_prices_at_stations
+STATION_LOOKUP_CONCURRENCY = int(os.getenv("STATION_LOOKUP_CONCURRENCY", "5"))
+# client-side request budgets (requests per second, back-to-back burst) for each upstream API
+NSW_API_RATE_LIMIT = float(os.getenv("NSW_API_RATE_LIMIT", "5"))
+NSW_API_BURST = int(os.getenv("NSW_API_BURST", "10"))
+MAPBOX_RATE_LIMIT = float(os.getenv("MAPBOX_RATE_LIMIT", "10"))
+MAPBOX_BURST = int(os.getenv("MAPBOX_BURST", "20"))
+
+# shared by every agent in the process; repeat addresses skip the Mapbox round trip
+geocode_cache = GeocodeCache()
+
+# callers queue for the upstream quotas instead of running into 429s
+nsw_rate_limiter = RateLimiter(
+    "nsw_fuel_rate_limit",
+    rate=NSW_API_RATE_LIMIT,
+    burst=NSW_API_BURST,
+    endpoints={
+        # the statewide price dump is large and only needed to (re)load the snapshot
+        "/FuelPriceCheck/v2/fuel/prices": (0.1, 2),
+        "/oauth/client_credential/accesstoken": (1, 2),
+    },
+)
+mapbox_rate_limiter = RateLimiter("mapbox_rate_limit", rate=MAPBOX_RATE_LIMIT, burst=MAPBOX_BURST)
+
+# timeouts, retries with jitter, per-endpoint circuit breakers and optional hedging
+nsw_upstream = UpstreamPolicy("nsw_fuel_upstream", limiter=nsw_rate_limiter)
+mapbox_upstream = UpstreamPolicy("mapbox_upstream", limiter=mapbox_rate_limiter)
+
+# concurrent lookups of the same address share one Mapbox request
+geocode_flights = SingleFlight("geocode_singleflight")
+
+# suburbs and postcodes resolve offline; only street addresses and landmarks need Mapbox
+gazetteer = Gazetteer() if GAZETTEER_ENABLED else None
+
+# every price the tools observe is appended here for trend queries (None if the file is unusable)
+price_history = open_price_history()
+if price_history is not None:
+    atexit.register(price_history.close)
 
 @tool
-def geocode_location(address: str, mapbox_access_token: str = os.getenv("MAPBOX_API_KEY")) -> Coordinates:
+async def geocode_location(address: str, mapbox_access_token: str = os.getenv("MAPBOX_API_KEY")) -> Coordinates:
     """
     Helper function to convert a location into its latitute and longitude
 
     :param address: NSW address
     :return: Pydantic model called Coordinates that contains latitude and longitude of the input address
     """
+    if gazetteer is not None:
+        local = gazetteer.lookup(address)
+        if local is not None:
+            logger.info(f"Gazetteer hit for address '{address}' (local hit ratio {gazetteer.local_hit_ratio:.0%})")
+            return local
+
+    cached = geocode_cache.get(address)
+    if cached is not None:
+        logger.info(f"Geocode cache hit for address '{address}'")
+        return cached
+
+    return await geocode_flights.do(
+        (normalize_address(address), mapbox_access_token),
+        lambda: _geocode_mapbox(address, mapbox_access_token),
+    )
+
+
+async def _geocode_mapbox(address: str, mapbox_access_token: str) -> Coordinates:
+    url = "https://api.mapbox.com/search/geocode/v6/forward"
+    querystring = {
+        "q": address,
+        "country": "AU",
+        "limit": 1,
+        "access_token": mapbox_access_token
+    }
+
+    response = await mapbox_upstream.call("geocode", lambda: get_http_client().get(url, params=querystring))
+    if response.status_code != 200:
+        logger.error(f"Failed to geocode postcode/address: {address} (status code {response.status_code})")
+        raise GeocodeError(f"Mapbox geocoding of '{address}' returned status code {response.status_code}")
 
-    url = f"https://api.mapbox.com/search/geocode/v6/forward?q={address}&country=AU&limit=1&access_token={mapbox_access_token}"
-    
     try:
-        response = requests.get(url)
-        resp_obj = json.loads(response.text)
-    except Exception as err:
-        raise err
+        features = response.json().get("features") or []
+        if not features:
+            raise GeocodeError(f"No location found for '{address}'")
+        longitude, latitude = features[0]["geometry"]["coordinates"][:2]
+    except (ValueError, KeyError, TypeError, AttributeError) as err:
+        raise GeocodeError(f"Unexpected Mapbox response for '{address}': {err!r}")
+    # the postcode is informational; some features (e.g. localities) have none
+    context = (features[0].get("properties") or {}).get("context") or {}
+    postcode = (context.get("postcode") or {}).get("name")
+    logger.info(f"Geocoded address '{address}' to postcode {postcode}, lat: {latitude}, long: {longitude}")
+    result = Coordinates(latitude=latitude, longitude=longitude)
+    geocode_cache.set(address, result)
+    return result
 
-    if response.status_code == 200:
-        postcode = resp_obj["features"][0]["properties"]["context"]["postcode"]["name"]
-        coordinates =  resp_obj["features"][0]["geometry"]["coordinates"][::-1]
-        logger.info(f"Geocoded address '{address}' to postcode {postcode}, lat: {coordinates[0]}, long: {coordinates[1]}")
-        return Coordinates(latitude=coordinates[0], longitude=coordinates[1])
-    else:
-        logger.error(f"Failed to geocode postcode/address: {address}")
 
+class GeocodeError(Exception):
+    """Raised when an address cannot be geocoded."""
+
+
+class NSWFuelAPIError(Exception):
+    """Raised when the NSW Fuel API answers a request with an error status or an unusable body."""
+
+
+def _raise_for_status(url: str, status_code: int, response) -> None:
+    """
+    Fail loudly instead of handing the model None: a non-200 status, or a body
+    that is not a JSON object, raises NSWFuelAPIError.
+    """
+    if status_code != 200 or not isinstance(response, dict):
+        raise NSWFuelAPIError(f"{url} returned status code {status_code}")
+
+
+def _drop_empty(headers: Dict = None) -> Dict:
+    """
+    httpx rejects None header values (requests silently dropped them), e.g. when
+    an API key is missing from the environment
+    """
+    return {key: value for key, value in (headers or {}).items() if value is not None}
 
 
 class NSWFuelClient():
     def __init__(self):
         self.base_url = NSW_API_BASE_URL
-        self.fuel_api_token = self._get_access_token()
-
-    def get(self, url: str, headers: Dict = None, params: Dict = None, data: Dict = None):
+        # token is fetched lazily on the first tool call and refreshed before it expires
+        self.token_manager = TokenManager(fetch_token=self._get_access_token)
+        # identical searches from nearby points within a short window share one API call
+        self.price_cache = PriceCache()
+        # concurrent lookups of the same station share one request
+        self.station_flights = SingleFlight("station_singleflight")
+        # statewide copy of all prices; when ready, price tools answer from memory
+        self.snapshot = PriceSnapshot(stream_all=self._stream_all_prices, fetch_new=self._get_new_prices)
+
+    async def get(self, url: str, headers: Dict = None, params: Dict = None):
+        return await self._request("GET", url, headers=headers, params=params)
+
+    async def post(self, url: str, headers: Dict = None, data: Dict = None):
+        return await self._request("POST", url, headers=headers, content=data)
+
+    async def _request(self, method: str, url: str, headers: Dict = None, **kwargs):
+        """
+        Send a request and decode the JSON body.
+        """
+        response = await self._send(method, url, headers=headers, **kwargs)
         try:
-            response = requests.get(url, headers=headers, data=data, params=params)
-            resp_obj = json.loads(response.text)
-            return response.status_code, resp_obj
-        except Exception as err:
-            raise err
+            resp_obj = response.json()
+        except ValueError:
+            # e.g. an HTML error page from a gateway; callers check the status first
+            resp_obj = None
+        return response.status_code, resp_obj
 
-    def post(self, url: str, headers: Dict = None, data: Dict = None):
+    async def stream(self, method: str, url: str, keys: Iterable[str], headers: Dict = None, **kwargs) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        Send a request and yield (key, record) for each element of the top-level
+        arrays named in `keys` as it is decoded off the socket, without holding
+        the whole body in memory.
+        """
+        response = await self._send(method, url, headers=headers, stream=True, **kwargs)
         try:
-            response = requests.post(url, data=data, headers=headers)
-            resp_obj = json.loads(response.text)
-            return response.status_code, resp_obj
-        except Exception as err:
-            raise err
-
-    def _get_access_token(self) -> str:
+            if response.status_code != 200:
+                await response.aread()
+                raise NSWFuelAPIError(f"{method} {url} returned status code {response.status_code}")
+            async for item in iter_json_arrays(response.aiter_bytes(), keys):
+                yield item
+        finally:
+            await response.aclose()
+
+    async def _send(self, method: str, url: str, headers: Dict = None, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Send a request on the shared client. A 401 on a Bearer-authorised
+        request invalidates the token and retries once with a fresh one.
+        """
+        response = await self._send_upstream(method, url, headers=headers, stream=stream, **kwargs)
+        authorization = (headers or {}).get("authorization") or ""
+        if response.status_code == 401 and authorization.startswith("Bearer "):
+            await response.aclose()
+            logger.warning(f"NSW Fuel API rejected access token for {url}, refreshing and retrying")
+            self.token_manager.metrics.incr("unauthorized_retries")
+            self.token_manager.invalidate(authorization[len("Bearer "):])
+            headers = {**headers, "authorization": f"Bearer {await self.token_manager.get_token()}"}
+            response = await self._send_upstream(method, url, headers=headers, stream=stream, **kwargs)
+        return response
+
+    async def _send_upstream(self, method: str, url: str, headers: Dict = None, stream: bool = False, **kwargs) -> httpx.Response:
+        """
+        Send a request through the rate limiter and the resilience policy. Every
+        NSW Fuel API call is a read (the POST endpoints are searches), so all
+        of them may be retried or hedged.
+        """
+        client = get_http_client()
+        # station codes are part of the path; budget by endpoint, not by station
+        endpoint = re.sub(r"/\d+$", "", httpx.URL(url).path)
+        return await nsw_upstream.call(
+            endpoint,
+            lambda: client.send(client.build_request(method, url, headers=_drop_empty(headers), **kwargs), stream=stream),
+            idempotent=True,
+        )
+
+    async def _get_access_token(self) -> Dict:
         """
         Retrieve access token for NSW Fuel API
+
+        :return: Token response containing `access_token` and `expires_in` (seconds)
         """
         url = f"{self.base_url}/oauth/client_credential/accesstoken"
         querystring = {
@@ -75,11 +241,12 @@ class NSWFuelClient():
             'authorization': os.getenv("NSW_AUTH_HEADER")
         }
 
-        status_code, response = self.get(url, headers=headers, params=querystring)
+        status_code, response = await self.get(url, headers=headers, params=querystring)
         if status_code == 200:
-            return response['access_token']
+            return response
         else:
             logger.warning(f"Status code: {status_code}")
+            raise TokenError(f"NSW Fuel API token request failed with status code {status_code}")
 
     def _get_current_utc(self) -> str:
         """
@@ -90,9 +257,73 @@ class NSWFuelClient():
         # Format to dd/MM/yyyy hh:mm:ss AM/PM (e.g., 15/11/2025 07:45:12 AM)
         return now.strftime("%d/%m/%Y %I:%M:%S %p")
 
+    def _feed_headers(self, token: str) -> Dict:
+        return {
+            'content-type': "application/json",
+            'authorization': f"Bearer {token}",
+            'apikey': os.getenv("NSW_API_KEY"),
+            'transactionid': "3",
+            'requesttimestamp': self._get_current_utc()
+        }
+
+    async def _stream_all_prices(self) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        All current prices and stations in NSW, streamed record by record.
+        The statewide dump is large, so it is never held in memory as one document.
+        """
+        url = f"{self.base_url}/FuelPriceCheck/v2/fuel/prices"
+        headers = self._feed_headers(await self.token_manager.get_token())
+
+        async for key, record in self.stream("GET", url, keys=("stations", "prices"), headers=headers, params={"states": "NSW"}):
+            if key == "prices" and price_history is not None:
+                price_history.record_raw([record])
+            yield key, record
+
+    async def _get_new_prices(self) -> Optional[Dict]:
+        """
+        Prices that changed since the previous call to this endpoint
+        """
+        url = f"{self.base_url}/FuelPriceCheck/v2/fuel/prices/new"
+        headers = self._feed_headers(await self.token_manager.get_token())
+
+        status_code, response = await self.get(url=url, headers=headers, params={"states": "NSW"})
+        if status_code == 200:
+            if price_history is not None:
+                price_history.record_raw(response.get("prices") or [])
+            return response
+        else:
+            logger.warning(f"New prices feed returned status code: {status_code}")
+
+    async def _use_snapshot(self) -> bool:
+        # answer from the live API until the runtime's background load has finished;
+        # tools never start the load themselves (e.g. one eval case per event loop)
+        return FUEL_SNAPSHOT_ENABLED and self.snapshot.ready
+
+    def start_background_tasks(self):
+        """
+        Start loading the statewide snapshot and polling its delta feed on the
+        running event loop. Called once from the runtime's lifespan.
+        """
+        if FUEL_SNAPSHOT_ENABLED:
+            self.snapshot.start()
+
+    async def stop_background_tasks(self):
+        """Stop the snapshot's background task (runtime shutdown)."""
+        await self.snapshot.stop()
+
 
     @tool
-    def get_prices_for_location(self, postcode: str, latitude: float, longitude: float, fueltype: str, brands: List[str]) -> Dict[str, List]:
+    async def get_prices_for_location(
+            self,
+            postcode: str,
+            latitude: float,
+            longitude: float,
+            fueltype: str,
+            brands: List[str],
+            limit: Optional[int] = None,
+            sort_by: Optional[str] = None,
+            compact: bool = True,
+        ) -> Dict[str, List]:
         """
         Returns current fuel prices for a single fuel type and a named location (postcode).
 
@@ -101,9 +332,30 @@ class NSWFuelClient():
         :param longitude: Longitude coordinate for given location in NSW
         :param fueltype: The fuel type to search for (e.g., "P95", "P98", "E10", "Diesel")
         :param brands: List of fuel brand names to filter results (e.g., ["Caltex", "Shell", "BP"])
-        :return: Dictionary containing fuel price data for the specified location and fuel type,
-                 sorted by price in ascending order
+        :param limit: Only return this many stations (e.g. 2 when the user asks for "the 2 cheapest"). Omit for all
+        :param sort_by: "price" (default, cheapest first) or "distance" (closest first); applied before limit
+        :param compact: Return a pipe-separated table (one header row, then one row per station and fuel) instead of full station objects
+        :return: Fuel price data for the specified location and fuel type, sorted by price in ascending order
         """
+        stations = await self.find_prices_for_location(postcode, latitude, longitude, fueltype, brands)
+        return project_stations(stations, limit=limit, compact=compact, sort_by=sort_by, tool="get_prices_for_location")
+
+    async def find_prices_for_location(self, postcode: str, latitude: float, longitude: float, fueltype: str, brands: List[str]) -> Optional[List[Station]]:
+        """
+        Stations in a postcode selling `fueltype`, cheapest first (snapshot, cache or live API).
+        """
+        if await self._use_snapshot():
+            stations = self.snapshot.for_location(postcode, latitude, longitude, fueltype, brands)
+            # an empty answer may just be an unfamiliar fuel or brand name, so let the API decide
+            if stations:
+                return stations
+
+        key = self.price_cache.key("location", latitude, longitude, fueltype, brands, postcode=postcode)
+        return await self.price_cache.get_or_fetch(
+            key, lambda: self._fetch_prices_for_location(postcode, latitude, longitude, fueltype, brands)
+        )
+
+    async def _fetch_prices_for_location(self, postcode: str, latitude: float, longitude: float, fueltype: str, brands: List[str]) -> List[Station]:
         url = f"{self.base_url}/FuelPriceCheck/v2/fuel/prices/location"
 
         payload = {
@@ -121,51 +373,34 @@ class NSWFuelClient():
 
         headers = {
             'content-type': 'application/json; charset=utf-8',
-            'authorization': f"Bearer {self.fuel_api_token}",
+            'authorization': f"Bearer {await self.token_manager.get_token()}",
             'apikey': os.getenv("NSW_API_KEY"),
             'transactionid': "1",
             'requesttimestamp': self._get_current_utc()
         }
 
-        status_code, response = self.post(url, data=json.dumps(payload), headers=headers)
+        status_code, response = await self.post(url, data=json.dumps(payload), headers=headers)
 
-        if status_code == 200:
-            stations = []
-            grouped_prices = defaultdict(list)
-            for price in response["prices"]:
-                station_code = str(price["stationcode"])
-                if station_code is None:
-                    continue
-                grouped_prices[station_code].append(
-                    Price(
-                        station_code=station_code,
-                        fueltype=price["fueltype"], 
-                        price=price["price"], 
-                        last_updated=price["lastupdated"]
-                    )
-                )    
-            prices_dict = dict(grouped_prices)
-
-            for station in response["stations"]:
-                stations.append(
-                    Station(
-                        name=station["name"], 
-                        brand=station["brand"], 
-                        address=station["address"],
-                        coordinates=Coordinates(
-                            latitude=station["location"]["latitude"], 
-                            longitude=station["location"]["longitude"]
-                        ),
-                        distance=station["location"]["distance"],
-                        station_code=str(station["code"]),
-                        prices=prices_dict.get(str(station["code"]))
-                    )
-                )
-            return stations
+        _raise_for_status(url, status_code, response)
+        stations = parse_stations_response(response)
+        if price_history is not None:
+            price_history.record(price for station in stations for price in station.prices)
+        return stations
 
 
     @tool
-    def get_nearby_prices(self, postcode: str, latitude: float, longitude: float, radius: int, fueltype: str, brands: List[str]) -> Dict[str, List[Dict]]:
+    async def get_nearby_prices(
+            self,
+            postcode: str,
+            latitude: float,
+            longitude: float,
+            radius: int,
+            fueltype: str,
+            brands: List[str],
+            limit: Optional[int] = None,
+            sort_by: Optional[str] = None,
+            compact: bool = True,
+        ) -> Dict[str, List[Dict]]:
         """
         Returns fuel prices for multiple fuel stations within a specified radius of a location.
 
@@ -175,13 +410,34 @@ class NSWFuelClient():
         :param radius: Search radius in kilometers (e.g., 4)
         :param fueltype: The fuel type to search for (e.g., "P95", "P98", "E10", "Diesel")
         :param brands: List of fuel brand names to filter results (e.g., ["Caltex", "Shell", "BP"])
-        :return: Dictionary containing fuel price data for nearby stations, sorted by price in ascending order
+        :param limit: Only return this many stations (e.g. 2 when the user asks for "the 2 closest"). Omit for all
+        :param sort_by: "price" (default, cheapest first) or "distance" (closest first); applied before limit
+        :param compact: Return a pipe-separated table (one header row, then one row per station and fuel) instead of full station objects
+        :return: Fuel price data for nearby stations, sorted by price in ascending order
+        """
+        stations = await self.find_nearby_prices(postcode, latitude, longitude, radius, fueltype, brands)
+        return project_stations(stations, limit=limit, compact=compact, sort_by=sort_by, tool="get_nearby_prices")
+
+    async def find_nearby_prices(self, postcode: str, latitude: float, longitude: float, radius: int, fueltype: str, brands: List[str]) -> Optional[List[Station]]:
         """
+        Stations within `radius` km selling `fueltype`, cheapest first (snapshot, cache or live API).
+        """
+        if await self._use_snapshot():
+            stations = self.snapshot.nearby(latitude, longitude, radius, fueltype, brands)
+            if stations:
+                return stations
+
+        key = self.price_cache.key("nearby", latitude, longitude, fueltype, brands, radius=radius, postcode=postcode)
+        return await self.price_cache.get_or_fetch(
+            key, lambda: self._fetch_nearby_prices(postcode, latitude, longitude, radius, fueltype, brands)
+        )
+
+    async def _fetch_nearby_prices(self, postcode: str, latitude: float, longitude: float, radius: int, fueltype: str, brands: List[str]) -> List[Station]:
         url = f"{self.base_url}/FuelPriceCheck/v2/fuel/prices/nearby"
 
         headers = {
             'content-type': 'application/json; charset=utf-8',
-            'authorization': f"Bearer {self.fuel_api_token}",
+            'authorization': f"Bearer {await self.token_manager.get_token()}",
             'apikey': os.getenv("NSW_API_KEY"),
             'transactionid': "1",
             'requesttimestamp': self._get_current_utc()
@@ -196,45 +452,25 @@ class NSWFuelClient():
             "sortby": "Price",
             "sortascending": "true"
         }
-        status_code, response = self.post(url, data=json.dumps(payload), headers=headers)
-
-        if status_code == 200:
-            stations = []
-            grouped_prices = defaultdict(list)
-            for price in response["prices"]:
-                station_code = str(price["stationcode"])
-                if station_code is None:
-                    continue
-                grouped_prices[station_code].append(
-                    Price(
-                        station_code=station_code,
-                        fueltype=price["fueltype"], 
-                        price=price["price"], 
-                        last_updated=price["lastupdated"]
-                    )
-                )    
-            prices_dict = dict(grouped_prices)
-
-            for station in response["stations"]:
-                stations.append(
-                    Station(
-                        name=station["name"], 
-                        brand=station["brand"], 
-                        address=station["address"],
-                        coordinates=Coordinates(
-                            latitude=station["location"]["latitude"], 
-                            longitude=station["location"]["longitude"]
-                        ),
-                        distance=station["location"]["distance"],
-                        station_code=str(station["code"]),
-                        prices=prices_dict.get(str(station["code"]))
-                    )
-                )
+        if float(radius) >= STREAM_JSON_MIN_RADIUS:
+            # wide searches return large bodies, so decode them incrementally
+            records = self.stream("POST", url, keys=("stations", "prices"), headers=headers, content=json.dumps(payload))
+            stations = await parse_stations_stream(records)
+            if price_history is not None:
+                price_history.record(price for station in stations for price in station.prices)
             return stations
 
+        status_code, response = await self.post(url, data=json.dumps(payload), headers=headers)
+
+        _raise_for_status(url, status_code, response)
+        stations = parse_stations_response(response)
+        if price_history is not None:
+            price_history.record(price for station in stations for price in station.prices)
+        return stations
+
 
     @tool
-    def get_price_at_station(self, station_code: str) -> Dict[str, List[Dict]]:
+    async def get_price_at_station(self, station_code: str) -> Dict[str, List[Dict]]:
         """
         Retrieve the current fuel prices for a single station by station code.
 
@@ -244,32 +480,77 @@ class NSWFuelClient():
         :param station_code: The unique station identifier used by the NSW API
                              (passed into the endpoint path, e.g. "20594").
         :return: Parsed JSON response as a dictionary containing price data
-                 for the requested station. Returns None if the request fails.
+                 for the requested station. Raises NSWFuelAPIError if the request fails.
         """
+        if await self._use_snapshot():
+            prices = self.snapshot.station_prices(station_code)
+            if prices:
+                return prices
+
+        return await self.station_flights.do(str(station_code), lambda: self._fetch_price_at_station(station_code))
 
+    async def _fetch_price_at_station(self, station_code: str) -> List[Price]:
         url = f"{self.base_url}/FuelPriceCheck/v2/fuel/prices/station/{station_code}"
 
         querystring = {"state": "NSW"}
 
         headers = {
             'content-type': "application/json",
-            'authorization': f"Bearer {self.fuel_api_token}",
+            'authorization': f"Bearer {await self.token_manager.get_token()}",
             'apikey': os.getenv("NSW_API_KEY"),
             'transactionid': "2",
             'requesttimestamp': self._get_current_utc()
         }
 
-        status_code, response = self.get(url=url, headers=headers, params=querystring)
-        
-        if status_code == 200:
-            prices = []
-            for price in response["prices"]:
-                prices.append(
-                    Price(
-                        station_code=station_code,
-                        fueltype=price["fueltype"], 
-                        price=price["price"], 
-                        last_updated=price["lastupdated"]
-                    )
-                )
-            return prices
\ No newline at end of file
+        status_code, response = await self.get(url=url, headers=headers, params=querystring)
+        _raise_for_status(url, status_code, response)
+        prices = parse_prices(response.get("prices") or [], station_code=station_code)
+        if price_history is not None:
+            price_history.record(prices)
+        return prices
+
+    @tool
+    async def get_prices_at_stations(self, station_codes: List[str]) -> Dict[str, List[Price]]:
+        """
+        Retrieve the current fuel prices for several stations at once by station code.
+
+        Use this instead of calling 'get_price_at_station' once per station, e.g. after
+        'get_nearby_prices' when the user wants every fuel at the closest few stations.
+
+        :param station_codes: List of station identifiers used by the NSW API (e.g. ["20594", "1234"])
+        :return: Dictionary mapping each station code to its list of prices.
+                 A station whose lookup failed maps to None.
+        """
+        semaphore = asyncio.Semaphore(STATION_LOOKUP_CONCURRENCY)
+
+        async def lookup(station_code: str):
+            async with semaphore:
+                try:
+                    return await self.get_price_at_station(station_code)
+                except Exception as err:
+                    logger.error(f"Failed to get prices for station {station_code}: {err}")
+                    return None
+
+        # preserve the caller's order and drop duplicate codes
+        station_codes = list(dict.fromkeys(str(code) for code in station_codes))
+        results = await asyncio.gather(*(lookup(code) for code in station_codes))
+        return dict(zip(station_codes, results))
+
+
+    @tool
+    def get_price_history(self, station_code: str, fueltype: str, days: int = 7) -> Dict:
+        """
+        Summarise how the price of one fuel type has moved at a station over recent days.
+
+        Only prices observed by this assistant are available, so recently added
+        stations may have little or no history.
+
+        :param station_code: The unique station identifier used by the NSW API (e.g. "20594")
+        :param fueltype: The fuel type code (e.g. "U91", "E10", "DL")
+        :param days: How many days back to look (default 7)
+        :return: Dictionary with the first, last, minimum and maximum observed prices,
+                 the overall change, average price per weekday and the cheapest weekday.
+        """
+        if price_history is None:
+            return {"error": "Price history is not available"}
+        return price_history.summary(station_code, fueltype.upper(), days=days)
@@ -0,0 +1,105 @@
+import os
+import asyncio
+import logging
+import importlib.util
+from typing import Dict, Tuple
+
+import httpx
+from dotenv import load_dotenv
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Pool and timeout settings, overridable through the environment
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "15"))
+HTTP_POOL_TIMEOUT = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "false").lower() in ("1", "true", "yes")
+
+# httpx.AsyncClient connections are bound to the event loop that opened them, so
+# we keep one pooled client per running loop, next to the task that closes it when
+# the loop shuts down. The agent runtime has a single long-lived loop; the evals
+# create a fresh loop (asyncio.run) for every synchronous agent call.
+_clients: Dict[asyncio.AbstractEventLoop, Tuple[httpx.AsyncClient, asyncio.Task]] = {}
+
+
+def _http2_available() -> bool:
+    """
+    HTTP/2 needs the optional `h2` package (installed via `httpx[http2]`).
+    """
+    if not HTTP2_ENABLED:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP2_ENABLED is set but the 'h2' package is not installed. Falling back to HTTP/1.1")
+        return False
+    return True
+
+
+def build_http_client() -> httpx.AsyncClient:
+    """
+    Build a pooled httpx.AsyncClient with keep-alive, pool limits and timeouts
+    taken from the environment.
+    """
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        connect=HTTP_CONNECT_TIMEOUT,
+        read=HTTP_READ_TIMEOUT,
+        write=HTTP_READ_TIMEOUT,
+        pool=HTTP_POOL_TIMEOUT,
+    )
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=_http2_available())
+
+
+async def _close_on_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    """
+    Wait until the loop cancels its remaining tasks on shutdown, as asyncio.run
+    does before closing it, then close that loop's client while it still runs.
+    """
+    try:
+        await loop.create_future()
+    finally:
+        client, _ = _clients.pop(loop, (None, None))
+        if client is not None and not client.is_closed:
+            await client.aclose()
+
+
+def _forget_closed_loops() -> None:
+    # a loop closed without cancelling its tasks never ran its watcher; its client can no longer be awaited
+    for loop in [loop for loop in _clients if loop.is_closed()]:
+        del _clients[loop]
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared AsyncClient for the running event loop, creating it on first use.
+    The client is closed when the loop shuts down.
+    """
+    loop = asyncio.get_running_loop()
+    client, watcher = _clients.get(loop, (None, None))
+    if client is None or client.is_closed:
+        _forget_closed_loops()
+        client = build_http_client()
+        if watcher is None or watcher.done():
+            watcher = loop.create_task(_close_on_shutdown(loop))
+        _clients[loop] = (client, watcher)
+        logger.info(f"Created pooled HTTP client (max_connections={HTTP_MAX_CONNECTIONS}, keepalive={HTTP_MAX_KEEPALIVE_CONNECTIONS})")
+    return client
+
+
+async def close_http_client() -> None:
+    """
+    Close the shared AsyncClient for the running event loop, if there is one.
+    """
+    loop = asyncio.get_running_loop()
+    client, watcher = _clients.pop(loop, (None, None))
+    if watcher is not None:
+        watcher.cancel()
+    if client is not None and not client.is_closed:
+        await client.aclose()
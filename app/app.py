@@ -1,6 +1,5 @@
 import json
 import os
-import re
 import requests
 import time
 import uuid
@@ -10,6 +9,8 @@ import boto3
 import streamlit as st
 from streamlit.logger import get_logger
 
+from streaming import clean_response_text, iter_sse_chunks
+
 logger = get_logger(__name__)
 logger.setLevel("INFO")
 
@@ -49,59 +50,6 @@ st.set_page_config(
 )
 
 
-def clean_response_text(text: str, show_thinking: bool = True) -> str:
-    """Clean and format response text for better presentation"""
-    if not text:
-        return text
-
-    # Handle the consecutive quoted chunks pattern
-    # Pattern: "word1" "word2" "word3" -> word1 word2 word3
-    text = re.sub(r'"\s*"', "", text)
-    text = re.sub(r'^"', "", text)
-    text = re.sub(r'"$', "", text)
-
-    # Replace literal \n with actual newlines
-    text = text.replace("\\n", "\n")
-
-    # Replace literal \t with actual tabs
-    text = text.replace("\\t", "\t")
-
-    # Clean up multiple spaces
-    text = re.sub(r" {3,}", " ", text)
-
-    # Fix newlines that got converted to spaces
-    text = text.replace(" \n ", "\n")
-    text = text.replace("\n ", "\n")
-    text = text.replace(" \n", "\n")
-
-    # Handle numbered lists
-    text = re.sub(r"\n(\d+)\.\s+", r"\n\1. ", text)
-    text = re.sub(r"^(\d+)\.\s+", r"\1. ", text)
-
-    # Handle bullet points
-    text = re.sub(r"\n-\s+", r"\n- ", text)
-    text = re.sub(r"^-\s+", r"- ", text)
-
-    # Handle section headers
-    text = re.sub(r"\n([A-Za-z][A-Za-z\s]{2,30}):\s*\n", r"\n**\1:**\n\n", text)
-
-    # Clean up multiple newlines
-    text = re.sub(r"\n{3,}", "\n\n", text)
-
-    return text.strip()
-
-
-def parse_streaming_chunk(chunk: str) -> str:
-    """Parse individual streaming chunk and extract meaningful content"""
-    try:        
-        # return chunk as-is
-        # logger.info("parse_streaming_chunk: Not JSON, returning as-is")
-        return chunk
-    except json.JSONDecodeError as e:
-        logger.error(f"parse_streaming_chunk: JSON decode error: {e}")
-        raise e
-
-
 def get_agent_runtimes(region: str = "us-east-1") -> List[Dict]:
     """Fetch available agent runtimes from bedrock-agentcore-control"""
     try:
@@ -151,26 +99,9 @@ def invoke_agent_streaming(
         )
 
         # for line in response.iter_lines(chunk_size=1):
-        for line in response["response"].iter_lines(chunk_size=1):
-            if line:
-                line = line.decode("utf-8")
-                # logger.info(f"Raw line: {line}")
-                if line.startswith("data: "):
-                    line = line[6:]
-                    # Parse and clean each chunk
-                    parsed_chunk = parse_streaming_chunk(line)
-                    # if "Used assistant" in parsed_chunk:
-                    if "started working" in parsed_chunk or "Handoff" in parsed_chunk or "Using tool" in parsed_chunk: 
-                        stripped_str = parsed_chunk.strip()
-                        cleaned_str = stripped_str.replace('"', '')
-                        st.write(f"{cleaned_str}")
-                    elif parsed_chunk.strip():  # Only yield non-empty chunks
-                        logger.info(f"parsed_chunk:: {parsed_chunk}")
-                        yield parsed_chunk
-                else:
-                    logger.info(
-                        f"Line doesn't start with 'data: ', skipping: {line}"
-                    )
+        lines = response["response"].iter_lines(chunk_size=1)
+        # progress chunks ("Using tool: ...") go to the status box, answer text to the caller
+        yield from iter_sse_chunks(lines, on_status=st.write)
     except Exception as e:
         yield f"Error invoking agent: {e}"
 
@@ -0,0 +1,91 @@
+import json
+import logging
+import re
+from typing import Callable, Iterable, Iterator
+
+logger = logging.getLogger(__name__)
+
+# chunks announcing agent progress rather than answer text
+STATUS_MARKERS = ("started working", "Handoff", "Using tool")
+
+
+def clean_response_text(text: str, show_thinking: bool = True) -> str:
+    """Clean and format response text for better presentation"""
+    if not text:
+        return text
+
+    # Handle the consecutive quoted chunks pattern
+    # Pattern: "word1" "word2" "word3" -> word1 word2 word3
+    text = re.sub(r'"\s*"', "", text)
+    text = re.sub(r'^"', "", text)
+    text = re.sub(r'"$', "", text)
+
+    # Replace literal \n with actual newlines
+    text = text.replace("\\n", "\n")
+
+    # Replace literal \t with actual tabs
+    text = text.replace("\\t", "\t")
+
+    # Clean up multiple spaces
+    text = re.sub(r" {3,}", " ", text)
+
+    # Fix newlines that got converted to spaces
+    text = text.replace(" \n ", "\n")
+    text = text.replace("\n ", "\n")
+    text = text.replace(" \n", "\n")
+
+    # Handle numbered lists
+    text = re.sub(r"\n(\d+)\.\s+", r"\n\1. ", text)
+    text = re.sub(r"^(\d+)\.\s+", r"\1. ", text)
+
+    # Handle bullet points
+    text = re.sub(r"\n-\s+", r"\n- ", text)
+    text = re.sub(r"^-\s+", r"- ", text)
+
+    # Handle section headers
+    text = re.sub(r"\n([A-Za-z][A-Za-z\s]{2,30}):\s*\n", r"\n**\1:**\n\n", text)
+
+    # Clean up multiple newlines
+    text = re.sub(r"\n{3,}", "\n\n", text)
+
+    return text.strip()
+
+
+def parse_streaming_chunk(chunk: str) -> str:
+    """Parse individual streaming chunk and extract meaningful content"""
+    try:
+        # return chunk as-is
+        # logger.info("parse_streaming_chunk: Not JSON, returning as-is")
+        return chunk
+    except json.JSONDecodeError as e:
+        logger.error(f"parse_streaming_chunk: JSON decode error: {e}")
+        raise e
+
+
+def iter_sse_chunks(lines: Iterable[bytes], on_status: Callable[[str], None]) -> Iterator[str]:
+    """
+    Answer chunks from the lines of an agent's server-sent event stream.
+
+    :param lines: Raw lines of the response body (e.g. `iter_lines()`)
+    :param on_status: Called with the text of progress chunks ("Using tool: ..."), which are not yielded
+    """
+    for line in lines:
+        if line:
+            line = line.decode("utf-8")
+            # logger.info(f"Raw line: {line}")
+            if line.startswith("data: "):
+                line = line[6:]
+                # Parse and clean each chunk
+                parsed_chunk = parse_streaming_chunk(line)
+                # if "Used assistant" in parsed_chunk:
+                if any(marker in parsed_chunk for marker in STATUS_MARKERS):
+                    stripped_str = parsed_chunk.strip()
+                    cleaned_str = stripped_str.replace('"', '')
+                    on_status(cleaned_str)
+                elif parsed_chunk.strip():  # Only yield non-empty chunks
+                    logger.info(f"parsed_chunk:: {parsed_chunk}")
+                    yield parsed_chunk
+            else:
+                logger.info(
+                    f"Line doesn't start with 'data: ', skipping: {line}"
+                )
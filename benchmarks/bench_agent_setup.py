@@ -0,0 +1,58 @@
+import os
+import sys
+
+from common import best_of
+
+from strands import Agent
+from strands.models.openai import OpenAIModel
+
+from memory.MemoryHook import MemoryHook
+from prompts import SYSTEM_PROMPT
+from tools import NSWFuelClient, geocode_location
+
+NAME = "nsw_fuel_agent"
+DESCRIPTION = "Agent to help answer user questions about fuel prices and location information across gas stations in NSW"
+
+# the model client is created once at import time in agents/agent.py
+model = OpenAIModel(client_args={"api_key": "benchmark"}, model_id="benchmark")
+fuel_tools = NSWFuelClient()
+
+
+def setup(session_id: str) -> Agent:
+    """
+    The per-turn agent construction in invoke_agent, without the MCP tools.
+    """
+    return Agent(
+        name=NAME,
+        description=DESCRIPTION,
+        model=model,
+        system_prompt=SYSTEM_PROMPT,
+        tools=[
+            geocode_location,
+            fuel_tools.get_prices_for_location,
+            fuel_tools.get_nearby_prices,
+            fuel_tools.get_price_at_station,
+            fuel_tools.get_prices_at_stations,
+            fuel_tools.get_price_history,
+            [],
+        ],
+        hooks=[MemoryHook(session_id, None)],
+        state={"actor_id": NAME, "session_id": session_id},
+    )
+
+
+def run(number: int = 500, repeat: int = 5) -> dict:
+    return {"agent_ms": round(best_of(lambda: setup("session"), number, repeat), 4)}
+
+
+if __name__ == "__main__":
+    # MemoryHook prints on registration; keep the timing output readable
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        row = run()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print(f"{'agent ms':>9}")
+    print(f"{row['agent_ms']:>9}")
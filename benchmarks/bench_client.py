@@ -0,0 +1,61 @@
+import json
+import asyncio
+
+from common import serve, json_response, best_of, best_of_async
+
+import httpx
+import transport
+
+from bench_parsing import make_response
+from projection import project_stations
+from tools import NSWFuelClient
+
+TOKEN = json.dumps({"access_token": "benchmark", "expires_in": "43199"}).encode()
+
+
+def replay(body: bytes):
+    """Handler answering the token endpoint and every price search with `body`."""
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("/accesstoken"):
+            return json_response(TOKEN)
+        return json_response(body)
+    return handler
+
+
+async def measure(size: int) -> dict:
+    """
+    One NSW API round trip per call through the real client, against a
+    payload of `size` stations answered in-process: request, rate limiter,
+    resilience policy, JSON decoding, parsing and the price history write.
+    """
+    response = make_response(size)
+    serve(replay(json.dumps(response).encode()))
+    client = NSWFuelClient()
+    number = max(1, 1000 // size)
+
+    # location searches decode the whole body; wide nearby searches stream it
+    location_ms = await best_of_async(
+        lambda: client._fetch_prices_for_location("2150", -33.81, 151.0, "E10", []), number
+    )
+    streamed_ms = await best_of_async(
+        lambda: client._fetch_nearby_prices("2150", -33.81, 151.0, 25, "E10", []), number
+    )
+    stations = await client._fetch_prices_for_location("2150", -33.81, 151.0, "E10", [])
+    project_ms = best_of(lambda: project_stations(stations, compact=True, tool="benchmark"), number)
+    await transport.close_http_client()
+    return {
+        "stations": size,
+        "location_ms": round(location_ms, 3),
+        "nearby_streamed_ms": round(streamed_ms, 3),
+        "compact_table_ms": round(project_ms, 3),
+    }
+
+
+def run(sizes=(20, 200, 3000)) -> list:
+    return [asyncio.run(measure(size)) for size in sizes]
+
+
+if __name__ == "__main__":
+    print(f"{'stations':>8} {'location ms':>12} {'streamed ms':>12} {'table ms':>9}")
+    for row in run():
+        print(f"{row['stations']:>8} {row['location_ms']:>12} {row['nearby_streamed_ms']:>12} {row['compact_table_ms']:>9}")
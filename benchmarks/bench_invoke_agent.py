@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import asyncio
+import itertools
+from typing import Any, AsyncIterator, Dict, Iterator
+
+from common import serve, json_response, best_of_async
+
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+import httpx
+from strands.models.model import Model
+
+import mapbox_mcp
+import memory.utils
+
+from bench_client import TOKEN
+from bench_memory_context import RecordedMemorySession, make_turns
+from bench_parsing import make_response
+
+# answered by the fast path without the model
+ROUTED_PROMPT = "What's the cheapest E10 near Parramatta 2150?"
+# too long for the fast path, so the agent geocodes, calls a price tool and answers
+AGENT_PROMPT = "I'm at Parramatta 2150 and need E10 soon, which of the cheapest stations around me is also the closest?"
+
+ANSWER = (
+    "Here are the cheapest E10 prices near Parramatta 2150:\n\n"
+    "1) **Station 1000**\n    - **Address:** 12 Church St, Parramatta NSW 2150\n    - **E10:** 189.9 c/L\n\n"
+    "2) **Station 1001**\n    - **Address:** 3 George St, Parramatta NSW 2150\n    - **E10:** 192.5 c/L\n\n"
+    "Would you like directions to any of these stations?"
+)
+TOOL_CALLS = [
+    ("geocode_location", {"address": "Parramatta NSW 2150"}),
+    ("get_prices_for_location", {"postcode": "2150", "latitude": -33.81, "longitude": 151.0, "fueltype": "E10", "brands": []}),
+]
+
+
+def _tool_use(tool_use_id: str, name: str, tool_input: Dict) -> Iterator[Dict]:
+    yield {"contentBlockStart": {"start": {"toolUse": {"toolUseId": tool_use_id, "name": name}}}}
+    yield {"contentBlockDelta": {"delta": {"toolUse": {"input": json.dumps(tool_input)}}}}
+    yield {"contentBlockStop": {}}
+
+
+class ScriptedModel(Model):
+    """
+    Model that replays one tool-using turn: each call requests the next of
+    `TOOL_CALLS`, and once all of them have results it streams `ANSWER` in
+    word-sized deltas, like a real model would.
+    """
+    def __init__(self):
+        self.config: Dict[str, Any] = {"model_id": "scripted"}
+        self._ids = itertools.count()
+
+    def update_config(self, **model_config):
+        self.config.update(model_config)
+
+    def get_config(self) -> Dict[str, Any]:
+        return self.config
+
+    async def structured_output(self, output_model, prompt, system_prompt=None, **kwargs):
+        raise NotImplementedError("the scripted model only streams text and tool calls")
+        yield
+
+    async def stream(self, messages, tool_specs=None, system_prompt=None, **kwargs) -> AsyncIterator[Dict]:
+        # recalled history is text only, so every tool call in the conversation belongs to this turn
+        calls_made = sum(1 for message in messages for block in message["content"] if "toolUse" in block)
+        yield {"messageStart": {"role": "assistant"}}
+        if calls_made < len(TOOL_CALLS):
+            name, tool_input = TOOL_CALLS[calls_made]
+            for event in _tool_use(f"tool-{next(self._ids)}", name, tool_input):
+                yield event
+            stop_reason = "tool_use"
+        else:
+            yield {"contentBlockStart": {"start": {}}}
+            for word in ANSWER.split(" "):
+                yield {"contentBlockDelta": {"delta": {"text": f"{word} "}}}
+            yield {"contentBlockStop": {}}
+            stop_reason = "end_turn"
+        yield {"messageStop": {"stopReason": stop_reason}}
+        yield {"metadata": {"usage": {"inputTokens": 1500, "outputTokens": 80, "totalTokens": 1580}, "metrics": {"latencyMs": 0}}}
+
+
+class _OfflineMCPClient:
+    """Stands in for the Mapbox MCP connection: no tools, nothing to close."""
+    def get_tools(self) -> list:
+        return []
+
+    async def get_tools_async(self) -> list:
+        return []
+
+    def close(self):
+        pass
+
+
+# agent.py resolves memory and connects to Mapbox MCP at import time; keep both offline
+HISTORY = make_turns(5)
+mapbox_mcp.create_mapbox_mcp_client = lambda tool_filters=None: _OfflineMCPClient()
+memory.utils.get_memory_id = lambda memory_name: "benchmark"
+memory.utils.setup_memory = lambda memory_id, actor_id, session_id: RecordedMemorySession(HISTORY)
+
+import agent
+
+agent.model = ScriptedModel()
+
+LOCATION_RESPONSE = json.dumps(make_response(20)).encode()
+
+
+def handler(request: httpx.Request) -> httpx.Response:
+    if request.url.path.endswith("/accesstoken"):
+        return json_response(TOKEN)
+    return json_response(LOCATION_RESPONSE)
+
+
+async def measure(number: int) -> dict:
+    """
+    Per-turn time of `invoke_agent` on a session with five earlier turns:
+    memory setup, fast-path routing, agent creation, context loading, tool
+    execution against the in-process NSW API (price cache warm after the
+    first turn) and the streamed answer. Only the model is scripted.
+    """
+    serve(handler)
+    sessions = itertools.count()
+
+    async def turn(prompt: str) -> list:
+        payload = {"prompt": prompt, "session_id": f"benchmark-{next(sessions)}"}
+        return [chunk async for chunk in agent.invoke_agent(payload)]
+
+    # make sure each prompt takes the path it is meant to measure
+    routed = await turn(ROUTED_PROMPT)
+    if any("Using tool" in chunk for chunk in routed):
+        raise RuntimeError("routed prompt reached the agent")
+    answered = await turn(AGENT_PROMPT)
+    if not any("get_prices_for_location" in chunk for chunk in answered):
+        raise RuntimeError("agent prompt did not call the price tool")
+
+    fast_path_ms = await best_of_async(lambda: turn(ROUTED_PROMPT), number)
+    agent_ms = await best_of_async(lambda: turn(AGENT_PROMPT), number)
+    return {
+        "fast_path_turn_ms": round(fast_path_ms, 3),
+        "agent_turn_ms": round(agent_ms, 3),
+        "agent_chunks": len(answered),
+    }
+
+
+def run(number: int = 20) -> dict:
+    return asyncio.run(measure(number))
+
+
+if __name__ == "__main__":
+    # the agent and its memory hook print on every turn; keep the timing output readable
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        row = run()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print(f"{'fast path ms':>13} {'agent ms':>9} {'chunks':>7}")
+    print(f"{row['fast_path_turn_ms']:>13} {row['agent_turn_ms']:>9} {row['agent_chunks']:>7}")
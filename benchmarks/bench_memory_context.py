@@ -0,0 +1,108 @@
+import os
+import sys
+import random
+from types import SimpleNamespace
+
+from common import best_of
+
+from memory.MemoryHook import MemoryHook
+from memory.context_builder import ContextBuilder
+from memory.context_cache import SessionContextCache
+from memory.writer import MemoryWriter
+
+SUBURBS = ["Parramatta 2150", "Newtown 2042", "Mayfield 2304", "Wollongong 2500", "Byron Bay 2481"]
+FUELS = ["E10", "U91", "P95", "P98", "DL"]
+
+
+def make_turns(n_turns: int, stations_per_answer: int = 5, seed: int = 0) -> list:
+    """
+    Conversation turns shaped like AgentCore memory returns them: a question,
+    then an answer listing stations in the format the system prompt asks for.
+    """
+    rng = random.Random(seed)
+    turns = []
+    for turn in range(n_turns):
+        suburb, fuel = rng.choice(SUBURBS), rng.choice(FUELS)
+        lines = [f"Here are the cheapest {fuel} prices near {suburb}:", ""]
+        for rank in range(1, stations_per_answer + 1):
+            code = rng.randint(1000, 1099)
+            lines += [
+                f"{rank}) **Station {code}**",
+                f"    - **Address:** {rng.randint(1, 400)} Main Rd, {suburb}",
+                f"    - **Distance:** {rng.uniform(0, 10):.1f} km",
+                f"    - **{fuel}:** {rng.uniform(170, 320):.1f} c/L",
+                "",
+            ]
+        lines.append("Would you like directions to any of these stations?")
+        turns.append([
+            {"role": "USER", "content": {"text": f"What's the cheapest {fuel} near {suburb}? (turn {turn})"}},
+            {"role": "ASSISTANT", "content": {"text": "\n".join(lines)}},
+        ])
+    return turns
+
+
+class RecordedMemorySession:
+    """Memory session answering from recorded turns; writes are dropped."""
+    def __init__(self, turns: list):
+        self.turns = turns
+
+    def get_last_k_turns(self, k: int):
+        return self.turns[-k:]
+
+    def add_turns(self, messages):
+        pass
+
+
+def make_event(actor_id: str, messages: list) -> SimpleNamespace:
+    return SimpleNamespace(agent=SimpleNamespace(state={"actor_id": actor_id}, messages=messages))
+
+
+def run(turn_counts=(1, 5, 20)) -> list:
+    results = []
+    for n_turns in turn_counts:
+        turns = make_turns(n_turns)
+        builder = ContextBuilder()
+        number = max(10, 2000 // n_turns)
+        build_ms = best_of(lambda: builder.build_messages(turns), number)
+
+        memory_session = RecordedMemorySession(turns)
+        context_cache = SessionContextCache(turns=n_turns)
+        writer = MemoryWriter()
+        hook = MemoryHook("session", memory_session, writer=writer, context_cache=context_cache, builder=builder)
+        # the first load reads the session; every timed one is served from the session cache
+        hook.on_agent_initialized(make_event("actor", []))
+        load_ms = best_of(lambda: hook.on_agent_initialized(make_event("actor", [])), number)
+
+        reply = make_event("actor", [{"role": "assistant", "content": [{"text": turns[-1][1]["content"]["text"]}]}])
+        # one assistant message per simulated turn, flushed at its end as after a real invocation
+        def save_turn():
+            hook.on_message_added(reply)
+            hook.on_after_invocation(reply)
+
+        save_ms = best_of(save_turn, number)
+        writer.close()
+
+        _, stats = builder.build_messages(turns)
+        results.append({
+            "turns": n_turns,
+            "build_ms": round(build_ms, 4),
+            "hook_load_ms": round(load_ms, 4),
+            "hook_save_ms": round(save_ms, 4),
+            "context_tokens": stats["context_tokens"],
+            "tokens_saved": stats["tokens_saved"],
+        })
+    return results
+
+
+if __name__ == "__main__":
+    # MemoryHook prints on every load; keep the timing output readable
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        rows = run()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    print(f"{'turns':>5} {'build ms':>9} {'load ms':>8} {'save ms':>8} {'tokens':>7} {'saved':>6}")
+    for row in rows:
+        print(f"{row['turns']:>5} {row['build_ms']:>9} {row['hook_load_ms']:>8} {row['hook_save_ms']:>8} {row['context_tokens']:>7} {row['tokens_saved']:>6}")
@@ -0,0 +1,102 @@
+import random
+from collections import defaultdict
+
+from common import best_of
+
+from models import Station, Coordinates, Price
+from parsing import parse_stations_response
+
+BRANDS = ["BP", "Shell", "Caltex", "7-Eleven", "Ampol", "Metro Fuel", "United", "Coles Express"]
+FUELTYPES = ["E10", "U91", "P95", "P98", "DL", "PDL", "LPG"]
+
+
+def make_response(n_stations: int, prices_per_station: int = 4, seed: int = 0) -> dict:
+    """
+    Synthetic payload shaped like the NSW nearby/location/all-prices responses.
+    """
+    rng = random.Random(seed)
+    stations, prices = [], []
+    for code in range(1000, 1000 + n_stations):
+        stations.append({
+            "brandid": str(rng.randint(1, 50)),
+            "stationid": str(rng.randint(10000, 99999)),
+            "brand": rng.choice(BRANDS),
+            "code": code,
+            "name": f"Station {code}",
+            "address": f"{rng.randint(1, 400)} Main Rd, Suburb NSW 2{rng.randint(0, 899):03d}",
+            "location": {
+                "latitude": rng.uniform(-37.5, -28.2),
+                "longitude": rng.uniform(141.0, 153.6),
+                "distance": round(rng.uniform(0, 50), 2),
+            },
+            "state": "NSW",
+        })
+        for fueltype in rng.sample(FUELTYPES, prices_per_station):
+            prices.append({
+                "stationcode": code,
+                "state": "NSW",
+                "fueltype": fueltype,
+                "price": round(rng.uniform(170, 320), 1),
+                "lastupdated": "15/11/2025 07:45:12",
+            })
+    return {"stations": stations, "prices": prices}
+
+
+def legacy_parse(response: dict) -> list:
+    """
+    The parsing loop the price tools used before agents/parsing.py.
+    """
+    stations = []
+    grouped_prices = defaultdict(list)
+    for price in response["prices"]:
+        station_code = str(price["stationcode"])
+        grouped_prices[station_code].append(
+            Price(
+                station_code=station_code,
+                fueltype=price["fueltype"],
+                price=price["price"],
+                last_updated=price["lastupdated"]
+            )
+        )
+    prices_dict = dict(grouped_prices)
+
+    for station in response["stations"]:
+        stations.append(
+            Station(
+                name=station["name"],
+                brand=station["brand"],
+                address=station["address"],
+                coordinates=Coordinates(
+                    latitude=station["location"]["latitude"],
+                    longitude=station["location"]["longitude"]
+                ),
+                distance=station["location"]["distance"],
+                station_code=str(station["code"]),
+                prices=prices_dict.get(str(station["code"]))
+            )
+        )
+    return stations
+
+
+def run(sizes=(20, 200, 3000)) -> list:
+    results = []
+    for size in sizes:
+        response = make_response(size)
+        number = max(1, 2000 // size)
+        legacy_ms = best_of(lambda: legacy_parse(response), number)
+        validated_ms = best_of(lambda: parse_stations_response(response, validate=True), number)
+        fast_ms = best_of(lambda: parse_stations_response(response), number)
+        results.append({
+            "stations": size,
+            "legacy_ms": round(legacy_ms, 3),
+            "validated_ms": round(validated_ms, 3),
+            "trusted_ms": round(fast_ms, 3),
+            "speedup": round(legacy_ms / fast_ms, 2),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'stations':>8} {'legacy ms':>10} {'validated ms':>13} {'trusted ms':>11} {'speedup':>8}")
+    for row in run():
+        print(f"{row['stations']:>8} {row['legacy_ms']:>10} {row['validated_ms']:>13} {row['trusted_ms']:>11} {row['speedup']:>7}x")
@@ -0,0 +1,79 @@
+import os
+import sys
+import json
+import random
+
+from common import best_of
+
+# app/ is run by streamlit as a directory of scripts, not a package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from streaming import clean_response_text, iter_sse_chunks
+
+
+def make_answer(n_stations: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = ["Here are the cheapest E10 prices near Parramatta 2150:", ""]
+    for rank in range(1, n_stations + 1):
+        lines += [
+            f"{rank}) **Station {rng.randint(1000, 9999)}**",
+            f"    - **Address:** {rng.randint(1, 400)} Church St, Parramatta NSW 2150",
+            f"    - **Distance:** {rng.uniform(0, 10):.1f} km",
+            f"    - **E10:** {rng.uniform(170, 320):.1f} c/L",
+            "",
+        ]
+    lines.append("Would you like directions to any of these stations?")
+    return "\n".join(lines)
+
+
+def make_stream(answer: str, seed: int = 0) -> list:
+    """
+    Lines of the SSE body AgentCore sends for `answer`: a tool status event,
+    then the answer in model-sized deltas of one to three words, each JSON
+    encoded in its own `data:` event.
+    """
+    rng = random.Random(seed)
+    words = answer.split(" ")
+    chunks = ["🛠️ - Using tool: geocode_location", "🛠️ - Using tool: get_prices_for_location"]
+    while words:
+        size = rng.randint(1, 3)
+        chunks.append(" ".join(words[:size]) + (" " if len(words) > size else ""))
+        words = words[size:]
+    body = "".join(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n" for chunk in chunks)
+    return body.encode("utf-8").split(b"\n")
+
+
+def render(chunks: list) -> str:
+    """
+    The chunk loop of app.main without Streamlit or its 10 ms pacing: the
+    buffer is re-cleaned on most chunks to redraw the message.
+    """
+    chunk_buffer = ""
+    for chunk in chunks:
+        chunk_buffer += chunk
+        if len(chunk_buffer) % 3 == 0 or chunk.endswith(" ") or chunk.endswith("\n"):
+            clean_response_text(chunk_buffer)
+    return clean_response_text(chunk_buffer, True)
+
+
+def run(sizes=(3, 10, 30)) -> list:
+    results = []
+    for size in sizes:
+        lines = make_stream(make_answer(size))
+        chunks = list(iter_sse_chunks(lines, on_status=lambda status: None))
+        text = "".join(chunks)
+        number = max(5, 300 // size)
+        results.append({
+            "stations": size,
+            "chunks": len(chunks),
+            "sse_ms": round(best_of(lambda: list(iter_sse_chunks(lines, on_status=lambda status: None)), number), 4),
+            "clean_ms": round(best_of(lambda: clean_response_text(text), number), 4),
+            "render_ms": round(best_of(lambda: render(chunks), number), 4),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'stations':>8} {'chunks':>7} {'sse ms':>8} {'clean ms':>9} {'render ms':>10}")
+    for row in run():
+        print(f"{row['stations']:>8} {row['chunks']:>7} {row['sse_ms']:>8} {row['clean_ms']:>9} {row['render_ms']:>10}")
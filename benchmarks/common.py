@@ -0,0 +1,71 @@
+"""
+Shared setup for the benchmarks: import this before any agents/ module.
+
+Every cache and store the agents write to is pointed at a throwaway
+directory, the statewide snapshot is switched off and the client-side rate
+limits are lifted, so a run neither touches the user's caches nor queues
+behind limits meant for the real APIs. `serve` replaces the network with an
+in-process handler.
+"""
+import os
+import sys
+import time
+import atexit
+import shutil
+import tempfile
+import timeit
+from typing import Awaitable, Callable
+
+# Add agents/ directory to path (agents/ uses flat imports, not a package)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agents"))
+
+_cache_dir = tempfile.mkdtemp(prefix="nsw-fuel-bench-")
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
+
+OFFLINE_ENV = {
+    "PRICE_HISTORY_PATH": os.path.join(_cache_dir, "price_history.bin"),
+    "GEOCODE_CACHE_PATH": os.path.join(_cache_dir, "geocode.sqlite3"),
+    "FUEL_SNAPSHOT_ENABLED": "false",
+    "HEDGE_ENABLED": "false",
+    "NSW_API_RATE_LIMIT": "1000000",
+    "NSW_API_BURST": "1000000",
+    "MAPBOX_RATE_LIMIT": "1000000",
+    "MAPBOX_BURST": "1000000",
+    "MAPBOX_API_KEY": "benchmark",
+    "NSW_API_KEY": "benchmark",
+    "NSW_AUTH_HEADER": "Basic benchmark",
+}
+for name, value in OFFLINE_ENV.items():
+    os.environ.setdefault(name, value)
+
+import httpx
+import transport
+
+
+def serve(handler: Callable[[httpx.Request], httpx.Response]):
+    """
+    Answer every request of the pooled HTTP clients with `handler` instead of the network.
+    Call before the first request, since clients are created once per event loop.
+    """
+    transport.build_http_client = lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def json_response(body: bytes) -> httpx.Response:
+    """A 200 response carrying an already encoded JSON body, so encoding is not part of the timing."""
+    return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+
+def best_of(func, number: int, repeat: int = 5) -> float:
+    """Best per-call time in milliseconds."""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+async def best_of_async(func: Callable[[], Awaitable], number: int, repeat: int = 5) -> float:
+    """Best per-call time in milliseconds of a coroutine function, awaited on the running loop."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            await func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) / number * 1000
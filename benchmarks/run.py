@@ -0,0 +1,180 @@
+"""
+Runs the offline benchmark suites and checks them against regression thresholds.
+
+    python benchmarks/run.py                              # every suite, JSON report on stdout
+    python benchmarks/run.py --only parsing streaming     # a subset
+    python benchmarks/run.py --output bench.json          # report to a file
+    python benchmarks/run.py --baseline main.json         # also compare with an earlier report
+    python benchmarks/run.py --recalibrate                # rewrite thresholds.json for this machine
+
+The report is JSON: the raw rows of every suite, the same numbers flattened
+to "suite.case.field" metrics, and one entry per check. `thresholds.json`
+holds absolute limits ({"max": ms} for timings, {"min": x} for speedups);
+with `--baseline`, every timing that is also in the earlier report may not
+be more than `--tolerance` slower. The exit code is 1 if a check fails or a
+suite errors, so the runner can gate CI. A suite that needs one of
+`OPTIONAL_DEPENDENCIES` is reported as skipped when it is not installed;
+any other import error fails the run.
+
+The millisecond limits only hold on hardware like the machine they were
+measured on. On other hardware, run once with `--recalibrate`, which sets
+every timing's "max" to the measured value plus `--tolerance` and leaves
+counts and speedups alone, and commit the result; or gate on `--baseline`
+against a report from the same machine, which compares ratios only.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib
+import traceback
+from contextlib import redirect_stdout
+from typing import Dict, List
+
+# offline environment (throwaway caches, no rate limits) before any agents/ module is imported
+import common
+
+# (suite, module) in run order; every module has a run() returning a row or a list of rows
+SUITES = [
+    ("parsing", "bench_parsing"),
+    ("client", "bench_client"),
+    ("memory_context", "bench_memory_context"),
+    ("streaming", "bench_streaming"),
+    ("agent_setup", "bench_agent_setup"),
+    ("invoke_agent", "bench_invoke_agent"),
+]
+# packages only needed to deploy the agent; suites that import them are skipped without them
+OPTIONAL_DEPENDENCIES = {"bedrock_agentcore_starter_toolkit"}
+THRESHOLDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "thresholds.json")
+
+
+def flatten(suite: str, result) -> Dict[str, float]:
+    """
+    Numeric fields as "suite.field", or "suite.key=value.field" for a list of
+    rows, where the row's first field (e.g. stations=200) names the case.
+    """
+    rows = result if isinstance(result, list) else [result]
+    metrics = {}
+    for row in rows:
+        fields = list(row.items())
+        prefix = suite
+        if isinstance(result, list):
+            key, value = fields.pop(0)
+            prefix = f"{suite}.{key}={value}"
+        for field, value in fields:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{prefix}.{field}"] = value
+    return metrics
+
+
+def check(metrics: Dict[str, float], thresholds: Dict[str, Dict], baseline: Dict[str, float], tolerance: float) -> List[Dict]:
+    checks = []
+    for metric, limits in thresholds.items():
+        if metric not in metrics:
+            continue
+        value = metrics[metric]
+        if "max" in limits:
+            checks.append({"metric": metric, "kind": "max", "value": value, "limit": limits["max"], "ok": value <= limits["max"]})
+        if "min" in limits:
+            checks.append({"metric": metric, "kind": "min", "value": value, "limit": limits["min"], "ok": value >= limits["min"]})
+    for metric, previous in baseline.items():
+        # only timings regress by growing; counts and ratios are covered by thresholds
+        if metric.endswith("_ms") and metric in metrics and previous > 0:
+            limit = round(previous * (1 + tolerance), 4)
+            checks.append({"metric": metric, "kind": "baseline", "value": metrics[metric], "limit": limit, "ok": metrics[metric] <= limit})
+    return checks
+
+
+def recalibrate(metrics: Dict[str, float], thresholds: Dict[str, Dict], tolerance: float) -> Dict[str, Dict]:
+    """Timing limits moved to the measured value plus `tolerance`; other limits and unmeasured metrics kept."""
+    updated = {}
+    for metric, limits in thresholds.items():
+        if metric.endswith("_ms") and "max" in limits and metric in metrics:
+            limits = {**limits, "max": float(f"{metrics[metric] * (1 + tolerance):.2g}")}
+        updated[metric] = limits
+    return updated
+
+
+def missing_optional_dependency(err: ImportError) -> bool:
+    return isinstance(err, ModuleNotFoundError) and (err.name or "").split(".")[0] in OPTIONAL_DEPENDENCIES
+
+
+def run_suite(module_name: str):
+    # several suites print progress (memory hooks, token usage); keep stdout for the report
+    with open(os.devnull, "w") as devnull, redirect_stdout(devnull):
+        return importlib.import_module(module_name).run()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmarks with regression thresholds")
+    parser.add_argument("--only", nargs="+", choices=[suite for suite, _ in SUITES], help="Suites to run (default: all)")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH, help="Absolute limits per metric")
+    parser.add_argument("--baseline", help="Earlier report to compare timings with")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--recalibrate", action="store_true", help="Rewrite the timing limits in --thresholds from this run")
+    args = parser.parse_args(argv)
+
+    with open(args.thresholds) as file:
+        thresholds = json.load(file)
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)["metrics"]
+
+    report = {
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+        "metrics": {},
+        "skipped": {},
+        "errors": {},
+    }
+    for suite, module_name in SUITES:
+        if args.only and suite not in args.only:
+            continue
+        start = time.perf_counter()
+        try:
+            result = run_suite(module_name)
+        except ImportError as err:
+            if missing_optional_dependency(err):
+                report["skipped"][suite] = f"{type(err).__name__}: {err}"
+                print(f"{suite}: skipped ({err})", file=sys.stderr)
+                continue
+            report["errors"][suite] = traceback.format_exc()
+            print(f"{suite}: failed\n{report['errors'][suite]}", file=sys.stderr)
+            continue
+        except Exception:
+            report["errors"][suite] = traceback.format_exc()
+            print(f"{suite}: failed\n{report['errors'][suite]}", file=sys.stderr)
+            continue
+        report["results"][suite] = result
+        report["metrics"].update(flatten(suite, result))
+        print(f"{suite}: done in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    if args.recalibrate and not report["errors"]:
+        thresholds = recalibrate(report["metrics"], thresholds, args.tolerance)
+        with open(args.thresholds, "w") as file:
+            file.write("{\n" + ",\n".join(f"  {json.dumps(metric)}: {json.dumps(limits)}" for metric, limits in thresholds.items()) + "\n}\n")
+        print(f"thresholds written to {args.thresholds}", file=sys.stderr)
+
+    report["checks"] = check(report["metrics"], thresholds, baseline, args.tolerance)
+    failed = [item for item in report["checks"] if not item["ok"]]
+    report["passed"] = not failed and not report["errors"]
+    for item in failed:
+        print(f"REGRESSION {item['metric']}: {item['value']} ({item['kind']} {item['limit']})", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(output + "\n")
+    else:
+        print(output)
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
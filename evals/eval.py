@@ -33,6 +33,10 @@ MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
 telemetry = StrandsEvalsTelemetry().setup_in_memory_exporter()
 mapper = StrandsInMemorySessionMapper()
 
+# One fuel client for every case, so the cached NSW API token is reused
+# instead of paying a token round trip per case.
+fuel_client = NSWFuelClient()
+
 
 def _build_session(case_name: str):
     """Collect finished spans and map them to a Session object."""
@@ -55,14 +59,15 @@ def run_standard_case(case: Case) -> dict:
     for CLARIFICATION cases where expected_tools=[]).
     """
     telemetry.in_memory_exporter.clear()
-    client = NSWFuelClient()
     agent = Agent(
         system_prompt=SYSTEM_PROMPT,
         tools=[
             geocode_location,
-            client.get_prices_for_location,
-            client.get_nearby_prices,
-            client.get_price_at_station,
+            fuel_client.get_prices_for_location,
+            fuel_client.get_nearby_prices,
+            fuel_client.get_price_at_station,
+            fuel_client.get_prices_at_stations,
+            fuel_client.get_price_history,
         ],
         model=MODEL_ID,
         callback_handler=None,
@@ -107,7 +112,6 @@ if __name__ == "__main__":
 
     with mapbox_mcp_client:
         mapbox_tools = mapbox_mcp_client.list_tools_sync()
-        fuel_tools = NSWFuelClient()
 
         def run_mapbox_case(case: Case) -> dict:
             """
@@ -120,9 +124,11 @@ if __name__ == "__main__":
                 tools=[
                     mapbox_tools,
                     geocode_location,
-                    fuel_tools.get_prices_for_location,
-                    fuel_tools.get_nearby_prices,
-                    fuel_tools.get_price_at_station,
+                    fuel_client.get_prices_for_location,
+                    fuel_client.get_nearby_prices,
+                    fuel_client.get_price_at_station,
+                    fuel_client.get_prices_at_stations,
+                    fuel_client.get_price_history,
                 ],
                 model=MODEL_ID,
                 callback_handler=None,
@@ -32,4 +32,9 @@ resource "aws_iam_role_policy" "bedrock_agentcore_memory_access" {
       }
     ]
   })
-}
\ No newline at end of file
+}
+
+# pass to the agent as AGENTCORE_MEMORY_ID to skip the get_or_create lookup at startup
+output "memory_id" {
+  value = aws_bedrockagentcore_memory.nsw_fuel_agent_memory.id
+}
@@ -0,0 +1,24 @@
+import os
+import sys
+import atexit
+import shutil
+import tempfile
+
+# Add agents/ directory to path (agents/ uses flat imports, not a package)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "agents"))
+
+# keep the agents/ modules' on-disk caches and credentials away from the user's own
+_cache_dir = tempfile.mkdtemp(prefix="nsw-fuel-tests-")
+atexit.register(shutil.rmtree, _cache_dir, ignore_errors=True)
+
+TEST_ENV = {
+    "PRICE_HISTORY_PATH": os.path.join(_cache_dir, "price_history.bin"),
+    "GEOCODE_CACHE_PATH": os.path.join(_cache_dir, "geocode.sqlite3"),
+    "FUEL_SNAPSHOT_ENABLED": "false",
+    "HEDGE_ENABLED": "false",
+    "MAPBOX_API_KEY": "test",
+    "NSW_API_KEY": "test",
+    "NSW_AUTH_HEADER": "Basic test",
+}
+for name, value in TEST_ENV.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,27 @@
+from bedrock_agentcore.memory.constants import MessageRole
+
+from memory.context_cache import SessionContextCache
+
+
+class CountingSession:
+    def __init__(self, turns):
+        self.turns = turns
+        self.reads = 0
+
+    def get_last_k_turns(self, k: int):
+        self.reads += 1
+        return self.turns[-k:]
+
+
+def test_peek_never_reads_remote_memory():
+    cache = SessionContextCache()
+    session = CountingSession([])
+
+    assert cache.peek(("actor", "s1")) is None
+    assert cache.get_last_k_turns(("actor", "s1"), session) == []
+    assert cache.peek(("actor", "s1")) == []
+
+    cache.append(("actor", "s1"), MessageRole.USER, "hi")
+
+    assert cache.peek(("actor", "s1")) == [[{"role": "USER", "content": {"text": "hi"}}]]
+    assert session.reads == 1
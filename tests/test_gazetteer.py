@@ -0,0 +1,132 @@
+import random
+
+import pytest
+
+from gazetteer import Gazetteer, Locality, LocalityTrie
+from models import Coordinates
+
+ROWS = [
+    ("Parramatta", "2150", -33.8150, 151.0011),
+    ("Harris Park", "2150", -33.8230, 151.0090),
+    ("Newtown", "2042", -33.8980, 151.1790),
+    ("Newtown", "2114", -33.7960, 151.0480),
+    ("Hamilton", "2303", -32.9200, 151.7480),
+    ("Bondi", "2026", -33.8930, 151.2620),
+    ("Bondi Junction", "2022", -33.8920, 151.2470),
+    ("Campbelltown", "2560", -34.0650, 150.8140),
+    ("Camden", "2570", -34.0540, 150.6960),
+    ("Carlton", "2218", -33.9700, 151.1200),
+    ("Carlingford", "2118", -33.7830, 151.0480),
+    ("Wyong", "2259", -33.2830, 151.4230),
+    ("Wyoming", "2250", -33.4040, 151.3530),
+]
+
+
+def levenshtein(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, start=1):
+        row = [i]
+        for j, char_b in enumerate(b, start=1):
+            row.append(min(row[j - 1] + 1, previous[j] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = row
+    return previous[-1]
+
+
+@pytest.fixture
+def gazetteer(tmp_path):
+    path = tmp_path / "localities.csv"
+    lines = ["locality,postcode,latitude,longitude"] + [",".join(map(str, row)) for row in ROWS]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return Gazetteer(str(path), fuzzy_min_length=5)
+
+
+def coordinates(name: str, postcode: str) -> Coordinates:
+    row = next(row for row in ROWS if row[0] == name and row[1] == postcode)
+    return Coordinates(latitude=row[2], longitude=row[3])
+
+
+def test_trie_search_matches_brute_force():
+    rng = random.Random(7)
+    alphabet = "abcde"
+    names = {"".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(300)}
+    trie = LocalityTrie()
+    for name in names:
+        trie.insert(name, Locality(name, "2000", Coordinates(latitude=0, longitude=0)))
+    assert trie.size == len(names)
+
+    for _ in range(200):
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 8)))
+        for max_edits in (1, 2):
+            found = {(distance, name) for distance, name, _ in trie.search(query, max_edits)}
+            expected = {
+                (levenshtein(query, name), name) for name in names
+                if name[0] == query[0] and levenshtein(query, name) <= max_edits
+            }
+            assert found == expected
+            distances = [distance for distance, _, _ in trie.search(query, max_edits)]
+            assert distances == sorted(distances)
+
+
+def test_trie_get_is_exact():
+    trie = LocalityTrie()
+    locality = Locality("Bondi", "2026", Coordinates(latitude=0, longitude=0))
+    trie.insert("bondi", locality)
+    assert trie.get("bondi") == [locality]
+    assert trie.get("bond") == []
+    assert trie.get("bondii") == []
+
+
+@pytest.mark.parametrize("address, name, postcode", [
+    ("Parramatta", "Parramatta", "2150"),
+    ("parramatta nsw 2150, australia", "Parramatta", "2150"),
+    ("Hamilton NSW 2303", "Hamilton", "2303"),
+    ("Bondi Junction", "Bondi Junction", "2022"),
+    ("Newtown 2114", "Newtown", "2114"),
+    ("Harris Park, New South Wales", "Harris Park", "2150"),
+])
+def test_exact_lookups(gazetteer, address, name, postcode):
+    assert gazetteer.lookup(address) == coordinates(name, postcode)
+    assert gazetteer.metrics.get("exact_hits") == 1
+
+
+def test_postcode_resolves_to_the_mean_of_its_localities(gazetteer):
+    assert gazetteer.lookup("2150") == Coordinates(latitude=-33.819, longitude=151.005)
+    assert gazetteer.metrics.get("postcode_hits") == 1
+
+
+@pytest.mark.parametrize("address, name, postcode", [
+    ("Paramatta", "Parramatta", "2150"),         # one edit
+    ("Cambeltown", "Campbelltown", "2560"),      # two edits in a long name
+    ("Hamiltn, NSW", "Hamilton", "2303"),
+])
+def test_fuzzy_lookups(gazetteer, address, name, postcode):
+    assert gazetteer.lookup(address) == coordinates(name, postcode)
+    assert gazetteer.metrics.get("fuzzy_hits") == 1
+
+
+def test_fuzzy_results_are_cached(gazetteer):
+    searches = []
+    search = gazetteer.trie.search
+    gazetteer.trie.search = lambda name, max_edits: searches.append(name) or search(name, max_edits)
+
+    for _ in range(3):
+        assert gazetteer.lookup("Paramatta") == coordinates("Parramatta", "2150")
+        assert gazetteer.lookup("Wollongong") is None
+
+    assert searches == ["paramatta", "wollongong"]
+
+
+@pytest.mark.parametrize("address, kind", [
+    ("Wyon", "misses"),                          # short names only match exactly
+    ("Camden", "exact_hits"),
+    ("Wyomng", "ambiguous"),                     # one edit from both Wyong and Wyoming
+    ("12 Church St, Parramatta", "street_addresses"),
+    ("Wollongong", "misses"),
+    ("2999", "misses"),
+    ("3000", "street_addresses"),                # outside NSW
+])
+def test_fall_back_to_mapbox(gazetteer, address, kind):
+    result = gazetteer.lookup(address)
+    assert gazetteer.metrics.get(kind) == 1
+    if kind != "exact_hits":
+        assert result is None
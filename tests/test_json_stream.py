@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from json_stream import JSONArrayStream
+
+DOCUMENT = json.dumps({
+    "stations": [{"code": "1", "name": "Station 1", "location": {"latitude": -33.81, "longitude": 151.0}}],
+    "count": 2,
+    "prices": [1, 2.5, -3, 12.5e3, 1e-2, "189.9", True, None, {"price": 189.9}],
+    "n": 12.5e3,
+})
+
+
+def decode(chunks, keys=("stations", "prices")) -> list:
+    stream = JSONArrayStream(keys)
+    items = []
+    for chunk in chunks:
+        items += stream.feed(chunk)
+    return items + stream.feed("", final=True)
+
+
+def expected(document: str, keys=("stations", "prices")) -> list:
+    return [(key, value) for key, values in json.loads(document).items() if key in keys for value in values]
+
+
+@pytest.mark.parametrize("offset", range(len(DOCUMENT) + 1))
+def test_every_split_point_decodes_like_json_loads(offset):
+    assert decode([DOCUMENT[:offset], DOCUMENT[offset:]]) == expected(DOCUMENT)
+
+
+def test_number_split_after_decimal_point():
+    document = '{"prices":[1,2],"n":12.5e3}'
+    assert document[23:] == "5e3}"
+
+    assert decode([document[:23], document[23:]]) == [("prices", 1), ("prices", 2)]
+
+
+@pytest.mark.parametrize("number", ["12.5e3", "-0.25", "1E+10", "3"])
+def test_array_number_split_at_every_character(number):
+    document = '{"prices":[' + number + "]}"
+    for offset in range(len(document) + 1):
+        assert decode([document[:offset], document[offset:]]) == [("prices", json.loads(number))]
+
+
+def test_one_character_chunks():
+    assert decode(list(DOCUMENT)) == expected(DOCUMENT)
@@ -0,0 +1,80 @@
+import time
+import asyncio
+
+from mapbox_mcp import PersistentMCPClient
+
+
+class SlowClient:
+    """MCPClient stand-in whose connect and tool listing block like a remote server."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.active = False
+
+    def start(self):
+        time.sleep(self.delay)
+        self.active = True
+
+    def list_tools_sync(self):
+        time.sleep(self.delay)
+        return ["directions_tool"]
+
+    def stop(self, *args):
+        self.active = False
+
+    def _is_session_active(self):
+        return self.active
+
+
+def make_client(delay: float = 0.2, health_check_interval: float = 300) -> PersistentMCPClient:
+    client = PersistentMCPClient(lambda: None, name="test_mcp", health_check_interval=health_check_interval)
+    client.client = SlowClient(delay)
+    return client
+
+
+async def ticks_during(awaitable, interval: float = 0.01) -> tuple:
+    ticks = 0
+
+    async def tick():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(interval)
+            ticks += 1
+
+    ticker = asyncio.create_task(tick())
+    try:
+        return await awaitable, ticks
+    finally:
+        ticker.cancel()
+
+
+def test_connect_does_not_block_the_event_loop():
+    client = make_client()
+
+    tools, ticks = asyncio.run(ticks_during(client.get_tools_async()))
+
+    assert tools == ["directions_tool"]
+    # connect plus tool listing take 0.4 s; a blocked loop would not tick at all
+    assert ticks >= 10
+
+
+def test_live_connection_answers_from_the_cache():
+    client = make_client()
+    client.get_tools()
+    client.client.delay = 5
+
+    start = time.perf_counter()
+    tools = asyncio.run(client.get_tools_async())
+
+    assert tools == ["directions_tool"]
+    assert time.perf_counter() - start < 0.5
+
+
+def test_health_check_runs_off_the_event_loop():
+    client = make_client(health_check_interval=0)
+    client.get_tools()
+
+    tools, ticks = asyncio.run(ticks_during(client.get_tools_async()))
+
+    assert tools == ["directions_tool"]
+    assert ticks >= 5
+    assert client.metrics.get("health_checks") == 1
@@ -0,0 +1,86 @@
+import time
+import asyncio
+import threading
+
+from bedrock_agentcore.memory.constants import ConversationalMessage, MessageRole
+
+from memory.writer import MemoryWriter
+
+
+class RecordingSession:
+    """Memory session that records written batches; `gate` holds writes until it is set."""
+    def __init__(self):
+        self.batches = []
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def add_turns(self, messages):
+        self.gate.wait()
+        self.batches.append([message.text for message in messages])
+
+
+def message(text: str) -> ConversationalMessage:
+    return ConversationalMessage(text, MessageRole.USER)
+
+
+def test_turn_is_written_as_one_batch_on_flush():
+    writer = MemoryWriter(flush_interval=60)
+    session = RecordingSession()
+
+    writer.add(session, message("question"))
+    writer.add(session, message("answer"))
+    writer.flush(session)
+    writer.close()
+
+    assert session.batches == [["question", "answer"]]
+    assert writer.metrics.get("timer_flushes") == 0
+
+
+def test_full_buffer_keeps_every_message():
+    writer = MemoryWriter(maxsize=5, flush_interval=60)
+    session = RecordingSession()
+    session.gate.clear()
+
+    for turn in range(20):
+        assert writer.add(session, message(f"turn {turn}"))
+        writer.flush(session)
+    session.gate.set()
+    writer.close()
+
+    assert [text for batch in session.batches for text in batch] == [f"turn {turn}" for turn in range(20)]
+
+
+def test_wait_for_capacity_holds_a_turn_until_the_writer_catches_up():
+    writer = MemoryWriter(maxsize=3, flush_interval=60)
+    session = RecordingSession()
+    session.gate.clear()
+    for turn in range(5):
+        writer.add(session, message(f"turn {turn}"))
+    writer.flush(session)
+
+    async def scenario():
+        assert not await writer.wait_for_capacity(timeout=0.05)
+        threading.Timer(0.05, session.gate.set).start()
+        start = time.perf_counter()
+        assert await writer.wait_for_capacity(timeout=5)
+        return time.perf_counter() - start
+
+    waited = asyncio.run(scenario())
+    writer.close()
+
+    assert 0.04 <= waited < 5
+    assert writer.metrics.get("backpressure_timeouts") == 1
+
+
+def test_unflushed_messages_are_written_by_the_timer():
+    writer = MemoryWriter(flush_interval=0.05)
+    session = RecordingSession()
+
+    writer.add(session, message("abandoned turn"))
+    deadline = time.monotonic() + 2
+    while not session.batches and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert session.batches == [["abandoned turn"]]
+    assert writer.metrics.get("timer_flushes") == 1
+    writer.close()
@@ -0,0 +1,114 @@
+import os
+import asyncio
+
+import httpx
+import pytest
+
+import tools
+import transport
+from resilience import UpstreamPolicy
+
+TOKEN_PATH = "/oauth/client_credential/accesstoken"
+NEW_PRICES_PATH = "/FuelPriceCheck/v2/fuel/prices/new"
+ALL_PRICES_PATH = "/FuelPriceCheck/v2/fuel/prices"
+PRICE = {"stationcode": 100, "fueltype": "E10", "price": 189.9, "lastupdated": "15/11/2025 07:45:12"}
+
+
+class NSWApi:
+    """
+    NSW Fuel API stand-in: each token request issues the next token, and
+    price requests are only accepted with the tokens in `valid`.
+    """
+    def __init__(self, valid=("t2",), token_status=200):
+        self.valid = set(valid)
+        self.token_status = token_status
+        self.issued = 0
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.url.path, request.headers.get("authorization")))
+        if request.url.path == TOKEN_PATH:
+            if self.token_status != 200:
+                return httpx.Response(self.token_status, json={"error": "invalid_client"})
+            self.issued += 1
+            return httpx.Response(200, json={"access_token": f"t{self.issued}", "expires_in": "3600"})
+        if request.headers.get("authorization") not in {f"Bearer {token}" for token in self.valid}:
+            return httpx.Response(401, json={"message": "Access token expired"})
+        return httpx.Response(200, json={"stations": [], "prices": [PRICE]})
+
+    def price_requests(self):
+        return [authorization for path, authorization in self.requests if path != TOKEN_PATH]
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = NSWApi()
+    monkeypatch.setattr(transport, "build_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(api)))
+    monkeypatch.setattr(tools, "price_history", None)
+    # the shared policy's token-endpoint budget would make later tests wait
+    monkeypatch.setattr(tools, "nsw_upstream", UpstreamPolicy("test_nsw_upstream"))
+    return api
+
+
+def test_rejected_token_is_refreshed_and_the_request_retried_once(api):
+    client = tools.NSWFuelClient()
+
+    response = asyncio.run(client._get_new_prices())
+
+    assert response["prices"] == [PRICE]
+    assert api.price_requests() == ["Bearer t1", "Bearer t2"]
+    assert api.issued == 2
+    assert client.token_manager.metrics.get("unauthorized_retries") == 1
+    assert client.token_manager.metrics.get("invalidations") == 1
+
+
+def test_second_rejection_is_returned_to_the_caller(api):
+    api.valid = set()
+    client = tools.NSWFuelClient()
+
+    assert asyncio.run(client._get_new_prices()) is None
+    assert api.price_requests() == ["Bearer t1", "Bearer t2"]
+
+
+def test_accepted_token_is_not_refreshed(api):
+    api.valid = {"t1"}
+    client = tools.NSWFuelClient()
+
+    async def scenario():
+        return [await client._get_new_prices() for _ in range(2)]
+
+    assert [response["prices"] for response in asyncio.run(scenario())] == [[PRICE], [PRICE]]
+    assert api.price_requests() == ["Bearer t1", "Bearer t1"]
+    assert api.issued == 1
+
+
+def test_concurrent_rejections_share_one_refresh(api):
+    client = tools.NSWFuelClient()
+
+    async def scenario():
+        return await asyncio.gather(*(client._get_new_prices() for _ in range(4)))
+
+    assert all(response["prices"] == [PRICE] for response in asyncio.run(scenario()))
+    # every caller retried with the single replacement token
+    assert api.issued == 2
+    assert sorted(api.price_requests()) == ["Bearer t1"] * 4 + ["Bearer t2"] * 4
+
+
+def test_streamed_request_is_retried(api):
+    client = tools.NSWFuelClient()
+
+    async def scenario():
+        return [item async for item in client._stream_all_prices()]
+
+    assert asyncio.run(scenario()) == [("prices", PRICE)]
+    assert api.price_requests() == ["Bearer t1", "Bearer t2"]
+
+
+def test_token_request_failure_is_not_retried(api):
+    api.token_status = 401
+    client = tools.NSWFuelClient()
+
+    with pytest.raises(tools.TokenError):
+        asyncio.run(client._get_new_prices())
+    # the token request carries Basic credentials, so its 401 is final
+    assert api.requests == [(TOKEN_PATH, os.getenv("NSW_AUTH_HEADER"))]
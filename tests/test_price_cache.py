@@ -0,0 +1,149 @@
+import asyncio
+import types
+
+import pytest
+
+import cache
+import price_cache
+from price_cache import PriceCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # only the caches see the fake clock; the event loop keeps the real one
+    clock = Clock()
+    fake_time = types.SimpleNamespace(monotonic=clock.monotonic)
+    monkeypatch.setattr(price_cache, "time", fake_time)
+    monkeypatch.setattr(cache, "time", fake_time)
+    return clock
+
+
+class Upstream:
+    """Price search stand-in returning an increasing version per call."""
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+        self.release = None
+
+    async def fetch(self):
+        self.calls += 1
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return f"v{self.calls}"
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+KEY = ("nearby", "r3gx2f", None, "E10", (), None)
+
+
+def test_fresh_entries_are_served_from_cache(clock):
+    prices = PriceCache(ttl=60, stale_ttl=240)
+    upstream = Upstream()
+
+    async def scenario():
+        first = await prices.get_or_fetch(KEY, upstream.fetch)
+        clock.now += 59
+        return first, await prices.get_or_fetch(KEY, upstream.fetch)
+
+    assert asyncio.run(scenario()) == ("v1", "v1")
+    assert upstream.calls == 1
+
+
+def test_stale_entry_is_returned_while_one_refresh_runs(clock):
+    prices = PriceCache(ttl=60, stale_ttl=240)
+    upstream = Upstream()
+
+    async def scenario():
+        await prices.get_or_fetch(KEY, upstream.fetch)
+        clock.now += 61
+        upstream.release = asyncio.Event()
+        stale = [await prices.get_or_fetch(KEY, upstream.fetch) for _ in range(3)]
+        await settle()
+        # every stale read answered at once, with a single refresh in flight
+        assert upstream.calls == 2
+        upstream.release.set()
+        await settle()
+        return stale, await prices.get_or_fetch(KEY, upstream.fetch)
+
+    stale, refreshed = asyncio.run(scenario())
+
+    assert stale == ["v1", "v1", "v1"]
+    assert refreshed == "v2"
+    assert prices.metrics.get("stale_hits") == 3
+    assert prices.metrics.get("background_refreshes") == 1
+
+
+def test_failed_refresh_keeps_serving_the_stale_entry(clock):
+    prices = PriceCache(ttl=60, stale_ttl=240)
+    upstream = Upstream()
+
+    async def scenario():
+        await prices.get_or_fetch(KEY, upstream.fetch)
+        clock.now += 61
+        upstream.error = RuntimeError("upstream down")
+        first = await prices.get_or_fetch(KEY, upstream.fetch)
+        await settle()
+        # the failed refresh is forgotten, so the next stale read tries again
+        second = await prices.get_or_fetch(KEY, upstream.fetch)
+        await settle()
+        return first, second
+
+    assert asyncio.run(scenario()) == ("v1", "v1")
+    assert upstream.calls == 3
+    assert prices.metrics.get("refresh_failures") == 2
+
+
+def test_entries_past_the_stale_window_are_fetched_again(clock):
+    prices = PriceCache(ttl=60, stale_ttl=240)
+    upstream = Upstream()
+
+    async def scenario():
+        await prices.get_or_fetch(KEY, upstream.fetch)
+        clock.now += 301
+        return await prices.get_or_fetch(KEY, upstream.fetch)
+
+    assert asyncio.run(scenario()) == "v2"
+    assert prices.metrics.get("stale_hits") == 0
+
+
+def test_concurrent_misses_share_one_fetch_and_none_is_not_cached(clock):
+    prices = PriceCache(ttl=60, stale_ttl=240)
+    calls = []
+
+    async def failed_search():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return None
+
+    async def scenario():
+        results = await asyncio.gather(*(prices.get_or_fetch(KEY, failed_search) for _ in range(4)))
+        again = await prices.get_or_fetch(KEY, failed_search)
+        return results, again
+
+    results, again = asyncio.run(scenario())
+
+    assert results == [None] * 4 and again is None
+    assert len(calls) == 2
+
+
+def test_key_quantizes_location_and_ignores_brand_order():
+    prices = PriceCache(precision=6)
+    a = prices.key("nearby", -33.8150, 151.0011, "e10", brands=["Shell", "BP"], radius=5)
+    b = prices.key("nearby", -33.8151, 151.0012, "E10", brands=["bp", "shell"], radius=5.0)
+    far = prices.key("nearby", -33.9000, 151.0011, "E10", brands=["bp", "shell"], radius=5)
+    assert a == b
+    assert a != far
@@ -0,0 +1,39 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from price_history import PriceHistory
+
+
+def stamp(moment: datetime) -> str:
+    return moment.strftime("%d/%m/%Y %H:%M:%S")
+
+
+@pytest.fixture
+def history(tmp_path):
+    store = PriceHistory(str(tmp_path / "price_history.bin"))
+    yield store
+    store.close()
+
+
+def test_series_since_skips_old_records_of_other_fuels(history):
+    now = datetime.now().replace(microsecond=0)
+    history.append("100", "U91", 190.0, stamp(now - timedelta(days=2)))
+    history.append("100", "LPG", 99.0, stamp(now - timedelta(days=40)))
+    history.append("100", "U91", 195.0, stamp(now - timedelta(hours=1)))
+
+    series = history.series("100", "U91", since=now - timedelta(days=7))
+
+    assert [point["price"] for point in series] == [190.0, 195.0]
+
+
+def test_series_is_oldest_first_when_appended_out_of_order(history):
+    now = datetime.now().replace(microsecond=0)
+    history.append("100", "E10", 180.0, stamp(now - timedelta(hours=1)))
+    history.append("100", "E10", 170.0, stamp(now - timedelta(days=3)))
+    history.append("100", "E10", 175.0, stamp(now - timedelta(days=10)))
+
+    series = history.series("100", "E10", since=now - timedelta(days=7))
+
+    assert [point["price"] for point in series] == [170.0, 180.0]
+    assert history.summary("100", "E10")["observations"] == 2
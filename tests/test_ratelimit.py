@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from ratelimit import AdaptiveConcurrencyLimit, RateLimiter, RateLimitExceeded
+
+
+async def call(limiter: RateLimiter, endpoint: str):
+    async with limiter.limit(endpoint):
+        pass
+
+
+def test_api_wide_rejection_refunds_the_endpoint_token():
+    # the endpoint allows two calls, the API as a whole only one
+    limiter = RateLimiter("test_refund", rate=0.001, burst=1, endpoints={"prices": (0.001, 2)}, max_wait=0)
+
+    async def scenario():
+        await call(limiter, "prices")
+        for _ in range(3):
+            with pytest.raises(RateLimitExceeded):
+                await call(limiter, "prices")
+
+    asyncio.run(scenario())
+
+    assert limiter.metrics.get("rejections") == 3
+    assert limiter.endpoints["prices"].reserve(0) == 0
+
+
+def test_cancelled_caller_refunds_its_tokens():
+    # one token per two seconds, so a second call sleeps for its token
+    limiter = RateLimiter("test_cancel_refund", rate=0.5, burst=1, endpoints={"prices": (0.5, 1)})
+
+    async def scenario():
+        await call(limiter, "prices")
+        waiting = asyncio.create_task(call(limiter, "prices"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(scenario())
+
+    # the next token is still the one the cancelled call reserved, two seconds out rather than four
+    assert limiter.endpoints["prices"].reserve(10) < 3
+    assert limiter.bucket.reserve(10) < 3
+
+
+def test_concurrency_timeout_refunds_its_tokens():
+    concurrency = AdaptiveConcurrencyLimit(initial=1, minimum=1, maximum=1)
+    limiter = RateLimiter("test_slot_refund", rate=0.01, burst=2, concurrency=concurrency, max_wait=0.05)
+
+    async def scenario():
+        async with limiter.limit("prices"):
+            with pytest.raises(RateLimitExceeded):
+                await call(limiter, "prices")
+
+    asyncio.run(scenario())
+
+    assert limiter.metrics.get("rejections") == 1
+    assert limiter.bucket.reserve(0) == 0
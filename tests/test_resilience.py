@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+import pytest
+
+from ratelimit import RateLimitExceeded
+from resilience import CircuitBreaker, CircuitOpenError, UpstreamPolicy
+
+
+def make_policy() -> UpstreamPolicy:
+    return UpstreamPolicy(
+        "test_upstream",
+        retries=0,
+        breaker=lambda: CircuitBreaker(failure_threshold=1, reset_timeout=0),
+    )
+
+
+async def fail():
+    raise httpx.ConnectError("down")
+
+
+async def ok():
+    return httpx.Response(200)
+
+
+@pytest.mark.parametrize("error", [RateLimitExceeded("busy"), asyncio.CancelledError()])
+def test_trial_that_ends_without_an_answer_frees_the_half_open_circuit(error):
+    async def interrupted():
+        raise error
+
+    async def scenario():
+        policy = make_policy()
+        with pytest.raises(httpx.ConnectError):
+            await policy.call("/prices", fail)
+        # half-open now (reset_timeout=0); the trial never reaches the endpoint
+        with pytest.raises(type(error)):
+            await policy.call("/prices", interrupted)
+        response = await policy.call("/prices", ok)
+        return response.status_code, policy.breaker("/prices").state
+
+    assert asyncio.run(scenario()) == (200, "closed")
+
+
+def test_failed_trial_reopens_the_circuit():
+    async def scenario():
+        policy = UpstreamPolicy("test_upstream", retries=0, breaker=lambda: CircuitBreaker(failure_threshold=1, reset_timeout=60))
+        with pytest.raises(httpx.ConnectError):
+            await policy.call("/prices", fail)
+        with pytest.raises(CircuitOpenError):
+            await policy.call("/prices", ok)
+
+    asyncio.run(scenario())
@@ -0,0 +1,134 @@
+import asyncio
+
+import pytest
+
+from models import Coordinates, Price, Station
+from router import CLARIFICATION_ANSWER, GREETING_ANSWER, FastPathRouter
+
+
+def station(code: str, distance: float, prices: dict) -> Station:
+    return Station(
+        name=f"Station {code}", brand="BP", address=f"{code} Church St, Parramatta NSW 2150",
+        coordinates=Coordinates(latitude=-33.81, longitude=151.0), distance=distance, station_code=code,
+        prices=[Price(station_code=code, fueltype=fuel, price=price, last_updated="15/11/2025 07:45:12")
+                for fuel, price in prices.items()],
+    )
+
+
+class FuelClient:
+    """Records the lookups the router makes."""
+    def __init__(self, stations=None, station_prices=None):
+        self.stations = stations
+        self.station_prices = station_prices
+        self.calls = []
+
+    async def get_price_at_station(self, station_code):
+        self.calls.append(("station", station_code))
+        return self.station_prices
+
+    async def find_prices_for_location(self, named_location, latitude, longitude, fueltype, brands):
+        self.calls.append(("location", named_location, fueltype))
+        return self.stations
+
+
+def make_router(client=None, coordinates=Coordinates(latitude=-33.81, longitude=151.0)):
+    geocoded = []
+
+    async def geocode(address):
+        geocoded.append(address)
+        return coordinates
+
+    router = FastPathRouter(client or FuelClient(), geocode, enabled=True, top_n=2)
+    router.geocoded = geocoded
+    return router
+
+
+def route(router, prompt, has_history=lambda: False):
+    return asyncio.run(router.route(prompt, has_history))
+
+
+@pytest.mark.parametrize("prompt", ["Hi", "hello!", "G'day mate", "  Good morning  "])
+def test_greetings(prompt):
+    result = route(make_router(), prompt)
+    assert result.intent == "greeting"
+    assert result.answer == GREETING_ANSWER
+
+
+def test_station_price():
+    client = FuelClient(station_prices=station("20594", 0.0, {"E10": 189.9, "U91": 192.5}).prices)
+    result = route(make_router(client), "What are the prices at station 20594?")
+    assert result.intent == "station_price"
+    assert client.calls == [("station", "20594")]
+    assert "**20594**" in result.answer
+    assert "- **E10:** 189.9 c/L" in result.answer
+    assert "- **U91:** 192.5 c/L" in result.answer
+
+
+def test_cheapest_lists_the_requested_fuel_by_price():
+    client = FuelClient(stations=[
+        station("1", 0.5, {"E10": 199.9, "U91": 201.0}),
+        station("2", 2.0, {"E10": 185.5}),
+        station("3", 1.0, {"U91": 170.0}),
+        station("4", 3.0, {"E10": 190.1}),
+    ])
+    router = make_router(client)
+    result = route(router, "cheapest ethanol 94 near Parramatta 2150")
+
+    assert result.intent == "cheapest"
+    assert router.geocoded == ["2150 NSW"]
+    assert client.calls == [("location", "2150", "E10")]
+    # top 2 by E10 price; station 3 has no E10 and other fuels are left out
+    assert result.answer.index("Station 2") < result.answer.index("Station 4")
+    assert "Station 1" not in result.answer and "Station 3" not in result.answer
+    assert "U91" not in result.answer
+
+
+@pytest.mark.parametrize("prompt", [
+    "where is the cheapest fuel near me",
+    "Unleaded 91 prices nearby?",
+])
+def test_clarification_without_location(prompt):
+    result = route(make_router(), prompt)
+    assert result.intent == "clarification"
+    assert result.answer == CLARIFICATION_ANSWER
+
+
+def test_clarification_defers_to_session_history():
+    assert route(make_router(), "cheapest fuel near me", has_history=lambda: True) is None
+
+
+@pytest.mark.parametrize("prompt", [
+    "cheapest diesel near me in Newtown",
+    "fuel prices near Parramatta",
+    "cheapest fuel near me 2150",
+    "How do I get to Bondi Beach from the city?",
+    "hello, can you compare the prices of every station along the M4 between Penrith and the city",
+    "",
+])
+def test_fall_through(prompt):
+    client = FuelClient()
+    router = make_router(client)
+    assert route(router, prompt) is None
+    assert client.calls == []
+
+
+def test_empty_lookups_fall_through():
+    assert route(make_router(FuelClient(station_prices=[])), "price at station 20594") is None
+    assert route(make_router(FuelClient(stations=[])), "cheapest e10 near 2150") is None
+    assert route(make_router(coordinates=None), "cheapest e10 near 2150") is None
+
+
+def test_lookup_errors_fall_through():
+    class Failing(FuelClient):
+        async def get_price_at_station(self, station_code):
+            raise RuntimeError("upstream down")
+
+    router = make_router(Failing())
+    assert route(router, "price at station 20594") is None
+    assert router.metrics.get("errors") == 1
+
+
+def test_disabled_router_falls_through():
+    router = make_router()
+    router.enabled = False
+    assert route(router, "hello") is None
@@ -0,0 +1,131 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+class Upstream:
+    """Fetch stand-in that blocks until released and counts calls."""
+    def __init__(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = None
+
+    async def fetch(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrent_calls_share_one_fetch():
+    flight = SingleFlight("test_singleflight_share")
+    upstream = Upstream(result={"price": 189.9})
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.create_task(flight.do("prices", upstream.fetch)) for _ in range(5)]
+        await settle()
+        assert len(flight) == 1
+        upstream.release.set()
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(scenario())
+
+    assert upstream.calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.metrics.get("upstream_calls") == 1
+    assert flight.metrics.get("calls_saved") == 4
+    assert len(flight) == 0
+
+
+def test_different_keys_fetch_separately():
+    flight = SingleFlight("test_singleflight_keys")
+    upstream = Upstream(result=1)
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        return await asyncio.gather(flight.do("a", upstream.fetch), flight.do("b", upstream.fetch))
+
+    assert asyncio.run(scenario()) == [1, 1]
+    assert upstream.calls == 2
+
+
+def test_nothing_is_cached_after_the_call():
+    flight = SingleFlight("test_singleflight_sequential")
+    upstream = Upstream(result=1)
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        await flight.do("prices", upstream.fetch)
+        await flight.do("prices", upstream.fetch)
+
+    asyncio.run(scenario())
+    assert upstream.calls == 2
+
+
+def test_error_reaches_every_waiter_and_is_not_remembered():
+    flight = SingleFlight("test_singleflight_error")
+    upstream = Upstream(error=RuntimeError("upstream down"))
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        waiters = [asyncio.create_task(flight.do("prices", upstream.fetch)) for _ in range(3)]
+        await settle()
+        upstream.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert len(flight) == 0
+
+        upstream.error = None
+        upstream.result = "recovered"
+        return results, await flight.do("prices", upstream.fetch)
+
+    results, retried = asyncio.run(scenario())
+
+    assert upstream.calls == 2
+    assert all(isinstance(result, RuntimeError) and str(result) == "upstream down" for result in results)
+    assert retried == "recovered"
+
+
+def test_cancelled_caller_does_not_cancel_the_shared_call():
+    flight = SingleFlight("test_singleflight_cancel")
+    upstream = Upstream(result="done")
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        first = asyncio.create_task(flight.do("prices", upstream.fetch))
+        second = asyncio.create_task(flight.do("prices", upstream.fetch))
+        await settle()
+        first.cancel()
+        await settle()
+        upstream.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "done"
+    assert upstream.calls == 1
+
+
+def test_each_event_loop_has_its_own_flights():
+    flight = SingleFlight("test_singleflight_loops")
+    upstream = Upstream(result=1)
+
+    async def scenario():
+        upstream.release = asyncio.Event()
+        upstream.release.set()
+        return await flight.do("prices", upstream.fetch)
+
+    # a flight left over from a finished loop must not be awaited from a new one
+    assert [asyncio.run(scenario()) for _ in range(2)] == [1, 1]
+    assert upstream.calls == 2
@@ -0,0 +1,54 @@
+import asyncio
+
+import tools
+from snapshot import PriceSnapshot
+
+STATION = {"code": 100, "name": "Station 100", "brand": "BP", "address": "1 Church St, Parramatta NSW 2150",
+           "location": {"latitude": -33.81, "longitude": 151.0}}
+PRICE = {"stationcode": 100, "fueltype": "E10", "price": 189.9, "lastupdated": "15/11/2025 07:45:12"}
+
+
+class Dump:
+    """Statewide dump stand-in that counts full loads."""
+    def __init__(self):
+        self.loads = 0
+
+    async def stream_all(self):
+        self.loads += 1
+        yield "stations", STATION
+        yield "prices", PRICE
+
+    async def fetch_new(self):
+        return None
+
+
+def test_tools_use_the_live_api_without_starting_a_load(monkeypatch):
+    monkeypatch.setattr(tools, "FUEL_SNAPSHOT_ENABLED", True)
+    client = tools.NSWFuelClient()
+    dump = Dump()
+    client.snapshot = PriceSnapshot(dump.stream_all, dump.fetch_new)
+
+    # one event loop per call, as the evals run the agent
+    for _ in range(3):
+        assert asyncio.run(client._use_snapshot()) is False
+
+    assert client.snapshot._task is None
+    assert dump.loads == 0
+
+
+def test_runtime_start_loads_once_and_stop_cancels():
+    dump = Dump()
+    snapshot = PriceSnapshot(dump.stream_all, dump.fetch_new, delta_interval=3600)
+
+    async def runtime():
+        snapshot.start()
+        snapshot.start()
+        while not snapshot.ready:
+            await asyncio.sleep(0)
+        await snapshot.stop()
+
+    asyncio.run(runtime())
+
+    assert dump.loads == 1
+    assert snapshot.ready
+    assert snapshot.station_prices("100")[0].price == 189.9
@@ -0,0 +1,84 @@
+import random
+
+import numpy as np
+import pytest
+
+from geo import haversine_km_vectorized
+from spatial import SpatialIndex
+
+
+def brute_force(points: dict, latitude: float, longitude: float, radius_km: float) -> dict:
+    codes = list(points)
+    coordinates = np.array([points[code] for code in codes])
+    distances = haversine_km_vectorized(latitude, longitude, coordinates[:, 0], coordinates[:, 1])
+    return {code: distance for code, distance in zip(codes, distances) if distance <= radius_km}
+
+
+@pytest.mark.parametrize("radius_km", [0.5, 3, 12, 80])
+def test_within_radius_matches_brute_force(radius_km):
+    rng = random.Random(radius_km)
+    points = {str(code): (rng.uniform(-34.2, -33.5), rng.uniform(150.6, 151.4)) for code in range(2000)}
+    index = SpatialIndex()
+    for code, (latitude, longitude) in points.items():
+        index.add(code, latitude, longitude)
+    # moved and removed stations must be found at their new place or not at all
+    for code in map(str, range(0, 200, 2)):
+        points[code] = (rng.uniform(-34.2, -33.5), rng.uniform(150.6, 151.4))
+        index.add(code, *points[code])
+    for code in map(str, range(1, 200, 2)):
+        del points[code]
+        index.remove(code)
+
+    for _ in range(20):
+        latitude, longitude = rng.uniform(-34.2, -33.5), rng.uniform(150.6, 151.4)
+        matches = index.within_radius(latitude, longitude, radius_km)
+        expected = brute_force(points, latitude, longitude, radius_km)
+
+        assert {code for code, _ in matches} == set(expected)
+        assert [distance for _, distance in matches] == sorted(expected[code] for code, _ in matches)
+
+
+def make_index(seed: int, size: int = 2000):
+    rng = random.Random(seed)
+    points = {str(code): (rng.uniform(-34.2, -33.5), rng.uniform(150.6, 151.4)) for code in range(size)}
+    index = SpatialIndex()
+    for code, (latitude, longitude) in points.items():
+        index.add(code, latitude, longitude)
+    return rng, points, index
+
+
+@pytest.mark.parametrize("k", [1, 5, 40])
+def test_nearest_matches_brute_force(k):
+    rng, points, index = make_index(k)
+    # inside the cluster, at its edge and well outside it (empty rings before the first station)
+    queries = [(rng.uniform(-34.2, -33.5), rng.uniform(150.6, 151.4)) for _ in range(20)]
+    queries += [(-33.5, 151.4), (-35.5, 149.0), (-33.85, 151.9)]
+
+    for latitude, longitude in queries:
+        expected = sorted(brute_force(points, latitude, longitude, float("inf")).items(), key=lambda item: item[1])[:k]
+
+        assert index.nearest(latitude, longitude, k) == [(code, float(distance)) for code, distance in expected]
+
+
+def test_nearest_respects_max_radius_and_small_indexes():
+    rng, points, index = make_index(0, size=30)
+    latitude, longitude = -33.85, 151.0
+    expected = brute_force(points, latitude, longitude, 8)
+
+    assert {code for code, _ in index.nearest(latitude, longitude, 50, max_radius_km=8)} == set(expected)
+    assert len(index.nearest(latitude, longitude, 50)) == 30
+    assert index.nearest(latitude, longitude, 0) == []
+    assert SpatialIndex().nearest(latitude, longitude, 3) == []
+
+
+def test_in_bounding_box_matches_brute_force():
+    rng, points, index = make_index(1)
+    for _ in range(20):
+        min_lat, max_lat = sorted(rng.uniform(-34.3, -33.4) for _ in range(2))
+        min_lon, max_lon = sorted(rng.uniform(150.5, 151.5) for _ in range(2))
+        expected = {
+            code for code, (latitude, longitude) in points.items()
+            if min_lat <= latitude <= max_lat and min_lon <= longitude <= max_lon
+        }
+
+        assert set(index.in_bounding_box(min_lat, min_lon, max_lat, max_lon)) == expected
@@ -0,0 +1,108 @@
+import random
+import statistics
+from collections import defaultdict
+
+import numpy as np
+import pytest
+
+from geo import haversine_km_vectorized
+from station_table import StationTable
+
+STATIONS = {
+    code: {"name": f"Station {code}", "address": "1 Church St, Parramatta NSW 2150", "brand": "BP",
+           "latitude": -33.81, "longitude": 151.0}
+    for code in ("1", "2", "3")
+}
+PRICES = {
+    "1": {"E10": (189.9, "15/11/2025 07:45:12")},
+    "2": {"E10": (185.0, "1/11/2025 7:05:00")},
+    "3": {"E10": (199.9, "not a timestamp")},
+}
+
+
+def test_to_stations_reports_the_original_timestamps():
+    table = StationTable.from_records(STATIONS, PRICES)
+
+    reported = {station.station_code: station.prices[0].last_updated for station in table.to_stations()}
+
+    assert reported == {code: prices["E10"][1] for code, prices in PRICES.items()}
+
+
+def test_sorting_uses_the_parsed_timestamps():
+    table = StationTable.from_records(STATIONS, PRICES)
+    parsed = table.column("last_updated")
+
+    assert list(parsed[:2]) == [np.datetime64("2025-11-15T07:45:12"), np.datetime64("2025-11-01T07:05:00")]
+    assert np.isnat(parsed[2])
+    newest = table.where(~np.isnat(parsed)).sort_by("last_updated", descending=True)
+    assert [station.station_code for station in newest.to_stations()] == ["1", "2"]
+
+
+def make_records(size: int = 300, seed: int = 0):
+    rng = random.Random(seed)
+    stations, prices = {}, {}
+    for code in map(str, range(size)):
+        stations[code] = {
+            "name": f"Station {code}", "address": f"{code} Main Rd, Suburb NSW 2{rng.randint(0, 5):03d}",
+            "brand": rng.choice(["BP", "Shell", "Ampol", "Metro"]),
+            "latitude": rng.uniform(-34.2, -33.5), "longitude": rng.uniform(150.6, 151.4),
+        }
+        prices[code] = {
+            fueltype: (round(rng.uniform(170, 230), 1), "15/11/2025 07:45:12")
+            for fueltype in rng.sample(["E10", "U91", "P98", "DL"], 2)
+        }
+    return stations, prices
+
+
+def rows_of(stations, prices, fueltype=None):
+    return [
+        {"postcode": int(station["address"][-4:]), "brand": station["brand"], "fueltype": fuel, "price": price}
+        for code, station in stations.items()
+        for fuel, (price, _) in prices[code].items()
+        if fueltype is None or fuel == fueltype
+    ]
+
+
+@pytest.mark.parametrize("name", ["postcode", "brand", "fueltype"])
+@pytest.mark.parametrize("fueltype", [None, "E10"])
+def test_price_summary_matches_python_groupby(name, fueltype):
+    stations, prices = make_records()
+    table = StationTable.from_records(stations, prices)
+    if fueltype is not None:
+        table = table.filter(fueltype=fueltype)
+
+    groups = defaultdict(list)
+    for row in rows_of(stations, prices, fueltype):
+        groups[row[name]].append(row["price"])
+    expected = {
+        key: {"min": min(values), "median": statistics.median(values), "max": max(values), "count": len(values)}
+        for key, values in groups.items()
+    }
+
+    assert table.price_summary_by(name) == expected
+
+
+def test_to_frame_matches_rows():
+    pd = pytest.importorskip("pandas")
+    stations, prices = make_records(50)
+    table = StationTable.from_records(stations, prices).filter(fueltype="U91").with_distance(-33.81, 151.0)
+
+    frame = table.to_frame()
+
+    expected = pd.DataFrame(rows_of(stations, prices, "U91"))
+    assert len(frame) == len(expected) == len(table)
+    assert frame.groupby("brand", observed=True)["price"].median().to_dict() == expected.groupby("brand")["price"].median().to_dict()
+    assert set(frame["last_updated"]) == {"15/11/2025 07:45:12"}
+    assert list(frame["distance"]) == list(table.column("distance"))
+
+
+def test_distance_stays_aligned_through_views():
+    stations, prices = make_records(100)
+    table = StationTable.from_records(stations, prices).filter(fueltype="E10").with_distance(-33.81, 151.0)
+
+    nearest = table.sort_by("distance").head(5)
+
+    expected = haversine_km_vectorized(-33.81, 151.0, nearest.column("latitude"), nearest.column("longitude"))
+    assert list(nearest.column("distance")) == list(expected)
+    assert list(nearest.column("distance")) == sorted(table.column("distance"))[:5]
+    assert len(table.column("distance")) == len(table)
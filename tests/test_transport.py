@@ -0,0 +1,31 @@
+import asyncio
+
+import transport
+
+
+async def open_client():
+    client = transport.get_http_client()
+    assert transport.get_http_client() is client
+    return client
+
+
+def test_client_is_closed_when_its_loop_shuts_down():
+    clients = [asyncio.run(open_client()) for _ in range(3)]
+
+    assert len(set(map(id, clients))) == 3
+    assert all(client.is_closed for client in clients)
+    assert transport._clients == {}
+
+
+def test_closed_client_is_replaced_on_the_same_loop():
+    async def reopen():
+        client = await open_client()
+        await transport.close_http_client()
+        return client, await open_client()
+
+    first, second = asyncio.run(reopen())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
+    assert transport._clients == {}
+